@@ -0,0 +1,114 @@
+"""Compare the vectorized calendar allocator with the original day-by-day walk.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_calendar
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+from studyplan.planner import build_study_plan, collect_incomplete_standards
+
+DAILY_STUDY_HOURS = [1, 2, 1, 2, 2, 1, 1]
+HORIZONS = [30, 365, 3650]
+
+
+def make_categories(n_standards, seed=0):
+    rng = random.Random(seed)
+    levels = ['high', 'medium', 'low']
+    standards = []
+    for i in range(n_standards):
+        total_hours = rng.randint(1, 5)
+        standards.append({
+            "id": f"STD{i}", "name": f"STD {i} - Synthetic Standard", "completed": False,
+            "priority": rng.choice(levels), "difficulty": rng.choice(levels),
+            "totalHours": total_hours, "hoursSpent": 0, "notes": "", "scheduledDate": None,
+            "recommendedDays": max(1, total_hours - 1)
+        })
+    return [{"id": 1, "name": "Synthetic", "expanded": False, "standards": standards}]
+
+
+def legacy_generate_study_plan(categories, daily_study_hours, days_remaining):
+    # Copy of the original generate_study_plan() loop, minus session state
+    def get_date_x_days_from_today(days):
+        return datetime.now() + timedelta(days=days)
+
+    incomplete_standards = collect_incomplete_standards(categories)
+
+    total_study_days = 0
+    for i in range(days_remaining):
+        day_of_week = (datetime.now().weekday() + i) % 7
+        if daily_study_hours[day_of_week] > 0:
+            total_study_days += 1
+
+    current_day = 0
+    current_day_hours_remaining = 0
+    plan = []
+
+    for standard in incomplete_standards:
+        days_needed = standard['recommendedDays']
+        start_day = current_day
+        end_day = current_day
+        scheduled_date = None
+
+        while True:
+            if current_day >= days_remaining:
+                break
+            day_of_week = (datetime.now().weekday() + current_day) % 7
+            if daily_study_hours[day_of_week] > 0:
+                if current_day_hours_remaining == 0:
+                    current_day_hours_remaining = daily_study_hours[day_of_week]
+                    scheduled_date = get_date_x_days_from_today(current_day)
+                end_day = current_day
+                if end_day - start_day + 1 >= days_needed:
+                    break
+                current_day += 1
+                current_day_hours_remaining = 0
+            else:
+                current_day += 1
+
+        plan.append({
+            **standard,
+            'startDate': scheduled_date,
+            'endDate': get_date_x_days_from_today(end_day),
+            'daysNeeded': days_needed
+        })
+
+    return plan
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    print(f"{'days':>6} {'standards':>10} {'legacy ms':>10} {'vector ms':>10} {'speedup':>8} {'same end dates':>15}")
+    for days in HORIZONS:
+        # Enough standards to fill the horizon, which is the worst case for the walk
+        n_standards = max(30, days // 2)
+        categories = make_categories(n_standards)
+
+        legacy = legacy_generate_study_plan(categories, DAILY_STUDY_HOURS, days)
+        vector, _ = build_study_plan(categories, DAILY_STUDY_HOURS, days, mode='days')
+        # Both place the same standards up to the first that doesn't fit; after
+        # it the allocator back-fills the days left, which the walk never did
+        fitted = next((i for i, new in enumerate(vector) if new['endDate'] is None), len(vector))
+        same = all(
+            new['endDate'].date() == old['endDate'].date()
+            for old, new in zip(legacy[:fitted], vector[:fitted])
+        )
+
+        legacy_s = best_of(lambda: legacy_generate_study_plan(categories, DAILY_STUDY_HOURS, days))
+        vector_s = best_of(lambda: build_study_plan(categories, DAILY_STUDY_HOURS, days, mode='days'))
+        print(f"{days:>6} {n_standards:>10} {legacy_s * 1000:>10.2f} {vector_s * 1000:>10.2f} "
+              f"{legacy_s / vector_s:>7.1f}x {str(same):>15}")
+
+
+if __name__ == '__main__':
+    main()
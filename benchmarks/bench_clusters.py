@@ -0,0 +1,61 @@
+"""Compute the TF-IDF similarity matrix of the corpus against loading it cached.
+
+The app needs the matrix to place standards the study guide doesn't list in a
+cluster. It is computed from the extracted text once per corpus hash and read
+back from the text cache afterwards. Also times grouping study queues of
+growing size into contiguous clusters.
+
+Run from the repository root (after `python -m studyplan.extraction`):
+
+    python -m benchmarks.bench_clusters
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from studyplan.clusters import SIMILARITY_FILE, SimilarityMatrix, StudyClusters, load_study_guide
+from studyplan.corpus import update_manifest
+from studyplan.extraction import TEXT_CACHE_DIR, TextCache
+
+SIZES = [1_000, 10_000, 100_000]
+CLUSTERS = 8
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    manifest, _ = update_manifest(".")
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dir = os.path.join(directory, TEXT_CACHE_DIR)
+        shutil.copytree(TEXT_CACHE_DIR, cache_dir)
+        if os.path.exists(os.path.join(cache_dir, SIMILARITY_FILE)):
+            os.remove(os.path.join(cache_dir, SIMILARITY_FILE))
+        cache = TextCache(cache_dir)
+
+        similarity, cold_s = timed(lambda: SimilarityMatrix.cached(manifest['documents'], cache))
+        print(f"similarity of {len(similarity.ids)} standards computed in {cold_s * 1000:.0f} ms")
+        _, warm_s = timed(lambda: SimilarityMatrix.cached(manifest['documents'], cache))
+        print(f"  loaded for the same corpus hash in {warm_s * 1000:.2f} ms")
+
+    clusters, build_s = timed(lambda: StudyClusters.build(load_study_guide("Study_Guide.md"), similarity))
+    print(f"{len(clusters)} clusters from the study guide in {build_s * 1000:.2f} ms")
+
+    print(f"{'standards':>10} {'order ms':>9}")
+    rng = random.Random(0)
+    for n in SIZES:
+        ids = [f"STD{i}" for i in range(n)]
+        synthetic = StudyClusters([(f"cluster {c}", ids[c::CLUSTERS]) for c in range(CLUSTERS)])
+        items = [{'id': standard_id} for standard_id in rng.sample(ids, n)]
+        ordered, order_s = timed(lambda: synthetic.order(items))
+        assert len(ordered) == n
+        print(f"{n:>10} {order_s * 1000:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
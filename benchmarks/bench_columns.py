@@ -0,0 +1,89 @@
+"""Plan 10k standards with dict copies per row against columns and plan entries.
+
+The dict pipeline is the planner as it was before StandardColumns and
+PlanEntry: every incomplete standard copied into a new dict to sort, then
+again into the plan. Both run on the same StudyCalendar allocation.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_columns
+"""
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.bench_calendar import DAILY_STUDY_HOURS, make_categories
+from studyplan.calendar import StudyCalendar
+from studyplan.planner import NOT_ENOUGH_TIME, build_study_plan, needs_study, plan_order_key, remaining_hours
+
+DAYS = 3650
+SIZES = [1000, 10_000]
+
+
+def dict_plan(categories, daily_study_hours, days, start):
+    calendar = StudyCalendar(daily_study_hours, days, start)
+
+    standards = []
+    for category in categories:
+        for standard in category['standards']:
+            if needs_study(standard):
+                standards.append({**standard, 'categoryId': category['id'], 'categoryName': category['name']})
+    standards.sort(key=plan_order_key)
+
+    hours_needed = [remaining_hours(s) for s in standards]
+    start_days, end_days, _ = calendar.allocate_hours(hours_needed)
+    days_needed = calendar.study_days_between(start_days, end_days).tolist()
+
+    plan = []
+    for standard, start_day, end_day, days in zip(standards, start_days.tolist(), end_days.tolist(), days_needed):
+        scheduled = start_day >= 0
+        plan.append({
+            **standard,
+            'startDate': calendar.date_for(start_day) if scheduled else None,
+            'endDate': calendar.date_for(end_day) if scheduled else None,
+            'daysNeeded': days if scheduled else 0,
+            'hoursNeeded': remaining_hours(standard),
+            'unscheduledReason': None if scheduled else NOT_ENOUGH_TIME
+        })
+    return plan
+
+
+def columnar_plan(categories, daily_study_hours, days, start):
+    plan, _ = build_study_plan(categories, daily_study_hours, days, start)
+    return plan
+
+
+def measure(fn, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    plan = fn(*args)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return plan, best, held, peak
+
+
+def main():
+    start = datetime(2027, 1, 4)
+    print(f"{'standards':>9} {'pipeline':>9} {'plan ms':>8} {'held MiB':>9} {'peak MiB':>9} {'same plan':>10}")
+    for n_standards in SIZES:
+        categories = make_categories(n_standards)
+        args = (categories, DAILY_STUDY_HOURS, DAYS, start)
+        reference, *dict_stats = measure(dict_plan, *args)
+        plan, *columnar_stats = measure(columnar_plan, *args)
+
+        fields = ('id', 'startDate', 'endDate', 'daysNeeded', 'hoursNeeded', 'unscheduledReason', 'categoryId')
+        same = len(reference) == len(plan) and all(
+            old[f] == new[f] for old, new in zip(reference, plan) for f in fields)
+
+        for name, (plan_s, held, peak) in [("dicts", dict_stats), ("columns", columnar_stats)]:
+            print(f"{n_standards:>9} {name:>9} {plan_s * 1000:>8.1f} {held / 2**20:>9.2f} {peak / 2**20:>9.2f} "
+                  f"{str(same) if name == 'columns' else '':>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Scan the PDF corpus from scratch against an incremental rescan of its manifest.
+
+A full scan hashes every PDF and counts its pages; a rescan only stats the
+files and reads the ones whose size or mtime changed. The app checks the
+corpus signature on every rerun and only rescans when it changes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_corpus
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from studyplan.corpus import corpus_signature, scan_corpus, update_manifest
+
+CORPUS_DIR = "."
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for name in os.listdir(CORPUS_DIR):
+            if name.lower().endswith(".pdf"):
+                shutil.copy2(os.path.join(CORPUS_DIR, name), directory)
+        manifest_path = os.path.join(directory, "manifest.json")
+
+        (manifest, read), full_s = timed(lambda: update_manifest(directory, manifest_path))
+        print(f"full scan: {len(read)} files read, {len(manifest['documents'])} documents in {full_s * 1000:.1f} ms")
+        duplicates = {standard_id: document['duplicates'] for standard_id, document in manifest['documents'].items()
+                      if document['duplicates']}
+        print(f"  duplicate downloads: {duplicates}")
+
+        (_, read), rescan_s = timed(lambda: update_manifest(directory, manifest_path))
+        print(f"rescan, nothing changed: {len(read)} files read in {rescan_s * 1000:.2f} ms")
+
+        # Touch one file, as a re-download would
+        changed = sorted(name for name in os.listdir(directory) if name.lower().endswith(".pdf"))[0]
+        os.utime(os.path.join(directory, changed))
+        (_, read), changed_s = timed(lambda: update_manifest(directory, manifest_path))
+        print(f"rescan, one file touched: {len(read)} file read in {changed_s * 1000:.2f} ms")
+
+        _, signature_s = timed(lambda: corpus_signature(directory))
+        print(f"corpus signature (every rerun): {signature_s * 1000:.2f} ms")
+
+        (_, read), scratch_s = timed(lambda: scan_corpus(directory))
+        print(f"scan without a manifest again: {len(read)} files read in {scratch_s * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
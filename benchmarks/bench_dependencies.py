@@ -0,0 +1,53 @@
+"""Build the prerequisite graph and order a study queue by it.
+
+Times scanning the corpus text for cross-references cold and again after a
+change, when only new documents are read, then building and ordering
+synthetic graphs of growing size, where ordering should grow linearly.
+
+Run from the repository root (after `python -m studyplan.extraction`):
+
+    python -m benchmarks.bench_dependencies
+"""
+import os
+import random
+import time
+
+from studyplan.corpus import update_manifest
+from studyplan.dependencies import CrossReferences, DependencyGraph
+from studyplan.extraction import TEXT_CACHE_DIR, TextCache
+
+SIZES = [1_000, 10_000, 100_000]
+MENTIONS_PER_STANDARD = 8
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    manifest, _ = update_manifest(".")
+    references = CrossReferences(TextCache(os.path.join(".", TEXT_CACHE_DIR)))
+    graph, cold_s = timed(lambda: references.graph(manifest['documents']))
+    print(f"corpus: {len(graph)} standards, {graph.edge_count} prerequisite links, scanned in {cold_s * 1000:.1f} ms")
+    _, warm_s = timed(lambda: references.graph(manifest['documents']))
+    print(f"  rebuilt after a catalog change, nothing new to scan: {warm_s * 1000:.2f} ms")
+
+    print(f"{'standards':>10} {'links':>8} {'build ms':>9} {'order ms':>9} {'us/item':>8}")
+    rng = random.Random(0)
+    for n in SIZES:
+        ids = [f"STD{i}" for i in range(n)]
+        mentions = {
+            standard_id: {rng.choice(ids): rng.randint(1, 30) for _ in range(MENTIONS_PER_STANDARD)}
+            for standard_id in ids
+        }
+        graph, build_s = timed(lambda: DependencyGraph.build(mentions))
+        items = [{'id': standard_id} for standard_id in ids]
+        ordered, order_s = timed(lambda: graph.order(items))
+        assert len(ordered) == n
+        print(f"{n:>10} {graph.edge_count:>8} {build_s * 1000:>9.1f} {order_s * 1000:>9.1f} {order_s / n * 1e6:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
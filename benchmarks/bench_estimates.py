@@ -0,0 +1,78 @@
+"""Compare the catalog's hand-typed hours with estimates from PDF length.
+
+Uses the corpus manifest in the repository root (`python -m studyplan.extraction`
+fills in word counts; without them words are estimated from pages). As in the
+app, the catalog file's hours only set the prior pace. A simulated student then
+studies half the standards at 1.5 times the estimate, which the rate follows,
+and ticks the rest complete, which leaves it alone. Also times calibrating and
+estimating a 10k-standard catalog.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_estimates
+"""
+import random
+import time
+
+from studyplan.catalog import add_corpus_standards, load_catalog
+from studyplan.corpus import update_manifest
+from studyplan.estimates import HourEstimator
+
+
+def main():
+    manifest, _ = update_manifest(".")
+    typed_catalog = load_catalog()
+    catalog = add_corpus_standards(load_catalog(), manifest)
+    standards = [standard for category in catalog.categories for standard in category['standards']]
+    prior = HourEstimator(catalog.documents).typed_rate(
+        standard for category in typed_catalog.categories for standard in category['standards']
+    )
+    estimator = HourEstimator(catalog.documents, prior)
+    rate = estimator.calibrate(standards)
+    counted = sum(1 for document in catalog.documents.values() if document.get('words'))
+    print(f"{len(standards)} standards, {counted}/{len(catalog.documents)} documents with word counts, "
+          f"{prior:,.0f} words/hour from typed hours, {rate:,.0f} after {estimator.calibrated_on} completed standards")
+
+    print(f"{'standard':>9} {'pages':>6} {'words':>7} {'typed h':>8} {'estimate h':>11}")
+    rows = sorted(standards, key=lambda standard: -(estimator.words(standard['id']) or 0))
+    for standard in rows[:10]:
+        document = catalog.documents.get(standard['id'], {})
+        print(f"{standard['id']:>9} {document.get('pages', 0):>6} {estimator.words(standard['id']) or 0:>7.0f} "
+              f"{standard['totalHours']:>8} {estimator.hours(standard):>11}")
+    estimated = [dict(standard, completed=False, hoursSpent=0) for standard in standards
+                 if standard['id'] in catalog.documents]
+    typed = sum(standard['totalHours'] for standard in estimated)
+    studied, ticked = estimated[::2], estimated[1::2]
+    print(f"standards with a PDF: typed {typed} h, estimated {sum(estimator.hours(s) for s in estimated)} h")
+
+    for standard in studied:
+        standard.update(completed=True, hoursSpent=estimator.hours(standard) * 1.5)
+    rate = estimator.calibrate(estimated)
+    print(f"  {len(studied)} studied at 1.5x: {rate:,.0f} words/hour, "
+          f"{sum(estimator.hours(dict(s, completed=False, hoursSpent=0)) for s in estimated)} h")
+
+    # Ticked complete: hours spent are filled in from the estimate and left out of the fit
+    rates = []
+    for _ in range(3):
+        for standard in ticked:
+            standard.update(completed=True, hoursSpent=estimator.hours(dict(standard, hoursSpent=0)))
+        rates.append(estimator.calibrate(standard for standard in estimated if standard not in ticked))
+    print(f"  {len(ticked)} ticked complete, three times over: {' -> '.join(f'{r:,.0f}' for r in rates)} words/hour")
+
+    rng = random.Random(0)
+    documents = {f"STD{i}": {'pages': rng.randint(5, 120)} for i in range(10_000)}
+    synthetic = [
+        {'id': standard_id, 'difficulty': rng.choice(['high', 'medium', 'low']), 'completed': rng.random() < 0.3,
+         'hoursSpent': rng.randint(0, 10), 'totalHours': rng.randint(2, 12)}
+        for standard_id in documents
+    ]
+    started = time.perf_counter()
+    estimator = HourEstimator(documents)
+    estimator.calibrate(synthetic)
+    for standard in synthetic:
+        estimator.hours(standard)
+    print(f"10k standards calibrated and estimated in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Extract the corpus text one file after another against the process pool.
+
+Copies a sample of the corpus PDFs to a temporary directory and extracts them
+into an empty text cache, serially and on the pool, then checks the warm
+cache again as the app does on startup. The pool can only help with more than
+one CPU core.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_extraction
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from studyplan.corpus import update_manifest
+from studyplan.extraction import ExtractionService, TextCache, extract_text, pending_files
+
+CORPUS_DIR = "."
+SAMPLE = 8
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        names = sorted(name for name in os.listdir(CORPUS_DIR) if name.lower().endswith(".pdf"))[:SAMPLE]
+        for name in names:
+            shutil.copy2(os.path.join(CORPUS_DIR, name), directory)
+        manifest, _ = update_manifest(directory, os.path.join(directory, "manifest.json"))
+
+        serial_cache = TextCache(os.path.join(directory, "serial"))
+        started = time.perf_counter()
+        for sha256, path in pending_files(directory, manifest, serial_cache).items():
+            serial_cache.put(sha256, extract_text(path))
+        serial_s = time.perf_counter() - started
+        print(f"serial: {len(names)} files in {serial_s:.1f} s")
+
+        service = ExtractionService(directory, TextCache(os.path.join(directory, "pool"))).start(manifest)
+        service.wait()
+        service.close()
+        print(f"pool: {service.total} files on {service.workers} workers in {service.elapsed:.1f} s "
+              f"({serial_s / service.elapsed:.1f}x, {len(service.failed)} failed)")
+
+        started = time.perf_counter()
+        warm = ExtractionService(directory, service.cache).start(manifest)
+        print(f"warm cache: {warm.total} files to extract, checked in {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Time incremental rescheduling against full rebuilds.
+
+tests/test_incremental.py checks that both give the same plan.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_incremental
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.bench_calendar import DAILY_STUDY_HOURS, make_categories
+from studyplan.planner import IncrementalPlanner, build_study_plan
+
+def random_edit(rng, standard, start, edits=('hours', 'priority', 'toggle', 'pin')):
+    edit = rng.choice(edits)
+    if edit == 'hours':
+        standard['hoursSpent'] = rng.choice([0, 0.5, 1, 2, 3])
+        standard['completed'] = standard['hoursSpent'] >= standard['totalHours']
+    elif edit == 'priority':
+        standard['priority'] = rng.choice(['high', 'medium', 'low'])
+    elif edit == 'pin':
+        if standard['scheduledDate'] is None:
+            standard['scheduledDate'] = start + timedelta(days=rng.randint(0, 400))
+        else:
+            standard['scheduledDate'] = None
+    else:
+        standard['completed'] = not standard['completed']
+        if standard['completed']:
+            standard['hoursSpent'] = standard['totalHours']
+
+
+def main(n_standards=2000, days=365, n_edits=200, seed=1):
+    rng = random.Random(seed)
+    start = datetime.now()
+    categories = make_categories(n_standards, seed)
+    category = categories[0]
+
+    for mode in ['hours', 'days']:
+        planner = IncrementalPlanner(categories, DAILY_STUDY_HOURS, days, start, mode)
+        incremental_s = 0.0
+        full_s = 0.0
+        rebuilds = 0
+
+        for _ in range(n_edits):
+            standard = rng.choice(category['standards'])
+            random_edit(rng, standard, start)
+
+            started = time.perf_counter()
+            if not planner.update_standard(category, standard):
+                # Pin changes always rebuild
+                planner = IncrementalPlanner(categories, DAILY_STUDY_HOURS, days, start, mode)
+                rebuilds += 1
+            incremental_s += time.perf_counter() - started
+
+            started = time.perf_counter()
+            build_study_plan(categories, DAILY_STUDY_HOURS, days, start, mode)
+            full_s += time.perf_counter() - started
+
+        print(f"{mode:>6}: {n_edits} edits on {n_standards} standards "
+              f"({rebuilds} pin changes rebuilt); "
+              f"incremental {incremental_s / n_edits * 1000:.2f} ms/edit, "
+              f"full {full_s / n_edits * 1000:.2f} ms/edit")
+
+    batched(categories, start, days, rng)
+
+
+def batched(categories, start, days, rng, n_batches=20, batch_size=25):
+    # Several edits in one rerun: one update_standards call against one
+    # update_standard call per edit
+    category = categories[0]
+    for mode in ['hours', 'days']:
+        planner = IncrementalPlanner(categories, DAILY_STUDY_HOURS, days, start, mode)
+        one_by_one = IncrementalPlanner(categories, DAILY_STUDY_HOURS, days, start, mode)
+        batch_s = 0.0
+        single_s = 0.0
+
+        for _ in range(n_batches):
+            # Pin changes always rebuild, so leave pinned standards alone
+            unpinned = [standard for standard in category['standards'] if standard['scheduledDate'] is None]
+            changed = rng.sample(unpinned, batch_size)
+            for standard in changed:
+                random_edit(rng, standard, start, edits=('hours', 'priority', 'toggle'))
+
+            started = time.perf_counter()
+            planner.update_standards([(category, standard) for standard in changed])
+            batch_s += time.perf_counter() - started
+
+            started = time.perf_counter()
+            for standard in changed:
+                one_by_one.update_standard(category, standard)
+            single_s += time.perf_counter() - started
+
+        print(f"{mode:>6}: {n_batches} batches of {batch_size} edits; "
+              f"batched {batch_s / n_batches * 1000:.2f} ms/batch, "
+              f"one at a time {single_s / n_batches * 1000:.2f} ms/batch")
+
+
+if __name__ == '__main__':
+    main()
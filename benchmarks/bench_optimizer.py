@@ -0,0 +1,41 @@
+"""Time the optimal planning mode and compare its coverage with the greedy plan.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_optimizer
+"""
+import time
+from datetime import datetime
+
+from benchmarks.bench_calendar import DAILY_STUDY_HOURS, make_categories
+from studyplan.optimizer import priority_weight
+from studyplan.planner import build_study_plan
+
+
+def weighted_coverage(plan):
+    return sum(priority_weight(item) for item in plan if item['startDate'] is not None)
+
+
+def main(n_standards=500, days=365):
+    start = datetime.now()
+    # Make the catalog need more hours than the calendar has, so there's a choice to make
+    categories = make_categories(n_standards)
+    for standard in categories[0]['standards']:
+        standard['totalHours'] *= 2
+
+    print(f"{n_standards} standards over {days} days")
+    for mode, time_budget in [('hours', None), ('optimal', 0.3), ('optimal', 0.0)]:
+        started = time.perf_counter()
+        if time_budget is None:
+            plan, summary = build_study_plan(categories, DAILY_STUDY_HOURS, days, start, mode)
+        else:
+            plan, summary = build_study_plan(categories, DAILY_STUDY_HOURS, days, start, mode, time_budget)
+        elapsed = time.perf_counter() - started
+
+        label = mode if time_budget is None else f"{mode} (budget {time_budget * 1000:.0f} ms)"
+        print(f"{label:>26}: {elapsed * 1000:7.1f} ms, weighted coverage {weighted_coverage(plan):5d}, "
+              f"{len(plan) - summary['unscheduled']:4d} scheduled, fallback={summary['fallback']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Find due reviews with the ReviewQueue heap against a scan of every review state.
+
+Each standard has a year of reviews behind it first, so the heap carries the
+stale entries a long history leaves behind. Then a plan is built with the due
+reviews reserved next to the study queue.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_reviews
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.bench_calendar import DAILY_STUDY_HOURS, make_categories
+from studyplan.planner import build_study_plan
+from studyplan.reviews import ReviewQueue
+
+SIZES = [1000, 10_000, 100_000]
+DAYS = 365
+
+
+def review_history(n_standards, today, seed=0):
+    # Every standard was completed some time in the last year and reviewed on
+    # each due date since, so only a few are due on any one day
+    rng = random.Random(seed)
+    queue = ReviewQueue()
+    for i in range(n_standards):
+        standard_id = f"STD{i}"
+        state = queue.add(standard_id, today - timedelta(days=rng.randint(0, 365)))
+        while state.due < today:
+            state = queue.record(standard_id, rng.choice([1, 3, 4, 4, 5]), state.due)
+    return queue
+
+
+def scan_due(queue, until):
+    return sorted(
+        (state.due, standard_id) for standard_id, state in queue.states.items() if state.due <= until
+    )
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    today = date.today()
+    print(f"{'standards':>10} {'heap size':>10} {'due':>6} {'scan ms':>8} {'heap ms':>8} {'same':>5}")
+    for n in SIZES:
+        queue = review_history(n, today)
+        until = today
+        due = queue.due(until)
+        same = [(d, s) for s, d in due] == scan_due(queue, until)
+        scan_s = best_of(lambda: scan_due(queue, until))
+        heap_s = best_of(lambda: queue.due(until))
+        print(f"{n:>10} {len(queue.heap):>10} {len(due):>6} {scan_s * 1000:>8.2f} {heap_s * 1000:>8.2f} {str(same):>5}")
+
+    categories = make_categories(2000)
+    queue = ReviewQueue()
+    for i, standard in enumerate(categories[0]['standards'][:200]):
+        standard['completed'] = True
+        queue.add(standard['id'], today + timedelta(days=i % 60))
+    started = time.perf_counter()
+    plan, summary = build_study_plan(
+        categories, DAILY_STUDY_HOURS, DAYS, start=datetime.now(), reviews=queue.due(today + timedelta(days=DAYS))
+    )
+    print(f"plan of 2000 standards with {summary['reviews']} reviews ({summary['reviewHours']:.1f} h) "
+          f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
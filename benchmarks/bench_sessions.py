@@ -0,0 +1,89 @@
+"""Simulate a cohort of concurrent sessions against both storage modes.
+
+"single" is the one-database mode: every session opens its own connection and
+loads and holds the whole catalog, and all of them write the same rows.
+"overlay" is the cohort mode: one shared catalog and connection pool, and
+per-user rows only for what each user changed.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sessions
+"""
+import copy
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.bench_calendar import DAILY_STUDY_HOURS
+from benchmarks.bench_standards_tab import split_catalog
+from studyplan.catalog import freeze
+from studyplan.metrics import CatalogMetrics
+from studyplan.persistence import OverlayDatabase, StateDatabase
+from studyplan.planner import IncrementalPlanner
+from studyplan.store import StandardStore
+
+N_SESSIONS = 200
+N_STANDARDS = 40
+EDITS_PER_SESSION = 3
+THREADS = 16
+
+
+def open_session(state_db, user_index):
+    # What the app keeps per session, plus a few edits written back
+    categories = state_db.load_categories()
+    store = StandardStore(categories)
+    state_db.track(store)
+    metrics = CatalogMetrics(store)
+    planner = IncrementalPlanner(store.categories, DAILY_STUDY_HOURS, 30, datetime(2027, 1, 4))
+
+    rng = random.Random(user_index)
+    for standard_id in rng.sample(list(store.records), EDITS_PER_SESSION):
+        standard = store.update(standard_id, hoursSpent=1, notes=f"user {user_index}")
+        planner.update_standard(store.category_of(standard_id), standard)
+    return state_db, store, metrics, planner
+
+
+def run(mode, directory, catalog):
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    if mode == 'single':
+        path = os.path.join(directory, "single.db")
+        seed = StateDatabase(path)
+        seed.save_catalog(copy.deepcopy(catalog))
+        seed.close()
+        make_state = lambda user_index: StateDatabase(path)
+    else:
+        database = OverlayDatabase(os.path.join(directory, "users.db"))
+        shared = freeze(catalog)
+        make_state = lambda user_index: database.for_user(f"user{user_index}", shared)
+    startup_s = time.perf_counter() - started
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        sessions = list(pool.map(lambda i: open_session(make_state(i), i), range(N_SESSIONS)))
+    sessions_s = time.perf_counter() - started
+
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_session = (current - baseline) / len(sessions)
+    return startup_s, sessions_s, per_session
+
+
+def main():
+    catalog = split_catalog(N_STANDARDS)
+    print(f"{N_SESSIONS} sessions, {N_STANDARDS} standards, {EDITS_PER_SESSION} edits each, {THREADS} threads")
+    print(f"{'mode':>8} {'startup ms':>11} {'sessions ms':>12} {'KiB/session':>12}")
+    for mode in ['single', 'overlay']:
+        with tempfile.TemporaryDirectory() as directory:
+            startup_s, sessions_s, per_session = run(mode, directory, catalog)
+        print(f"{mode:>8} {startup_s * 1000:>11.1f} {sessions_s * 1000:>12.0f} {per_session / 1024:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
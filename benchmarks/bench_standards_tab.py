@@ -0,0 +1,94 @@
+"""Measure Streamlit rerun latency and widget count as the catalog grows.
+
+Each run seeds a throwaway state database with a synthetic catalog split over
+8 categories, only the first of them expanded, and reruns the whole app with
+Streamlit's AppTest, first in the cards view and then in the bulk-edit table.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_standards_tab
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_calendar import make_categories
+from studyplan.persistence import StateDatabase
+
+SIZES = [40, 200, 1000]
+N_CATEGORIES = 8
+RERUNS = 5
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit.py")
+
+
+def split_catalog(n_standards):
+    standards = make_categories(n_standards)[0]['standards']
+    return [
+        {
+            "id": category_id, "name": f"Category {category_id}", "expanded": category_id == 1,
+            "standards": standards[category_id - 1::N_CATEGORIES]
+        }
+        for category_id in range(1, N_CATEGORIES + 1)
+    ]
+
+
+def widget_count(at):
+    return len(at.checkbox) + len(at.number_input) + len(at.button) + len(at.toggle)
+
+
+def import_app_test():
+    # The app script is called streamlit.py and shadows the package while the
+    # repository root is on sys.path, so import the package without it
+    root = os.path.dirname(APP_PATH)
+    saved_path = sys.path[:]
+    sys.path[:] = [entry for entry in sys.path if os.path.abspath(entry or os.curdir) != root]
+    try:
+        from streamlit.testing.v1 import AppTest
+    finally:
+        sys.path[:] = saved_path
+    return AppTest
+
+
+def measure(n_standards):
+    AppTest = import_app_test()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["STUDYPLAN_DB"] = os.path.join(directory, "bench.db")
+        database = StateDatabase(os.environ["STUDYPLAN_DB"])
+        database.save_catalog(split_catalog(n_standards))
+        database.close()
+
+        at = AppTest.from_file(APP_PATH, default_timeout=600)
+        at.run()
+        cards = median_rerun(at), widget_count(at)
+
+        # The bulk-edit table, where the view switch exists
+        views = [radio for radio in at.radio if radio.key == "standards_view"]
+        if not views:
+            return cards, None
+        views[0].set_value("table").run()
+        return cards, (median_rerun(at), widget_count(at))
+
+
+def median_rerun(at):
+    timings = []
+    for _ in range(RERUNS):
+        started = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    print(f"{'standards':>9} {'cards ms':>9} {'widgets':>8} {'table ms':>9} {'widgets':>8}")
+    for n_standards in SIZES:
+        (cards_s, cards_widgets), table = measure(n_standards)
+        table_columns = f"{table[0] * 1000:>9.0f} {table[1]:>8}" if table else f"{'-':>9} {'-':>8}"
+        print(f"{n_standards:>9} {cards_s * 1000:>9.0f} {cards_widgets:>8} {table_columns}")
+
+
+if __name__ == '__main__':
+    main()
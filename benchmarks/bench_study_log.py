@@ -0,0 +1,89 @@
+"""Read the day and week rollups of the study session log against rescanning it.
+
+Logs two years of study sessions, then times what the Analytics tab needs on
+each rerun: daily and weekly totals, read from the rollup tables or summed
+again from every logged session.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_study_log
+"""
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from studyplan.persistence import StateDatabase
+
+SIZES = [10_000, 100_000]
+DAYS = 730
+
+
+def log_sessions(db, n_sessions, seed=0):
+    rng = random.Random(seed)
+    first = datetime.now() - timedelta(days=DAYS)
+    moments = sorted(first + timedelta(seconds=rng.randint(0, DAYS * 86400)) for _ in range(n_sessions))
+    started = time.perf_counter()
+    for moment in moments:
+        db.log_session(f"STD{rng.randint(0, 999)}", moment, rng.choice([0.5, 1, 1.5, 2]))
+    return time.perf_counter() - started
+
+
+def rescan(db):
+    # What the charts would cost without rollups: every logged row, every
+    # rerun. A standard studied on a day is one session.
+    standard_days = defaultdict(float)
+    for standard_id, start, hours in db.connection.execute("SELECT standard_id, start, hours FROM sessions"):
+        standard_days[standard_id, datetime.fromtimestamp(start).date()] += hours
+    daily = defaultdict(lambda: [0.0, 0])
+    weekly = defaultdict(lambda: [0.0, 0])
+    for (_, day), hours in standard_days.items():
+        for totals in (daily[day], weekly[day - timedelta(days=day.weekday())]):
+            totals[0] += hours
+            totals[1] += hours > 0
+    return ([(day, hours, sessions) for day, (hours, sessions) in sorted(daily.items())],
+            [(week, hours, sessions) for week, (hours, sessions) in sorted(weekly.items())])
+
+
+def rollups(db):
+    return db.load_rollup('day'), db.load_rollup('week')
+
+
+def rounded(rows):
+    return [(start, round(hours, 6), sessions) for start, hours, sessions in rows]
+
+
+def best_of(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    print(f"{'sessions':>9} {'append us':>10} {'db KiB':>8} {'rescan ms':>10} {'rollup ms':>10} {'same':>5}")
+    for n in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "study_plan.db")
+            db = StateDatabase(path)
+            append_s = log_sessions(db, n)
+            db.checkpoint()
+
+            daily, weekly = rollups(db)
+            scanned_daily, scanned_weekly = rescan(db)
+            same = rounded(daily) == rounded(scanned_daily) and rounded(weekly) == rounded(scanned_weekly)
+
+            rescan_s = best_of(lambda: rescan(db))
+            rollup_s = best_of(lambda: rollups(db))
+            size_kib = os.path.getsize(path) / 1024
+            db.close()
+        print(f"{n:>9} {append_s / n * 1e6:>10.1f} {size_kib:>8.0f} {rescan_s * 1000:>10.2f} "
+              f"{rollup_s * 1000:>10.2f} {str(same):>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Compare the single-trace timeline figure with one trace per standard.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_timeline
+"""
+import time
+from datetime import date, timedelta
+
+import plotly.graph_objects as go
+
+from studyplan.timeline import build_timeline_figure, standards_frame
+
+SIZES = [30, 300, 3000]
+
+
+def make_timeline(n_standards, today):
+    items = [{'type': 'category', 'name': "Synthetic", 'y_position': 0}]
+    for i in range(n_standards):
+        start = today + timedelta(days=i // 3)
+        items.append({
+            'type': 'standard', 'name': f"STD {i}", 'full_name': f"STD {i} - Synthetic Standard",
+            'start_date': start, 'end_date': start + timedelta(days=i % 3),
+            'color': "rgba(46, 204, 113, 0.7)", 'y_position': i + 1,
+            'priority': 'high', 'difficulty': 'medium', 'totalHours': 3, 'hoursSpent': 0
+        })
+    exam_date = today + timedelta(days=n_standards // 3 + 7)
+    week_markers = [
+        {'date': today + timedelta(days=7 * week), 'label': f"Week {week}"}
+        for week in range((exam_date - today).days // 7 + 1)
+    ]
+    return items, week_markers, exam_date
+
+
+def legacy_figure(items, week_markers, today, exam_date, rows):
+    # The Timeline tab's original construction: a trace per standard and per marker
+    fig = go.Figure()
+    for week in week_markers:
+        fig.add_trace(go.Scatter(x=[week['date'], week['date']], y=[0, rows], mode='lines',
+                                 line=dict(color='gray', width=1, dash='dash'), showlegend=False, hoverinfo='none'))
+        fig.add_annotation(x=week['date'], y=0, text=week['label'], showarrow=False, yanchor='bottom', font=dict(size=10))
+    for x, color in [(today, 'red'), (exam_date, 'purple')]:
+        fig.add_trace(go.Scatter(x=[x, x], y=[0, rows], mode='lines', line=dict(color=color, width=2),
+                                 showlegend=False, hoverinfo='none'))
+    for item in items:
+        if item['type'] == 'category':
+            fig.add_annotation(x=today, y=item['y_position'] + 0.5, text=item['name'], showarrow=False, xanchor='left')
+        else:
+            duration = (item['end_date'] - item['start_date']).days + 1
+            fig.add_trace(go.Bar(
+                x=[duration], y=[item['y_position']], orientation='h', base=item['start_date'],
+                marker_color=item['color'], text=item['name'], textposition='inside', name=item['full_name'],
+                hoverinfo='text',
+                hovertext=f"{item['full_name']}<br>Priority: {item['priority']}<br>Difficulty: {item['difficulty']}"
+                          f"<br>Hours needed: {item['totalHours']}<br>Hours spent: {item['hoursSpent']}"
+            ))
+    fig.update_layout(title="Study Timeline", height=max(500, rows * 30), showlegend=False)
+    return fig
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fig = fn()
+    build_s = time.perf_counter() - started
+    return build_s, len(fig.to_json()), len(fig.data)
+
+
+def main():
+    today = date.today()
+    print(f"{'standards':>9} {'legacy ms':>10} {'legacy KiB':>11} {'traces':>7} "
+          f"{'batched ms':>11} {'batched KiB':>12} {'traces':>7}")
+    for n_standards in SIZES:
+        items, week_markers, exam_date = make_timeline(n_standards, today)
+        rows = n_standards + 2
+
+        legacy = timed(lambda: legacy_figure(items, week_markers, today, exam_date, rows))
+        batched = timed(lambda: build_timeline_figure(
+            standards_frame(items), [item for item in items if item['type'] == 'category'],
+            week_markers, today, exam_date, rows))
+
+        print(f"{n_standards:>9} {legacy[0] * 1000:>10.1f} {legacy[1] / 1024:>11.0f} {legacy[2]:>7} "
+              f"{batched[0] * 1000:>11.1f} {batched[1] / 1024:>12.0f} {batched[2]:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Round-trip a 10k-standard catalog through export and import.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_transfer
+"""
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.bench_calendar import DAILY_STUDY_HOURS, make_categories
+from studyplan.transfer import export_bytes, load_export
+
+
+def main(n_standards=10_000):
+    categories = make_categories(n_standards)
+    for i, standard in enumerate(categories[0]['standards']):
+        if i % 10 == 0:
+            standard['scheduledDate'] = datetime(2027, 1, 1) + timedelta(days=i % 90)
+    settings = {"exam_date": datetime(2027, 6, 1), "daily_study_hours": DAILY_STUDY_HOURS, "planning_mode": "hours"}
+
+    print(f"{n_standards} standards")
+    for compress in [False, True]:
+        started = time.perf_counter()
+        data = export_bytes(categories, settings, compress)
+        export_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        loaded_categories, loaded_settings = load_export(data)
+        import_s = time.perf_counter() - started
+
+        same = loaded_categories == categories and loaded_settings == settings
+        label = "gzip" if compress else "json"
+        print(f"{label:>5}: {len(data) / 1024:8.0f} KiB, export {export_s * 1000:6.1f} ms, "
+              f"import {import_s * 1000:6.1f} ms, round trip equal: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,32 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import json
+import os
+import sqlite3
+import time
 from datetime import datetime, timedelta, date
 
+from studyplan.catalog import (
+    CATALOG_PATH as DEFAULT_CATALOG_PATH, InvalidCatalogError, add_corpus_standards, load_catalog, merge_catalog,
+    session_categories
+)
+from studyplan.clusters import SimilarityMatrix, StudyClusters, load_study_guide
+from studyplan.corpus import corpus_signature, update_manifest
+from studyplan.dependencies import CrossReferences
+from studyplan.estimates import HourEstimator
+from studyplan.extraction import TEXT_CACHE_DIR, BackgroundExtraction, TextCache
+from studyplan.figures import (
+    FigureCache, burndown_figure, category_hours_figure, efficiency_gauge, level_pie, velocity_figure
+)
+from studyplan.metrics import CatalogMetrics
+from studyplan.persistence import OverlayDatabase, StateDatabase
+from studyplan.planner import PLANNING_MODES, IncrementalPlanner, PlanEdits
+from studyplan.reviews import REVIEW_GRADES, ReviewQueue
+from studyplan.search import INDEX_DIR as SEARCH_INDEX_NAME, POSTINGS_FILE, SearchIndex
+from studyplan.store import StandardStore
+from studyplan.timeline import timeline_figure, timeline_items
+from studyplan.transfer import InvalidExportError, export_bytes, load_export
+
 # Set page configuration
 st.set_page_config(
     page_title="Accounting Standards Study Plan",
@@ -13,101 +34,155 @@ st.set_page_config(
     layout="wide"
 )
 
+# Wall time of this rerun, shown in the Debug panel
+run_started = time.perf_counter()
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Progress is kept in a SQLite database next to this script unless STUDYPLAN_DB says otherwise
+STATE_DB_PATH = os.environ.get("STUDYPLAN_DB", os.path.join(APP_DIR, "study_plan.db"))
+
+# The standards catalog; point STUDYPLAN_CATALOG at another file to use a different one
+CATALOG_PATH = os.environ.get("STUDYPLAN_CATALOG", DEFAULT_CATALOG_PATH)
+
+# Serving a cohort: set STUDYPLAN_USERS_DB and every user keeps only their own
+# progress there, on top of one shared catalog
+USERS_DB_PATH = os.environ.get("STUDYPLAN_USERS_DB")
+
+# The standard PDFs; standards found here but not in the catalog file are added to it
+CORPUS_DIR = os.environ.get("STUDYPLAN_CORPUS", APP_DIR)
+
+# Its "Logical Clusters" group related standards for the clusters planning mode
+STUDY_GUIDE_PATH = os.path.join(APP_DIR, "Study_Guide.md")
+
+# Built offline with `python -m studyplan.search`
+SEARCH_INDEX_DIR = os.path.join(APP_DIR, SEARCH_INDEX_NAME)
+
+# Standards shown per page inside an expanded category
+STANDARDS_PER_PAGE = 10
+
+# How often the sidebar checks on background text extraction
+EXTRACTION_POLL_SECONDS = 2
+
+@st.cache_resource
+def get_text_extraction(corpus_dir, signature):
+    # Started once per corpus version and shared by every session. Only PDFs
+    # missing from the text cache are extracted; reruns just read the progress.
+    manifest, _ = update_manifest(corpus_dir)
+    return BackgroundExtraction(corpus_dir, manifest)
+
+@st.cache_resource
+def get_catalog(path, corpus_dir, signature, text_ready):
+    # Parsed and validated once per process, then shared read-only by every
+    # session. `signature` and `text_ready` only key the cache: adding or
+    # changing a PDF rescans the corpus (only the files that changed are read
+    # again), and finished text extraction brings in its word counts.
+    cache = TextCache(os.path.join(corpus_dir, TEXT_CACHE_DIR))
+    manifest, _ = update_manifest(corpus_dir, word_count=cache.words)
+    return add_corpus_standards(load_catalog(path), manifest)
+
+@st.cache_resource
+def get_typed_rate(_documents, path, signature, text_ready):
+    # The reading pace the catalog file's hand-typed hours imply. It is only
+    # the prior: each session fits the rate to the hours its user studied.
+    return HourEstimator(_documents).typed_rate(
+        standard for category in load_catalog(path).categories for standard in category['standards']
+    )
+
+@st.cache_resource
+def get_cross_references(corpus_dir):
+    # Mentions are kept per content hash for the life of the process
+    return CrossReferences(TextCache(os.path.join(corpus_dir, TEXT_CACHE_DIR)))
+
+@st.cache_resource
+def get_dependencies(_documents, corpus_dir, signature, text_ready):
+    # Rebuilt with the catalog; only documents not scanned before are read
+    return get_cross_references(corpus_dir).graph(_documents)
+
+@st.cache_resource
+def get_clusters(_documents, corpus_dir, signature, text_ready, guide_modified):
+    # The similarity matrix is saved with the text cache and only recomputed
+    # when the corpus hash changes
+    similarity = SimilarityMatrix.cached(_documents, TextCache(os.path.join(corpus_dir, TEXT_CACHE_DIR)))
+    return StudyClusters.build(load_study_guide(STUDY_GUIDE_PATH), similarity)
+
+@st.cache_resource
+def get_users_database(path):
+    # One connection pool for every session in the process
+    return OverlayDatabase(path)
+
+def current_user_id():
+    # Users are told apart by a ?user= link, or asked once per browser tab
+    user_id = st.query_params.get("user", "").strip()
+    if not user_id:
+        user_id = st.text_input("Enter your name or candidate number to open your study plan").strip()
+        if not user_id:
+            st.stop()
+        st.query_params["user"] = user_id
+    return user_id
+
+try:
+    signature = corpus_signature(CORPUS_DIR)
+    text_extraction = get_text_extraction(CORPUS_DIR, signature)
+    catalog_text_ready = text_extraction.finished
+    catalog = get_catalog(CATALOG_PATH, CORPUS_DIR, signature, catalog_text_ready)
+    typed_rate = get_typed_rate(catalog.documents, CATALOG_PATH, signature, catalog_text_ready)
+    dependencies = get_dependencies(catalog.documents, CORPUS_DIR, signature, catalog_text_ready)
+    clusters = get_clusters(
+        catalog.documents, CORPUS_DIR, signature, catalog_text_ready,
+        os.path.getmtime(STUDY_GUIDE_PATH) if os.path.exists(STUDY_GUIDE_PATH) else None
+    )
+except (InvalidCatalogError, OSError) as error:
+    # A bad catalog file, or a corpus directory that can't be read
+    st.error(f"Couldn't load the standards catalog: {error}")
+    st.stop()
+
 # Initialize session state variables if they don't exist
+if 'state_db' not in st.session_state:
+    load_started = time.perf_counter()
+    if USERS_DB_PATH:
+        st.session_state.state_db = get_users_database(USERS_DB_PATH).for_user(current_user_id(), catalog.categories)
+    else:
+        st.session_state.state_db = StateDatabase(STATE_DB_PATH)
+    st.session_state.saved_settings = st.session_state.state_db.load_settings()
+    st.session_state.saved_categories = st.session_state.state_db.load_categories()
+    st.session_state.state_load_ms = (time.perf_counter() - load_started) * 1000
+
 if 'categories' not in st.session_state:
-    st.session_state.categories = [
-        {
-            "id": 1,
-            "name": "Foundational Concepts",
-            "expanded": True,
-            "standards": [
-                {"id": "LKAS1", "name": "LKAS 1 - Presentation of Financial Statements", "completed": False, "priority": "high", "difficulty": "medium", "totalHours": 3, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 2},
-                {"id": "LKAS7", "name": "LKAS 7 - Statement of Cash Flows", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-            ]
-        },
-        {
-            "id": 2,
-            "name": "Specific Balance Sheet Items",
-            "expanded": False,
-            "standards": [
-                {"id": "LKAS38", "name": "LKAS 38 - Intangible Assets", "completed": False, "priority": "high", "difficulty": "high", "totalHours": 3, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 2},
-                {"id": "LKAS40", "name": "LKAS 40 - Investment Property", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-                {"id": "LKAS41", "name": "LKAS 41 - Agriculture", "completed": False, "priority": "low", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-                {"id": "LKAS37", "name": "LKAS 37 - Provisions, Contingent Liabilities and Assets", "completed": False, "priority": "high", "difficulty": "high", "totalHours": 4, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 3},
-                {"id": "LKAS19", "name": "LKAS 19 - Employee Benefits", "completed": False, "priority": "high", "difficulty": "high", "totalHours": 4, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 3},
-            ]
-        },
-        {
-            "id": 3,
-            "name": "Specific Transactions and Events",
-            "expanded": False,
-            "standards": [
-                {"id": "LKAS11", "name": "LKAS 11 - Construction Contracts", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-                {"id": "LKAS18", "name": "LKAS 18 - Revenue", "completed": False, "priority": "high", "difficulty": "medium", "totalHours": 3, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 2},
-                {"id": "SLFRS2", "name": "SLFRS 2 - Share-based Payment", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-                {"id": "LKAS23", "name": "LKAS 23 - Borrowing Costs", "completed": False, "priority": "medium", "difficulty": "low", "totalHours": 1, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-            ]
-        },
-        {
-            "id": 4,
-            "name": "Financial Instruments",
-            "expanded": False,
-            "standards": [
-                {"id": "LKAS32", "name": "LKAS 32 - Financial Instruments: Presentation", "completed": False, "priority": "high", "difficulty": "high", "totalHours": 4, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 3},
-                {"id": "LKAS39", "name": "LKAS 39 - Financial Instruments: Recognition and Measurement", "completed": False, "priority": "high", "difficulty": "high", "totalHours": 5, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 4},
-                {"id": "SLFRS7", "name": "SLFRS 7 - Financial Instruments: Disclosures", "completed": False, "priority": "high", "difficulty": "medium", "totalHours": 3, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 2},
-                {"id": "LKAS33", "name": "LKAS 33 - Earnings per Share", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-            ]
-        },
-        {
-            "id": 5,
-            "name": "Group Accounting and Related Disclosures",
-            "expanded": False,
-            "standards": [
-                {"id": "SLFRS10", "name": "SLFRS 10 - Consolidated Financial Statements", "completed": False, "priority": "high", "difficulty": "high", "totalHours": 4, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 3},
-                {"id": "SLFRS11", "name": "SLFRS 11 - Joint Arrangements", "completed": False, "priority": "high", "difficulty": "high", "totalHours": 3, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 2},
-                {"id": "LKAS28", "name": "LKAS 28 - Investments in Associates and Joint Ventures", "completed": False, "priority": "high", "difficulty": "high", "totalHours": 3, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 2},
-                {"id": "LKAS27", "name": "LKAS 27 - Separate Financial Statements", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-                {"id": "SLFRS12", "name": "SLFRS 12 - Disclosure of Interests in Other Entities", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-            ]
-        },
-        {
-            "id": 6,
-            "name": "Other Specific Standards",
-            "expanded": False,
-            "standards": [
-                {"id": "SLFRS3", "name": "SLFRS 3 - Business Combinations", "completed": False, "priority": "high", "difficulty": "high", "totalHours": 4, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 3},
-                {"id": "SLFRS5", "name": "SLFRS 5 - Non-current Assets Held for Sale and Discontinued Operations", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-                {"id": "SLFRS6", "name": "SLFRS 6 - Exploration for and Evaluation of Mineral Resources", "completed": False, "priority": "low", "difficulty": "low", "totalHours": 1, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-                {"id": "SLFRS4", "name": "SLFRS 4 - Insurance Contracts", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-                {"id": "LKAS34", "name": "LKAS 34 - Interim Financial Reporting", "completed": False, "priority": "medium", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-            ]
-        },
-        {
-            "id": 7,
-            "name": "Accounting Policies, Estimates, and Errors",
-            "expanded": False,
-            "standards": [
-                {"id": "LKAS8", "name": "LKAS 8 - Accounting Policies, Changes in Accounting Estimates and Errors", "completed": False, "priority": "high", "difficulty": "medium", "totalHours": 2, "hoursSpent": 0, "notes": "", "scheduledDate": None, "recommendedDays": 1},
-            ]
-        },
-        {
-            "id": 8,
-            "name": "Already Covered",
-            "expanded": False,
-            "standards": [
-                {"id": "LKAS17", "name": "LKAS 17 - Leasing", "completed": True, "priority": "completed", "difficulty": "completed", "totalHours": 3, "hoursSpent": 3, "notes": "Completed", "scheduledDate": None, "recommendedDays": 0},
-                {"id": "LKAS2", "name": "LKAS 2 - Inventory", "completed": True, "priority": "completed", "difficulty": "completed", "totalHours": 2, "hoursSpent": 2, "notes": "Completed", "scheduledDate": None, "recommendedDays": 0},
-                {"id": "LKAS16", "name": "LKAS 16 - Property, Plant and Equipment", "completed": True, "priority": "completed", "difficulty": "completed", "totalHours": 3, "hoursSpent": 3, "notes": "Completed", "scheduledDate": None, "recommendedDays": 0},
-            ]
-        }
-    ]
+    # Saved progress wins over the built-in catalog; a fresh database gets seeded with it
+    if st.session_state.saved_categories:
+        st.session_state.categories = st.session_state.saved_categories
+        # Standards added to the catalog since this database was seeded
+        if merge_catalog(st.session_state.categories, catalog.categories):
+            st.session_state.state_db.save_catalog(st.session_state.categories)
+    else:
+        st.session_state.categories = session_categories(catalog.categories)
+        st.session_state.state_db.save_catalog(st.session_state.categories)
+
+if 'store' not in st.session_state:
+    st.session_state.store = StandardStore(st.session_state.categories)
+    st.session_state.state_db.track(st.session_state.store)
+
+if 'metrics' not in st.session_state:
+    st.session_state.metrics = CatalogMetrics(st.session_state.store)
+
+def restored_exam_date(exam_date):
+    # The date picker can't go back before today, so a saved exam date that
+    # has passed starts from today; the old one is kept to tell the user
+    today = datetime.combine(date.today(), datetime.min.time())
+    if exam_date < today:
+        st.session_state.passed_exam_date = exam_date
+        return today
+    return exam_date
 
 if 'exam_date' not in st.session_state:
-    st.session_state.exam_date = datetime.now() + timedelta(days=30)
+    if 'exam_date' in st.session_state.saved_settings:
+        st.session_state.exam_date = restored_exam_date(datetime.fromisoformat(st.session_state.saved_settings['exam_date']))
+    else:
+        st.session_state.exam_date = datetime.now() + timedelta(days=30)
 
 if 'daily_study_hours' not in st.session_state:
-    st.session_state.daily_study_hours = [1, 2, 1, 2, 2, 1, 1]  # Mon-Sun
+    st.session_state.daily_study_hours = st.session_state.saved_settings.get('daily_study_hours', [1, 2, 1, 2, 2, 1, 1])  # Mon-Sun
 
 if 'filter_criteria' not in st.session_state:
     st.session_state.filter_criteria = "all"  # all, priority, incomplete
@@ -115,27 +190,65 @@ if 'filter_criteria' not in st.session_state:
 if 'sort_order' not in st.session_state:
     st.session_state.sort_order = "default"  # default, priority, difficulty
 
+if 'planning_mode' not in st.session_state:
+    st.session_state.planning_mode = st.session_state.saved_settings.get('planning_mode', "hours")  # hours, days, optimal, prerequisites, clusters
+
 if 'study_plan' not in st.session_state:
     st.session_state.study_plan = []
 
 if 'selected_standard' not in st.session_state:
     st.session_state.selected_standard = None
 
+if 'figure_cache' not in st.session_state:
+    st.session_state.figure_cache = FigureCache()
+
+if 'plan_edits' not in st.session_state:
+    st.session_state.plan_edits = PlanEdits()
+
+def new_hour_estimator():
+    return HourEstimator(catalog.documents, typed_rate)
+
+def filled_on_completion(store):
+    # Without a record of it, a completed standard whose hours spent equal its
+    # total hours was most likely ticked complete rather than studied to them
+    return {standard['id'] for _, standard in store.iter_standards()
+            if standard['completed'] and standard['hoursSpent'] == standard['totalHours']}
+
+# Rebuilt when the corpus manifest changes, e.g. once word counts come in
+if 'hour_estimator' not in st.session_state or st.session_state.hour_estimator.documents is not catalog.documents:
+    st.session_state.hour_estimator = new_hour_estimator()
+
+# Standards whose hours spent were filled in from their total hours when ticked
+# complete; calibrating on them would fit the estimate to itself
+if 'filled_hours' not in st.session_state:
+    filled_hours = st.session_state.saved_settings.get('filled_hours')
+    st.session_state.filled_hours = (set(filled_hours) if filled_hours is not None
+                                     else filled_on_completion(st.session_state.store))
+
+# Hours the estimator wrote, by standard id; any other value was set by hand
+# (or came with an import) and is left alone
+if 'estimated_hours' not in st.session_state:
+    st.session_state.estimated_hours = st.session_state.saved_settings.get('estimated_hours', {})
+
 # Helper functions
+def get_metrics_snapshot():
+    return st.session_state.metrics.snapshot()
+
 def get_total_standards():
-    return sum(len([s for s in cat['standards'] if not s['completed']]) for cat in st.session_state.categories)
+    return st.session_state.metrics.incomplete_standards
 
 def get_completed_standards():
-    return sum(len([s for s in cat['standards'] if s['completed']]) for cat in st.session_state.categories)
+    return st.session_state.metrics.completed_standards
 
 def get_total_hours():
-    return sum(sum(s['totalHours'] for s in cat['standards']) for cat in st.session_state.categories)
+    return st.session_state.metrics.total_hours
 
 def get_completed_hours():
-    return sum(sum(s['hoursSpent'] for s in cat['standards']) for cat in st.session_state.categories)
+    return st.session_state.metrics.completed_hours
 
 def get_remaining_hours():
-    return get_total_hours() - get_completed_hours()
+    metrics = st.session_state.metrics
+    return metrics.total_hours - metrics.completed_hours
 
 def get_total_weekly_hours():
     return sum(st.session_state.daily_study_hours)
@@ -150,9 +263,8 @@ def get_required_daily_hours():
     return get_remaining_hours() / days
 
 def can_complete_with_current_schedule():
-    weeks_remaining = get_days_remaining() / 7
-    total_hours_available = get_total_weekly_hours() * weeks_remaining
-    return total_hours_available >= get_remaining_hours()
+    # Agree with the timeline: every standard got a slot in the generated plan
+    return st.session_state.plan_summary['unscheduled'] == 0
 
 def get_efficiency_score():
     total_weekly_hours = get_total_weekly_hours()
@@ -174,175 +286,313 @@ def get_efficiency_score():
 def get_date_x_days_from_today(days):
     return datetime.now() + timedelta(days=days)
 
+def mark_hours_filled(standard_id, filled):
+    filled_hours = st.session_state.filled_hours
+    if (standard_id in filled_hours) != filled:
+        (filled_hours.add if filled else filled_hours.discard)(standard_id)
+        st.session_state.state_db.save_setting('filled_hours', sorted(filled_hours))
+
 def toggle_standard_completion(category_id, standard_id):
-    for cat in st.session_state.categories:
-        if cat['id'] == category_id:
-            for standard in cat['standards']:
-                if standard['id'] == standard_id:
-                    standard['completed'] = not standard['completed']
-                    if standard['completed']:
-                        standard['hoursSpent'] = standard['totalHours']
-                    break
-            break
-    # Regenerate study plan
-    st.session_state.study_plan = generate_study_plan()
+    store = st.session_state.store
+    standard = store.get(standard_id)
+    completed = not standard['completed']
+    if completed:
+        standard = store.update(standard_id, completed=True, hoursSpent=standard['totalHours'])
+        mark_hours_filled(standard_id, True)
+    else:
+        standard = store.update(standard_id, completed=False)
+    # Reschedule just this standard and the ones after it
+    reschedule_standard(store.category(category_id), standard)
 
 def update_hours_spent(category_id, standard_id, hours):
-    for cat in st.session_state.categories:
-        if cat['id'] == category_id:
-            for standard in cat['standards']:
-                if standard['id'] == standard_id:
-                    standard['hoursSpent'] = max(0, hours)
-                    standard['completed'] = standard['hoursSpent'] >= standard['totalHours']
-                    break
-            break
-    # Regenerate study plan
-    st.session_state.study_plan = generate_study_plan()
+    store = st.session_state.store
+    hours_spent = max(0, hours)
+    mark_hours_filled(standard_id, False)
+    standard = store.update(
+        standard_id,
+        hoursSpent=hours_spent,
+        completed=hours_spent >= store.get(standard_id)['totalHours']
+    )
+    reschedule_standard(store.category(category_id), standard)
 
 def update_priority(category_id, standard_id, priority):
-    for cat in st.session_state.categories:
-        if cat['id'] == category_id:
-            for standard in cat['standards']:
-                if standard['id'] == standard_id:
-                    standard['priority'] = priority
-                    break
-            break
-    # Regenerate study plan
-    st.session_state.study_plan = generate_study_plan()
+    store = st.session_state.store
+    standard = store.update(standard_id, priority=priority)
+    reschedule_standard(store.category(category_id), standard)
 
 def update_notes(category_id, standard_id, notes):
-    for cat in st.session_state.categories:
-        if cat['id'] == category_id:
-            for standard in cat['standards']:
-                if standard['id'] == standard_id:
-                    standard['notes'] = notes
-                    break
-            break
+    st.session_state.store.update(standard_id, notes=notes)
 
 def update_scheduled_date(category_id, standard_id, date_value):
-    for cat in st.session_state.categories:
-        if cat['id'] == category_id:
-            for standard in cat['standards']:
-                if standard['id'] == standard_id:
-                    standard['scheduledDate'] = date_value
-                    break
-            break
-    # Regenerate study plan
-    st.session_state.study_plan = generate_study_plan()
+    store = st.session_state.store
+    standard = store.update(standard_id, scheduledDate=date_value)
+    reschedule_standard(store.category(category_id), standard)
 
 def toggle_category_expansion(category_id):
-    for cat in st.session_state.categories:
-        if cat['id'] == category_id:
-            cat['expanded'] = not cat['expanded']
-            break
+    store = st.session_state.store
+    category = store.category(category_id)
+    category['expanded'] = not category['expanded']
+    st.session_state.state_db.save_category(category, store.categories.index(category))
+
+def filter_and_sort_standards(standards):
+    if st.session_state.filter_criteria == "priority":
+        standards = [s for s in standards if s['priority'] == "high"]
+    elif st.session_state.filter_criteria == "incomplete":
+        standards = [s for s in standards if not s['completed']]
+    
+    if st.session_state.sort_order == "priority":
+        priority_order = {"high": 0, "medium": 1, "low": 2, "completed": 3}
+        standards = sorted(standards, key=lambda s: priority_order.get(s['priority'], 4))
+    elif st.session_state.sort_order == "difficulty":
+        difficulty_order = {"high": 0, "medium": 1, "low": 2, "completed": 3}
+        standards = sorted(standards, key=lambda s: difficulty_order.get(s['difficulty'], 4))
+    return standards
+
+def standards_table(standards_by_category):
+    # One row per standard for the bulk editor, indexed by standard id
+    rows = []
+    for category, standards in standards_by_category:
+        for standard in standards:
+            rows.append({
+                'id': standard['id'],
+                'Category': category['name'],
+                'Standard': standard['name'],
+                'Completed': standard['completed'],
+                'Hours Spent': float(standard['hoursSpent']),
+                'Total Hours': standard['totalHours'],
+                'Priority': standard['priority'],
+                'Difficulty': standard['difficulty']
+            })
+    return pd.DataFrame(rows, columns=['id', 'Category', 'Standard', 'Completed', 'Hours Spent',
+                                       'Total Hours', 'Priority', 'Difficulty']).set_index('id')
+
+def apply_table_edits(original, edited):
+    store = st.session_state.store
+    changed = (original['Hours Spent'] != edited['Hours Spent']) | (original['Completed'] != edited['Completed'])
+    for standard_id in edited.index[changed]:
+        # The edited row decides both fields, applied in one update, the way
+        # the hours input and the checkbox each decide them on their own
+        standard = store.get(standard_id)
+        hours_spent = max(0.0, float(edited.at[standard_id, 'Hours Spent']))
+        completed = bool(edited.at[standard_id, 'Completed'])
+        filled = False
+        if completed == bool(original.at[standard_id, 'Completed']):
+            completed = hours_spent >= standard['totalHours']
+        elif completed and hours_spent == original.at[standard_id, 'Hours Spent']:
+            hours_spent = max(hours_spent, standard['totalHours'])
+            filled = True
+        if hours_spent != original.at[standard_id, 'Hours Spent']:
+            mark_hours_filled(standard_id, filled)
+        standard = store.update(standard_id, hoursSpent=hours_spent, completed=completed)
+        reschedule_standard(store.category_of(standard_id), standard)
 
 def select_standard(category_id, standard_id):
-    for cat in st.session_state.categories:
-        if cat['id'] == category_id:
-            for standard in cat['standards']:
-                if standard['id'] == standard_id:
-                    st.session_state.selected_standard = {
-                        **standard,
-                        'categoryId': category_id
-                    }
-                    break
-            break
+    st.session_state.selected_standard = {
+        **st.session_state.store.get(standard_id),
+        'categoryId': category_id
+    }
 
 def generate_study_plan():
-    # Get incomplete standards
-    incomplete_standards = []
-    for category in st.session_state.categories:
-        for standard in category['standards']:
-            if not standard['completed']:
-                incomplete_standards.append({
-                    **standard,
-                    'categoryId': category['id'],
-                    'categoryName': category['name']
-                })
-    
-    # Sort by priority (high, medium, low)
-    priority_order = {'high': 0, 'medium': 1, 'low': 2}
-    difficulty_order = {'high': 0, 'medium': 1, 'low': 2}
-    
-    incomplete_standards.sort(key=lambda s: (
-        priority_order.get(s['priority'], 3),
-        difficulty_order.get(s['difficulty'], 3)
-    ))
-    
-    # Calculate total study days available based on daily schedule
-    days_remaining = get_days_remaining()
-    total_study_days = 0
-    for i in range(days_remaining):
-        day_of_week = (datetime.now().weekday() + i) % 7
-        if st.session_state.daily_study_hours[day_of_week] > 0:
-            total_study_days += 1
-    
-    # Now assign dates to each standard
-    current_day = 0
-    current_day_hours_remaining = 0
-    
-    plan = []
-    
-    for standard in incomplete_standards:
-        hours_needed = standard['totalHours'] - standard['hoursSpent']
-        if hours_needed <= 0:
+    now = datetime.now()
+    days_remaining = (st.session_state.exam_date - now).days
+    planner = IncrementalPlanner(
+        st.session_state.store.categories,
+        st.session_state.daily_study_hours,
+        days_remaining,
+        start=now,
+        mode=st.session_state.planning_mode,
+        reviews=st.session_state.reviews.due(st.session_state.exam_date.date()),
+        dependencies=dependencies,
+        clusters=clusters
+    )
+    st.session_state.planner = planner
+    st.session_state.plan_summary = planner.summary
+    # A full rebuild covers anything still queued
+    st.session_state.plan_edits.clear()
+    return planner.plan
+
+def reschedule_standard(category, standard):
+    # Queued, and applied with the rest of this rerun's edits
+    st.session_state.plan_edits.standard_changed(category, standard)
+
+def request_plan_rebuild():
+    st.session_state.plan_edits.rebuild_needed()
+
+def apply_hour_estimates():
+    # Standards still to study get their hours from the length of their PDF, at
+    # the reading rate of the standards completed so far, and their days from
+    # the average study day. The rate is refitted when an edit may have changed
+    # it; every standard is looked at when the rate or the weekly hours change,
+    # otherwise only the ones edited in this rerun. Hours set by hand are kept.
+    store = st.session_state.store
+    estimator = st.session_state.hour_estimator
+    estimated = st.session_state.estimated_hours
+    edited = st.session_state.plan_edits.standards
+    if estimator.calibrated_ids is None or any(
+            store.get(standard_id)['completed'] or standard_id in estimator.calibrated_ids for standard_id in edited):
+        filled_hours = st.session_state.filled_hours
+        estimator.calibrate(standard for _, standard in store.iter_standards() if standard['id'] not in filled_hours)
+    applied_for = (estimator, estimator.words_per_hour, tuple(st.session_state.daily_study_hours))
+    if st.session_state.get('estimates_applied_for') == applied_for:
+        standard_ids = list(edited)
+    else:
+        standard_ids = [standard['id'] for _, standard in store.iter_standards()]
+        st.session_state.estimates_applied_for = applied_for
+
+    study_days = [hours for hours in st.session_state.daily_study_hours if hours > 0]
+    hours_per_day = sum(study_days) / len(study_days) if study_days else 0
+    catalog_hours = {standard['id']: standard['totalHours']
+                     for category in catalog.categories for standard in category['standards']}
+
+    changed = False
+    for standard_id in standard_ids:
+        standard = store.get(standard_id)
+        hours = None if standard['completed'] else estimator.hours(standard)
+        if hours is None or standard['totalHours'] != estimated.get(standard_id, catalog_hours.get(standard_id)):
             continue
-        
-        days_needed = standard['recommendedDays']
-        start_day = current_day
-        end_day = current_day
-        scheduled_date = None
-        
-        # Look for the first available day
-        while True:
-            if current_day >= days_remaining:
-                break
-            
-            day_of_week = (datetime.now().weekday() + current_day) % 7
-            
-            if st.session_state.daily_study_hours[day_of_week] > 0:
-                # If we're starting a new standard and have no hours yet allocated
-                if current_day_hours_remaining == 0:
-                    current_day_hours_remaining = st.session_state.daily_study_hours[day_of_week]
-                    scheduled_date = get_date_x_days_from_today(current_day)
-                
-                # We found a day with study hours
-                end_day = current_day
-                
-                # If we've allocated enough days, break
-                if end_day - start_day + 1 >= days_needed:
-                    break
-                
-                # Otherwise, move to next day
-                current_day += 1
-                current_day_hours_remaining = 0
-            else:
-                # No study hours on this day, move to next
-                current_day += 1
-        
-        plan.append({
-            **standard,
-            'startDate': scheduled_date,
-            'endDate': get_date_x_days_from_today(end_day),
-            'daysNeeded': days_needed
-        })
-    
-    return plan
+        days = estimator.days(hours, hours_per_day)
+        if hours != standard['totalHours'] or days != standard['recommendedDays']:
+            standard = store.update(standard_id, totalHours=hours, recommendedDays=days)
+            reschedule_standard(store.category_of(standard_id), standard)
+        if estimated.get(standard_id) != hours:
+            estimated[standard_id] = hours
+            changed = True
+    if changed:
+        st.session_state.state_db.save_setting('estimated_hours', estimated)
+
+def apply_plan_edits():
+    # Update the plan once for everything edited so far in this rerun
+    apply_hour_estimates()
+    edits = st.session_state.plan_edits
+    if not edits:
+        return
+
+    planner = st.session_state.get('planner')
+    now = datetime.now()
+    days_remaining = (st.session_state.exam_date - now).days
+
+    # Fall back to a full rebuild when the calendar itself has changed
+    if (edits.rebuild
+            or planner is None
+            or not planner.matches(st.session_state.daily_study_hours, days_remaining, now, st.session_state.planning_mode)
+            or not planner.update_standards(edits.changes())):
+        st.session_state.study_plan = generate_study_plan()
+        return
+
+    st.session_state.study_plan = planner.plan
+    st.session_state.plan_summary = planner.summary
+    edits.clear()
+
+def sync_reviews(store):
+    # Completed standards without a review yet are due today; reviews of
+    # standards that are no longer completed are dropped
+    reviews = st.session_state.reviews
+    db = st.session_state.state_db
+    completed = set()
+    for _, standard in store.iter_standards():
+        if standard['completed']:
+            completed.add(standard['id'])
+            if standard['id'] not in reviews:
+                db.save_review(standard['id'], reviews.add(standard['id'], date.today()))
+    for standard_id in [standard_id for standard_id in reviews.states if standard_id not in completed]:
+        reviews.remove(standard_id)
+        db.delete_review(standard_id)
+
+def track_reviews(store):
+    # Completing a standard schedules its first review for tomorrow
+    def review_change(category_id, previous, current):
+        if current is None:
+            return
+        was_completed = previous is not None and previous['completed']
+        if current['completed'] and not was_completed:
+            state = st.session_state.reviews.add(current['id'], date.today() + timedelta(days=1))
+            st.session_state.state_db.save_review(current['id'], state)
+            request_plan_rebuild()
+        elif was_completed and not current['completed']:
+            st.session_state.reviews.remove(current['id'])
+            st.session_state.state_db.delete_review(current['id'])
+            request_plan_rebuild()
+    store.subscribe(review_change)
+
+def record_review(standard_id, grade):
+    state = st.session_state.reviews.record(standard_id, REVIEW_GRADES[grade], date.today())
+    st.session_state.state_db.save_review(standard_id, state)
+    request_plan_rebuild()
+
+def restore_state(categories, settings):
+    db = st.session_state.state_db
+
+    st.session_state.categories = categories
+    st.session_state.store = StandardStore(categories)
+    st.session_state.metrics = CatalogMetrics(st.session_state.store)
+    db.save_catalog(categories)
+    db.track(st.session_state.store)
+    sync_reviews(st.session_state.store)
+    track_reviews(st.session_state.store)
+    st.session_state.filled_hours = filled_on_completion(st.session_state.store)
+    db.save_setting('filled_hours', sorted(st.session_state.filled_hours))
+    st.session_state.hour_estimator = new_hour_estimator()
+
+    st.session_state.exam_date = restored_exam_date(settings['exam_date'])
+    st.session_state.daily_study_hours = settings['daily_study_hours']
+    db.save_setting('exam_date', st.session_state.exam_date.isoformat())
+    db.save_setting('daily_study_hours', settings['daily_study_hours'])
+    if settings.get('planning_mode') in PLANNING_MODES:
+        st.session_state.planning_mode = settings['planning_mode']
+        db.save_setting('planning_mode', settings['planning_mode'])
+
+    # Keyed widgets still hold the old values and would write them back
+    for key in list(st.session_state.keys()):
+        if key.startswith(("cb_", "priority_", "date_", "notes_")):
+            del st.session_state[key]
+
+    st.session_state.selected_standard = None
+    st.session_state.study_plan = generate_study_plan()
+
+@st.cache_resource
+def load_search_index(directory, modified):
+    # `modified` only keys the cache, so a rebuilt index gets picked up
+    return SearchIndex.load(directory)
+
+def get_search_index():
+    if not SearchIndex.exists(SEARCH_INDEX_DIR):
+        return None
+    return load_search_index(SEARCH_INDEX_DIR, os.path.getmtime(os.path.join(SEARCH_INDEX_DIR, POSTINGS_FILE)))
+
+# Completed standards come back for spaced reviews
+if 'reviews' not in st.session_state:
+    st.session_state.reviews = ReviewQueue(st.session_state.state_db.load_reviews())
+    sync_reviews(st.session_state.store)
+    track_reviews(st.session_state.store)
+
+# Make sure the Overview has a real allocation to report on
+if 'plan_summary' not in st.session_state:
+    apply_hour_estimates()
+    st.session_state.study_plan = generate_study_plan()
 
 # Main app title
 st.title("📚 Accounting Standards Study Plan")
 
+# Room left in open Standard Details panels for their pin conflict, by standard id
+pin_warnings = {}
+
 # Create tabs
 tab1, tab2, tab3, tab4 = st.tabs(["Overview", "Standards", "Timeline", "Analytics"])
 
 # Overview Tab
 with tab1:
     st.header("Overview")
+
+    metrics = get_metrics_snapshot()
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📅 Exam Countdown")
+
+        if 'passed_exam_date' in st.session_state:
+            st.warning(f"Your exam date, {st.session_state.passed_exam_date.strftime('%b %d, %Y')}, has passed. "
+                       "Pick your next exam date to plan towards it.")
         
         # Exam date picker
         exam_date = st.date_input(
@@ -355,7 +605,9 @@ with tab1:
         # Update exam date in session state
         if exam_date != st.session_state.exam_date.date():
             st.session_state.exam_date = datetime.combine(exam_date, datetime.min.time())
-            st.session_state.study_plan = generate_study_plan()
+            st.session_state.state_db.save_setting('exam_date', st.session_state.exam_date.isoformat())
+            st.session_state.pop('passed_exam_date', None)
+            request_plan_rebuild()
         
         days_remaining = get_days_remaining()
         st.metric("Days Remaining", days_remaining)
@@ -365,12 +617,17 @@ with tab1:
         
         col_a, col_b = st.columns(2)
         with col_a:
-            st.metric("Total Hours", get_total_hours())
-            st.metric("Hours Remaining", get_remaining_hours())
+            st.metric("Total Hours", metrics['totalHours'])
+            st.metric("Hours Remaining", metrics['remainingHours'])
         
         with col_b:
-            st.metric("Hours Completed", get_completed_hours())
+            st.metric("Hours Completed", metrics['completedHours'])
             st.metric("Daily Required", f"{get_required_daily_hours():.1f}")
+
+        estimator = st.session_state.hour_estimator
+        st.caption(f"Hours are estimated from each standard's PDF at {estimator.words_per_hour:,.0f} words an hour, "
+                   f"calibrated on the hours spent on {estimator.calibrated_on} completed standards, starting from "
+                   f"the catalog's {estimator.prior:,.0f}. Hours you set yourself are kept.")
     
     st.subheader("📊 Progress Overview")
     
@@ -378,17 +635,33 @@ with tab1:
     col3, col4 = st.columns(2)
     
     with col3:
-        total_standards = get_total_standards() + get_completed_standards()
-        completed_standards = get_completed_standards()
+        total_standards = metrics['incompleteStandards'] + metrics['completedStandards']
+        completed_standards = metrics['completedStandards']
         st.write(f"Standards Completed: {completed_standards} / {total_standards}")
         st.progress(completed_standards / total_standards if total_standards > 0 else 0)
     
     with col4:
-        total_hours = get_total_hours()
-        completed_hours = get_completed_hours()
+        total_hours = metrics['totalHours']
+        completed_hours = metrics['completedHours']
         st.write(f"Hours Completed: {completed_hours} / {total_hours}")
         st.progress(completed_hours / total_hours if total_hours > 0 else 0)
     
+    # Reviews of completed standards that are due, oldest first
+    due_reviews = st.session_state.reviews.due(date.today())
+    if due_reviews:
+        st.subheader("🔁 Reviews Due")
+        for standard_id, due_date in due_reviews:
+            standard = st.session_state.store.get(standard_id)
+            overdue = (date.today() - due_date).days
+            col_name, *col_grades = st.columns([4, 1, 1, 1, 1])
+            with col_name:
+                st.write(f"{standard['name']}" + (f" ({overdue} days overdue)" if overdue > 0 else ""))
+            for grade, col in zip(REVIEW_GRADES, col_grades):
+                with col:
+                    if st.button(grade.title(), key=f"review_{grade}_{standard_id}"):
+                        record_review(standard_id, grade)
+                        st.rerun()
+    
     # Study Efficiency
     st.subheader("⚡ Study Efficiency")
     
@@ -397,39 +670,26 @@ with tab1:
     col5, col6 = st.columns([1, 3])
     with col5:
         # Create a gauge chart for efficiency score
-        efficiency_color = "green" if efficiency_score >= 85 else "orange" if efficiency_score >= 60 else "red"
-        
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=efficiency_score,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Efficiency Score"},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': efficiency_color},
-                'steps': [
-                    {'range': [0, 60], 'color': "lightgray"},
-                    {'range': [60, 85], 'color': "lightgray"},
-                    {'range': [85, 100], 'color': "lightgray"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 60
-                }
-            }
-        ))
-        
-        fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
+        fig = st.session_state.figure_cache.get('efficiency', (efficiency_score,), efficiency_gauge)
         st.plotly_chart(fig, use_container_width=True)
     
     with col6:
+        plan_summary = st.session_state.plan_summary
+
         if can_complete_with_current_schedule():
             st.success("✅ Your schedule has enough time to complete all standards before the exam!")
         else:
-            st.error("⚠️ Warning: Your current schedule doesn't provide enough study time!")
-            additional_hours = get_remaining_hours() / (days_remaining / 7) - get_total_weekly_hours()
-            st.warning(f"Suggestion: To complete all standards, you need {additional_hours:.1f} more hours per week")
+            st.error(f"⚠️ Warning: Your current schedule doesn't provide enough study time! {plan_summary['unscheduled']} standards don't fit before the exam.")
+            if days_remaining > 0:
+                additional_hours = plan_summary['unscheduledHours'] / (days_remaining / 7)
+                st.warning(f"Suggestion: To complete all standards, you need {additional_hours:.1f} more hours per week")
+
+        col_c, col_d = st.columns(2)
+        with col_c:
+            finish_date = plan_summary['finishDate']
+            st.metric("Earliest Finish", finish_date.strftime("%b %d") if finish_date else "N/A")
+        with col_d:
+            st.metric("Unused Capacity", f"{plan_summary['unusedHours']:.1f} hrs")
     
     # Weekly Study Schedule
     st.subheader("📖 Weekly Study Schedule")
@@ -437,21 +697,24 @@ with tab1:
     days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     
     col_days = st.columns(7)
+    weekly_hours = []
     for i, (day, col) in enumerate(zip(days, col_days)):
         with col:
             st.write(day[:3])
-            hours = st.number_input(
+            weekly_hours.append(st.number_input(
                 f"Hours {day}",
                 min_value=0.0,
                 max_value=24.0,
                 value=float(st.session_state.daily_study_hours[i]),
                 step=0.5,
                 label_visibility="collapsed"
-            )
-            
-            if hours != st.session_state.daily_study_hours[i]:
-                st.session_state.daily_study_hours[i] = hours
-                st.session_state.study_plan = generate_study_plan()
+            ))
+    
+    # Any number of changed weekdays is one save and one rebuild
+    if weekly_hours != st.session_state.daily_study_hours:
+        st.session_state.daily_study_hours = weekly_hours
+        st.session_state.state_db.save_setting('daily_study_hours', weekly_hours)
+        request_plan_rebuild()
     
     st.info(f"Weekly Total: {get_total_weekly_hours()} hours")
 
@@ -485,32 +748,90 @@ with tab2:
         
         if sort_order != st.session_state.sort_order:
             st.session_state.sort_order = sort_order
+
+    # Full-text search over the standard PDFs
+    search_query = st.text_input("🔎 Search the standards", placeholder="e.g. qualifying asset borrowing costs")
+    if search_query:
+        search_index = get_search_index()
+        if search_index is None:
+            st.info("The search index hasn't been built yet. Run `python -m studyplan.search` in the app folder to build it.")
+        else:
+            search_started = time.perf_counter()
+            search_results = search_index.search(search_query, limit=20)
+            st.caption(f"{len(search_results)} matching paragraphs in {(time.perf_counter() - search_started) * 1000:.1f} ms")
+
+            for result in search_results:
+                result_name = st.session_state.store.get(result['standardId'])['name'] if result['standardId'] in st.session_state.store else result['file']
+                location = f"page {result['page']}" + (f", paragraph {result['paragraph']}" if result['paragraph'] else "")
+                st.markdown(f"**{result_name}** · {location}")
+                st.caption(result['snippet'])
     
     # Display categories and standards
-    for category in st.session_state.categories:
-        # Filter standards
-        filtered_standards = category['standards']
-        
-        if st.session_state.filter_criteria == "priority":
-            filtered_standards = [s for s in filtered_standards if s['priority'] == "high"]
-        elif st.session_state.filter_criteria == "incomplete":
-            filtered_standards = [s for s in filtered_standards if not s['completed']]
+    store = st.session_state.store
+    standards_by_category = []
+    for category in store.categories:
+        filtered_standards = filter_and_sort_standards(store.standards_in(category['id']))
+        if len(filtered_standards) > 0:
+            standards_by_category.append((category, filtered_standards))
+
+    standards_view = st.radio(
+        "View",
+        options=["cards", "table"],
+        format_func=lambda x: {"cards": "Cards", "table": "Table (bulk edit hours)"}[x],
+        horizontal=True,
+        key="standards_view"
+    )
+
+    if standards_view == "table":
+        # A single editable grid instead of a set of widgets per standard
+        standards_table_data = standards_table(standards_by_category)
+        edited_table = st.data_editor(
+            standards_table_data,
+            column_config={
+                'Hours Spent': st.column_config.NumberColumn(min_value=0.0, step=0.5),
+            },
+            disabled=['Category', 'Standard', 'Total Hours', 'Priority', 'Difficulty'],
+            hide_index=True,
+            use_container_width=True,
+            # Edits are kept by row position, so a different set or order of rows
+            # needs a fresh editor
+            key=f"standards_editor_{hash(tuple(standards_table_data.index))}"
+        )
+        apply_table_edits(standards_table_data, edited_table)
+
+    # The cards view builds widgets only for expanded categories
+    card_categories = standards_by_category if standards_view == "cards" else []
+    for category, filtered_standards in card_categories:
+        # Category header
+        expanded = st.toggle(
+            f"{category['name']} ({sum(1 for s in filtered_standards if s['completed'])} / {len(filtered_standards)})",
+            value=category['expanded'],
+            key=f"expand_{category['id']}"
+        )
         
-        # Sort standards
-        if st.session_state.sort_order == "priority":
-            priority_order = {"high": 0, "medium": 1, "low": 2, "completed": 3}
-            filtered_standards = sorted(filtered_standards, key=lambda s: priority_order.get(s['priority'], 4))
-        elif st.session_state.sort_order == "difficulty":
-            difficulty_order = {"high": 0, "medium": 1, "low": 2, "completed": 3}
-            filtered_standards = sorted(filtered_standards, key=lambda s: difficulty_order.get(s['difficulty'], 4))
+        if expanded != category['expanded']:
+            toggle_category_expansion(category['id'])
         
-        if len(filtered_standards) == 0:
+        if not expanded:
             continue
         
-        # Category header with expander
-        with st.expander(f"{category['name']} ({sum(1 for s in filtered_standards if s['completed'])} / {len(filtered_standards)})", expanded=category['expanded']):
-            # Loop through standards in this category
-            for standard in filtered_standards:
+        # Only the current page of standards gets widgets
+        page_count = (len(filtered_standards) + STANDARDS_PER_PAGE - 1) // STANDARDS_PER_PAGE
+        page = 1
+        if page_count > 1:
+            page = st.number_input(
+                f"Page (of {page_count})",
+                min_value=1,
+                max_value=page_count,
+                value=1,
+                step=1,
+                key=f"page_{category['id']}"
+            )
+        page_standards = filtered_standards[(page - 1) * STANDARDS_PER_PAGE:page * STANDARDS_PER_PAGE]
+        
+        with st.container(border=True):
+            # Loop through standards on this page
+            for standard in page_standards:
                 st.write("---")  # Divider between standards
                 
                 # Main standard info row
@@ -570,10 +891,7 @@ with tab2:
                 
                 # Show Edit Details button
                 if st.button("Edit Details", key=f"edit_{standard['id']}"):
-                    st.session_state.selected_standard = {
-                        **standard,
-                        'categoryId': category['id']
-                    }
+                    select_standard(category['id'], standard['id'])
                 
                 # Check if this standard is selected and show details
                 if st.session_state.selected_standard and st.session_state.selected_standard['id'] == standard['id']:
@@ -592,12 +910,19 @@ with tab2:
                         if priority != standard['priority']:
                             update_priority(category['id'], standard['id'], priority)
                         
-                        # Scheduled date
+                        # Scheduled date, kept between today and the exam so a pin
+                        # that has passed (or an exam moved earlier) still opens
+                        earliest = datetime.now().date()
+                        latest = max(earliest, st.session_state.exam_date.date())
+                        pinned_date = standard['scheduledDate'].date() if standard['scheduledDate'] else None
+                        if pinned_date is not None and not earliest <= pinned_date <= latest:
+                            st.caption(f"Was pinned to {pinned_date.strftime('%b %d, %Y')}, outside the days left before the exam.")
+                            pinned_date = min(max(pinned_date, earliest), latest)
                         scheduled_date = st.date_input(
                             "Scheduled Date (when you plan to study this)",
-                            value=standard['scheduledDate'].date() if standard['scheduledDate'] else None,
-                            min_value=datetime.now().date(),
-                            max_value=st.session_state.exam_date.date(),
+                            value=pinned_date,
+                            min_value=earliest,
+                            max_value=latest,
                             key=f"date_{standard['id']}",
                             help="Set a specific date when you plan to study this standard"
                         )
@@ -607,6 +932,23 @@ with tab2:
                             scheduled_date_dt = datetime.combine(scheduled_date, datetime.min.time())
                             if standard['scheduledDate'] != scheduled_date_dt:
                                 update_scheduled_date(category['id'], standard['id'], scheduled_date_dt)
+                        elif standard['scheduledDate'] is not None:
+                            # Date cleared, let the planner place it again
+                            update_scheduled_date(category['id'], standard['id'], None)
+
+                        # Filled in once this rerun's edits, this pin included, are applied
+                        pin_warnings[standard['id']] = st.empty()
+
+                        # What its PDF cites more than it is cited back
+                        store = st.session_state.store
+                        prerequisites = [
+                            store.get(prerequisite_id)['name'] if prerequisite_id in store else prerequisite_id
+                            for prerequisite_id, _ in dependencies.prerequisites(standard['id'])
+                        ]
+                        if prerequisites:
+                            st.caption("Builds on: " + ", ".join(prerequisites))
+                        if clusters.name(standard['id']):
+                            st.caption(f"Studied with: {clusters.name(standard['id'])}")
                         
                         # Notes
                         notes = st.text_area(
@@ -627,16 +969,58 @@ with tab2:
 with tab3:
     st.header("Timeline")
     
-    st.info("📆 This shows your recommended study schedule based on your weekly availability. Green blocks are standards you haven't started, blue blocks are standards you've started but not completed.")
+    st.info("📆 This shows your recommended study schedule based on your weekly availability. Green blocks are standards you haven't started, blue blocks are standards you've started but not completed, and orange blocks are reviews of completed standards.")
     
     # Generate study plan if not already done
     if len(st.session_state.study_plan) == 0:
         st.session_state.study_plan = generate_study_plan()
     
+    # Scheduling mode
+    planning_mode = st.radio(
+        "Scheduling Mode",
+        options=list(PLANNING_MODES),
+        format_func=lambda x: PLANNING_MODES[x],
+        index=list(PLANNING_MODES).index(st.session_state.planning_mode),
+        horizontal=True,
+        help="Pack by hours fills each day's study hours across several standards. Recommended days gives each standard its recommended number of study days. Maximize priority coverage packs by hours, but first picks the standards that fit before the exam and cover the most priority, high counting four times as much as low; if picking them takes too long, it falls back to plain priority order. Prerequisites first packs by hours, but studies the standards each one cites before it. Related standards together packs by hours, one cluster of related standards after another."
+    )
+
+    if planning_mode != st.session_state.planning_mode:
+        st.session_state.planning_mode = planning_mode
+        st.session_state.state_db.save_setting('planning_mode', planning_mode)
+        request_plan_rebuild()
+
     # Regenerate button
     if st.button("🔄 Regenerate Timeline"):
-        st.session_state.study_plan = generate_study_plan()
-    
+        request_plan_rebuild()
+
+    # Everything edited above this point, in any tab, updates the plan once here
+    apply_plan_edits()
+    for conflict in st.session_state.plan_summary['conflicts']:
+        if conflict['id'] in pin_warnings:
+            pin_warnings[conflict['id']].warning(
+                f"This date can't be kept ({conflict['reason']}), so the standard is planned with the others instead."
+            )
+
+    # Pinned dates that couldn't be honored
+    for conflict in st.session_state.plan_summary['conflicts']:
+        st.warning(f"📌 {conflict['name']} is pinned to {conflict['scheduledDate'].strftime('%b %d')} but {conflict['reason']}.")
+
+    if planning_mode == 'prerequisites':
+        st.caption(f"Ordered by {dependencies.edge_count} prerequisite links between {len(dependencies)} standards, found in their PDFs.")
+    elif planning_mode == 'clusters':
+        st.caption(f"Grouped into {len(clusters)} clusters of related standards, from the study guide and the similarity of their PDFs.")
+
+    if st.session_state.plan_summary['fallback']:
+        st.info("⏱️ Optimization ran out of time, so this is the priority-ordered plan instead.")
+
+    # Standards that didn't make it before the exam, and why
+    unscheduled = [item for item in st.session_state.study_plan if item['startDate'] is None]
+    if unscheduled:
+        with st.expander(f"Not scheduled before the exam ({len(unscheduled)})"):
+            for item in unscheduled:
+                st.write(f"• {item['name']}: {item['unscheduledReason']}")
+
     # Create a timeline visualization
     if len(st.session_state.study_plan) > 0:
         # Create timeline weeks marks
@@ -653,167 +1037,14 @@ with tab3:
                     'label': f"Week {i}"
                 })
         
-        # Create category items for the timeline
-        timeline_data = []
-        y_position = 0
-        
-        for category_id in range(1, 9):  # Assuming 8 categories
-            category_items = [item for item in st.session_state.study_plan if item['categoryId'] == category_id]
-            
-            if not category_items:
-                continue
-                
-            # Find category name
-            category_name = next((cat['name'] for cat in st.session_state.categories if cat['id'] == category_id), f"Category {category_id}")
-            
-            # Add category to timeline data
-            timeline_data.append({
-                'type': 'category',
-                'name': category_name,
-                'y_position': y_position
-            })
-            
-            y_position += 1
-            
-            # Add standard items to timeline data
-            for item in category_items:
-                if not item['startDate'] or not item['endDate']:
-                    continue
-                
-                # Determine color based on status
-                color = "rgba(52, 152, 219, 0.7)" if item['hoursSpent'] > 0 else "rgba(46, 204, 113, 0.7)"  # Blue if started, green if not
-                
-                timeline_data.append({
-                    'type': 'standard',
-                    'name': item['name'].split(' - ')[0],
-                    'start_date': item['startDate'].date(),
-                    'end_date': item['endDate'].date(),
-                    'color': color,
-                    'y_position': y_position,
-                    'full_name': item['name'],
-                    'priority': item['priority'],
-                    'difficulty': item['difficulty'],
-                    'totalHours': item['totalHours'],
-                    'hoursSpent': item['hoursSpent']
-                })
-                
-                y_position += 1
-            
-            y_position += 1  # Add space between categories
-        
-        # Create the figure
-        fig = go.Figure()
-        
-        # Add weekly markers (vertical lines)
-        for week in week_markers:
-            fig.add_trace(go.Scatter(
-                x=[week['date'], week['date']],
-                y=[0, y_position],
-                mode='lines',
-                line=dict(color='gray', width=1, dash='dash'),
-                showlegend=False,
-                hoverinfo='none'
-            ))
-            
-            # Add week label at the top
-            fig.add_annotation(
-                x=week['date'],
-                y=0,
-                text=week['label'],
-                showarrow=False,
-                yanchor='bottom',
-                font=dict(size=10)
-            )
-        
-        # Add today marker (vertical line)
-        fig.add_trace(go.Scatter(
-            x=[datetime.now().date(), datetime.now().date()],
-            y=[0, y_position],
-            mode='lines',
-            line=dict(color='red', width=2),
-            showlegend=False,
-            hoverinfo='none'
-        ))
-        
-        # Add "Today" label
-        fig.add_annotation(
-            x=datetime.now().date(),
-            y=0,
-            text="Today",
-            showarrow=False,
-            yanchor='bottom',
-            font=dict(size=10, color='red')
-        )
-        
-        # Add exam date marker (vertical line)
-        fig.add_trace(go.Scatter(
-            x=[st.session_state.exam_date.date(), st.session_state.exam_date.date()],
-            y=[0, y_position],
-            mode='lines',
-            line=dict(color='purple', width=2),
-            showlegend=False,
-            hoverinfo='none'
-        ))
-        
-        # Add "Exam" label
-        fig.add_annotation(
-            x=st.session_state.exam_date.date(),
-            y=0,
-            text="Exam",
-            showarrow=False,
-            yanchor='bottom',
-            font=dict(size=10, color='purple')
-        )
-        
-        # Add items to the timeline
-        for item in timeline_data:
-            if item['type'] == 'category':
-                # Add category label
-                fig.add_annotation(
-                    x=datetime.now().date(),
-                    y=item['y_position'] + 0.5,
-                    text=item['name'],
-                    showarrow=False,
-                    xanchor='left',
-                    font=dict(size=12, color='black')
-                )
-            elif item['type'] == 'standard':
-                # Calculate duration in days
-                duration = (item['end_date'] - item['start_date']).days + 1
-                
-                # Add standard bar
-                fig.add_trace(go.Bar(
-                    x=[duration],
-                    y=[item['y_position']],
-                    orientation='h',
-                    base=item['start_date'],
-                    marker_color=item['color'],
-                    text=item['name'],
-                    textposition='inside',
-                    name=item['full_name'],
-                    hoverinfo='text',
-                    hovertext=f"{item['full_name']}<br>Priority: {item['priority']}<br>Difficulty: {item['difficulty']}<br>Hours needed: {item['totalHours']}<br>Hours spent: {item['hoursSpent']}"
-                ))
+        # Create category items for the timeline, one pass over the plan
+        timeline_data, y_position = timeline_items(st.session_state.study_plan, st.session_state.store.categories)
         
-        # Update layout
-        fig.update_layout(
-            title="Study Timeline",
-            xaxis=dict(
-                title="Date",
-                type='date',
-                tickformat="%b %d",
-                tickmode="auto",
-                nticks=10,
-            ),
-            yaxis=dict(
-                visible=False,
-                showticklabels=False
-            ),
-            height=max(500, y_position * 30),  # Dynamic height based on number of items
-            bargap=0.2,
-            bargroupgap=0.1,
-            showlegend=False,
-            margin=dict(l=150, r=20, t=40, b=20)
+        # Create the figure: one bar trace for every standard, markers as shapes
+        fig = st.session_state.figure_cache.get(
+            'timeline',
+            (timeline_data, week_markers, datetime.now().date(), st.session_state.exam_date.date(), y_position),
+            timeline_figure
         )
         
         st.plotly_chart(fig, use_container_width=True)
@@ -870,15 +1101,17 @@ with tab4:
     st.header("Analytics")
     
     st.info("📈 This section shows you the distribution of standards by category, priority, and difficulty. Use this to better plan your study approach.")
+
+    metrics = get_metrics_snapshot()
     
     # Time Distribution by Category
     st.subheader("Study Time Distribution by Category")
     
     # Prepare data
     category_hours = []
-    for cat in st.session_state.categories:
-        total_hours = sum(s['totalHours'] for s in cat['standards'])
-        completed_hours = sum(s['hoursSpent'] for s in cat['standards'])
+    for cat in st.session_state.store.categories:
+        total_hours = metrics['categoryHours'][cat['id']]['totalHours']
+        completed_hours = metrics['categoryHours'][cat['id']]['completedHours']
         
         if total_hours > 0:
             category_hours.append({
@@ -886,73 +1119,50 @@ with tab4:
                 'total_hours': total_hours,
                 'completed_hours': completed_hours,
                 'percent_completed': (completed_hours / total_hours) * 100 if total_hours > 0 else 0,
-                'percent_of_curriculum': (total_hours / get_total_hours()) * 100 if get_total_hours() > 0 else 0
+                'percent_of_curriculum': (total_hours / metrics['totalHours']) * 100 if metrics['totalHours'] > 0 else 0
             })
     
     # Sort by total hours
     category_hours.sort(key=lambda x: x['total_hours'], reverse=True)
     
     # Create horizontal bar chart
-    fig = go.Figure()
-    
-    # Add total hours bars
-    fig.add_trace(go.Bar(
-        y=[cat['name'] for cat in category_hours],
-        x=[cat['total_hours'] for cat in category_hours],
-        orientation='h',
-        name='Total Hours',
-        marker_color='rgba(55, 83, 109, 0.7)',
-        text=[f"{cat['total_hours']} hrs" for cat in category_hours],
-        textposition='auto'
-    ))
-    
-    # Add completed hours bars
-    fig.add_trace(go.Bar(
-        y=[cat['name'] for cat in category_hours],
-        x=[cat['completed_hours'] for cat in category_hours],
-        orientation='h',
-        name='Completed Hours',
-        marker_color='rgba(26, 188, 156, 0.7)',
-        text=[f"{cat['completed_hours']} hrs" for cat in category_hours],
-        textposition='auto'
-    ))
-    
-    # Update layout
-    fig.update_layout(
-        title="Hours by Category",
-        xaxis_title="Hours",
-        barmode='overlay',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
+    fig = st.session_state.figure_cache.get('category_hours', (category_hours,), category_hours_figure)
     
     st.plotly_chart(fig, use_container_width=True)
     
+    # Study history: every change to hours spent is logged as a session, and the
+    # charts read the day and week totals kept alongside the log
+    st.subheader("Study History")
+    daily_rollup = st.session_state.state_db.load_rollup('day')
+    if daily_rollup:
+        weekly_rollup = st.session_state.state_db.load_rollup('week')
+        col_burn, col_velocity = st.columns(2)
+        with col_burn:
+            burndown_fig = st.session_state.figure_cache.get(
+                'burndown',
+                (daily_rollup, metrics['remainingHours'], datetime.now().date(), st.session_state.exam_date.date()),
+                burndown_figure
+            )
+            st.plotly_chart(burndown_fig, use_container_width=True)
+        with col_velocity:
+            velocity_fig = st.session_state.figure_cache.get(
+                'velocity', (weekly_rollup, get_total_weekly_hours()), velocity_figure
+            )
+            st.plotly_chart(velocity_fig, use_container_width=True)
+    else:
+        st.write("Log hours on the Standards tab to see your burn-down and weekly velocity here.")
+    
     # Standards by Priority and Difficulty
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Standards by Priority")
         
-        # Count standards by priority
-        priority_counts = {"high": 0, "medium": 0, "low": 0}
-        for cat in st.session_state.categories:
-            for standard in cat['standards']:
-                if standard['priority'] in priority_counts and not standard['completed']:
-                    priority_counts[standard['priority']] += 1
-        
         # Create pie chart
-        priority_fig = px.pie(
-            values=list(priority_counts.values()),
-            names=["High", "Medium", "Low"],
-            color=["High", "Medium", "Low"],
-            color_discrete_map={"High": "red", "Medium": "gold", "Low": "blue"},
-            title="Distribution by Priority"
+        priority_fig = st.session_state.figure_cache.get(
+            'priority',
+            (metrics['priorityCounts'], {"High": "red", "Medium": "gold", "Low": "blue"}, "Distribution by Priority"),
+            level_pie
         )
         
         st.plotly_chart(priority_fig, use_container_width=True)
@@ -965,20 +1175,11 @@ with tab4:
     with col2:
         st.subheader("Standards by Difficulty")
         
-        # Count standards by difficulty
-        difficulty_counts = {"high": 0, "medium": 0, "low": 0}
-        for cat in st.session_state.categories:
-            for standard in cat['standards']:
-                if standard['difficulty'] in difficulty_counts and not standard['completed']:
-                    difficulty_counts[standard['difficulty']] += 1
-        
         # Create pie chart
-        difficulty_fig = px.pie(
-            values=list(difficulty_counts.values()),
-            names=["High", "Medium", "Low"],
-            color=["High", "Medium", "Low"],
-            color_discrete_map={"High": "indianred", "Medium": "gold", "Low": "lightblue"},
-            title="Distribution by Difficulty"
+        difficulty_fig = st.session_state.figure_cache.get(
+            'difficulty',
+            (metrics['difficultyCounts'], {"High": "indianred", "Medium": "gold", "Low": "lightblue"}, "Distribution by Difficulty"),
+            level_pie
         )
         
         st.plotly_chart(difficulty_fig, use_container_width=True)
@@ -994,8 +1195,8 @@ with tab4:
     col3, col4, col5 = st.columns(3)
     
     days_remaining = get_days_remaining()
-    completed_standards = get_completed_standards()
-    total_incomplete = get_total_standards()
+    completed_standards = metrics['completedStandards']
+    total_incomplete = metrics['incompleteStandards']
     
     # Current rate (standards completed per day)
     current_rate = completed_standards / max(1, (30 - days_remaining))  # Assuming 30 days total study period
@@ -1033,33 +1234,80 @@ with tab4:
     """)
 
 # Ensure study plan is generated
+apply_plan_edits()
 if len(st.session_state.study_plan) == 0:
     st.session_state.study_plan = generate_study_plan()
 
-# Save data
+if USERS_DB_PATH:
+    st.sidebar.caption(f"Studying as {st.session_state.state_db.user_id}")
+
+def show_extraction_progress(service, text_ready):
+    # Polled by the sidebar while PDFs are extracted in the background; once
+    # they're done the whole app reruns once to pick up the word counts
+    if service.finished:
+        if not text_ready:
+            st.rerun()
+        if service.failed:
+            st.caption(f"⚠️ Couldn't extract text from {len(service.failed)} PDFs")
+        return
+    done, total = service.progress()
+    st.progress(done / total, text=f"Extracting PDF text: {done} of {total} files")
+
+if not text_extraction.finished or text_extraction.failed:
+    with st.sidebar:
+        run_every = None if text_extraction.finished else EXTRACTION_POLL_SECONDS
+        st.fragment(run_every=run_every)(show_extraction_progress)(text_extraction, catalog_text_ready)
+
+# Save data (every change is already written; this folds the journal into the database file)
 if st.sidebar.button("Save Progress"):
+    st.session_state.state_db.checkpoint()
     st.sidebar.success("Progress saved successfully!")
 
 # Export data
+compress_export = st.sidebar.checkbox("Compress export (gzip)", value=False)
 if st.sidebar.button("Export Data"):
-    # Create a JSON string
-    export_data = {
-        "categories": st.session_state.categories,
-        "exam_date": st.session_state.exam_date.isoformat(),
-        "daily_study_hours": st.session_state.daily_study_hours
+    export_settings = {
+        "exam_date": st.session_state.exam_date,
+        "daily_study_hours": st.session_state.daily_study_hours,
+        "planning_mode": st.session_state.planning_mode
     }
-    
-    # Convert to JSON string
-    json_str = json.dumps(export_data, indent=2, default=str)
+
+    # Serialized one standard at a time
+    export_data = export_bytes(st.session_state.store.categories, export_settings, compress=compress_export)
     
     # Provide download link
     st.sidebar.download_button(
-        label="Download JSON",
-        data=json_str,
-        file_name="accounting_study_plan.json",
-        mime="application/json"
+        label="Download Export",
+        data=export_data,
+        file_name="accounting_study_plan.json.gz" if compress_export else "accounting_study_plan.json",
+        mime="application/gzip" if compress_export else "application/json"
     )
 
+# Import data
+uploaded_export = st.sidebar.file_uploader("Restore from Export", type=["json", "gz"])
+if uploaded_export is not None and st.sidebar.button("Restore"):
+    try:
+        imported_categories, imported_settings = load_export(uploaded_export.getvalue())
+        restore_state(imported_categories, imported_settings)
+    except (InvalidExportError, OSError, sqlite3.Error) as error:
+        st.sidebar.error(f"Couldn't restore: {error}")
+    else:
+        st.rerun()
+
+# Debug information
+with st.sidebar.expander("Debug"):
+    st.write(f"Metric full recomputes: {st.session_state.metrics.recomputes}")
+    st.write(f"Catalog v{catalog.version} ({len(catalog)} standards) parsed in {catalog.load_ms:.1f} ms, once per process")
+    st.write(f"Corpus: {len(catalog.documents)} documents in the manifest"
+             + (f", {len(catalog.unreadable)} unreadable PDFs skipped" if catalog.unreadable else ""))
+    done, total = text_extraction.progress()
+    st.write(f"Text extraction: {done} of {total} files on {text_extraction.workers} workers"
+             + (f" in {text_extraction.elapsed:.1f} s" if text_extraction.finished else ""))
+    st.write(f"State loaded in {st.session_state.state_load_ms:.1f} ms")
+    st.write(f"This run took {(time.perf_counter() - run_started) * 1000:.0f} ms")
+    figure_cache = st.session_state.figure_cache
+    st.write(f"Figure cache: {figure_cache.hits} hits, {figure_cache.misses} misses, {len(figure_cache)} cached")
+
 # Help section
 with st.sidebar.expander("Help"):
     st.write("""
@@ -1070,5 +1318,5 @@ with st.sidebar.expander("Help"):
     • **Timeline:** Visualize your study plan over time
     • **Analytics:** Analyze your study distribution and patterns
     
-    Your progress is automatically saved in your browser.
-    """)
\ No newline at end of file
+    Your progress is saved automatically to a local database and restored when you come back.
+    """)
\ No newline at end of file
@@ -0,0 +1 @@
+"""Planning and storage helpers used by the Streamlit study plan app."""
@@ -0,0 +1,249 @@
+from bisect import insort
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Why a review session couldn't be reserved; pins have reasons of their own
+REVIEW_CONFLICT = "no free study time for the review before the exam"
+
+
+class StudyCalendar:
+    """Per-day study capacity between a start date and the exam.
+
+    The weekday pattern from ``daily_study_hours`` (Mon-Sun) is tiled over the
+    whole horizon once, so allocation never has to walk the days again.
+
+    Hours reserved for pinned standards are kept as sorted, non-overlapping
+    intervals on the cumulative hours axis. Everything else is allocated in
+    "free hours", which skip over those intervals.
+    """
+
+    def __init__(self, daily_study_hours, days, start=None):
+        self.start = start if start is not None else datetime.now()
+        self.days = max(0, int(days))
+
+        pattern = np.asarray(daily_study_hours, dtype=float)
+        weekdays = (self.start.weekday() + np.arange(self.days)) % 7
+        self.capacity = pattern[weekdays]
+
+        # Day offsets that have any study time, in calendar order, and the ones
+        # not placed on by pins or reviews in days mode
+        self.study_days = np.flatnonzero(self.capacity > 0)
+        self.free_study_days = self.study_days
+        # Hours available up to and including each day
+        self.cumulative_hours = np.cumsum(self.capacity)
+
+        # Reserved [start, end) hour intervals, their position on the free hours
+        # axis and the reserved hours before each of them
+        self.reserved_starts = np.empty(0)
+        self.reserved_ends = np.empty(0)
+        self.reserved_free_starts = np.empty(0)
+        self.reserved_before = np.zeros(1)
+
+    @property
+    def total_hours(self):
+        return float(self.cumulative_hours[-1]) if self.days else 0.0
+
+    @property
+    def reserved_hours(self):
+        return float(self.reserved_before[-1])
+
+    @property
+    def free_hours(self):
+        return self.total_hours - self.reserved_hours
+
+    def date_for(self, day):
+        return self.start + timedelta(days=int(day))
+
+    def day_for(self, value):
+        # Day offset of a date or datetime, counted from the calendar start
+        if isinstance(value, datetime):
+            value = value.date()
+        return (value - self.start.date()).days
+
+    def reserve_hours(self, days, hours_needed, spill=None):
+        # Reserve hours for pinned standards and review sessions. Pins (where
+        # `spill` isn't set) go first, in the given order (callers pass them
+        # sorted by day), each starting on its own day. Reviews then take the
+        # first free hours on or after their day, around the pins and split
+        # across them if need be, so a review never moves a pin. Returns
+        # (start_day, end_day) offsets and a conflict reason, or None, for
+        # every reservation in the given order.
+        spill = spill if spill is not None else [False] * len(days)
+        start_days = [-1] * len(days)
+        end_days = [-1] * len(days)
+        conflicts = [None] * len(days)
+        intervals = []
+        last_end = 0.0
+
+        for index in [index for index, can_spill in enumerate(spill) if not can_spill]:
+            day, hours = days[index], hours_needed[index]
+            if day < 0 or day >= self.days:
+                conflicts[index] = "outside the study period"
+                continue
+            if self.capacity[day] <= 0:
+                conflicts[index] = "no study hours on that day"
+                continue
+            start = max(self.cumulative_hours[day] - self.capacity[day], last_end)
+            end = start + hours
+            if start >= self.cumulative_hours[day]:
+                conflicts[index] = "day already taken by another pinned standard"
+            elif end > self.total_hours:
+                conflicts[index] = "not enough study time before the exam"
+            else:
+                intervals.append((start, end))
+                last_end = end
+                start_days[index], end_days[index] = self._days_of(start, end)
+
+        for index in [index for index, can_spill in enumerate(spill) if can_spill]:
+            day = min(max(days[index], 0), self.days)
+            day_start = self.cumulative_hours[day] - self.capacity[day] if day < self.days else self.total_hours
+            pieces = self._free_pieces(intervals, day_start, hours_needed[index])
+            if pieces is None:
+                conflicts[index] = REVIEW_CONFLICT
+                continue
+            for piece in pieces:
+                insort(intervals, piece)
+            start_days[index], end_days[index] = self._days_of(pieces[0][0], pieces[-1][1])
+
+        self.reserved_starts = np.asarray([start for start, _ in intervals], dtype=float)
+        self.reserved_ends = np.asarray([end for _, end in intervals], dtype=float)
+        self.reserved_before = np.concatenate(([0.0], np.cumsum(self.reserved_ends - self.reserved_starts)))
+        self.reserved_free_starts = self.reserved_starts - self.reserved_before[:-1]
+        return start_days, end_days, conflicts
+
+    def _days_of(self, start, end):
+        # Day offsets of the first and last hour of a [start, end) interval
+        return (int(np.searchsorted(self.cumulative_hours, start, side='right')),
+                int(np.searchsorted(self.cumulative_hours, end, side='left')))
+
+    def _free_pieces(self, intervals, start, hours):
+        # [start, end) pieces covering `hours` of the time between the sorted
+        # reserved `intervals` from `start` on, or None if it runs past the exam
+        pieces = []
+        for reserved_start, reserved_end in intervals + [(self.total_hours, self.total_hours)]:
+            if reserved_end <= start:
+                continue
+            if reserved_start > start:
+                taken = min(reserved_start - start, hours)
+                pieces.append((start, start + taken))
+                hours -= taken
+                if hours <= 0:
+                    return pieces
+            start = max(start, reserved_end)
+        return None
+
+    def _free_to_hours(self, offsets, side):
+        # Map free hour offsets back onto the calendar's cumulative hours. Starts
+        # use side='right' so they skip a reservation beginning at the same point;
+        # ends use side='left' so they stop in front of it.
+        if not len(self.reserved_starts):
+            return offsets
+        index = np.searchsorted(self.reserved_free_starts, offsets, side=side)
+        return offsets + self.reserved_before[index]
+
+    def allocate_days(self, days_needed, cursor=0):
+        # Each standard takes `days_needed` study days and starts on the day the
+        # previous one finished, matching the original day-by-day walk. Days
+        # taken by place_days() are skipped. `cursor` is the free study day
+        # ordinal the first standard starts on. A standard that doesn't fit
+        # takes no days, so later shorter ones still get the days left.
+        # Returns (start_day, end_day) offsets, -1 where the standard doesn't fit,
+        # and the cursor after each standard.
+        needed = np.maximum(np.asarray(days_needed, dtype=np.int64), 1)
+        end_ordinals = cursor + np.cumsum(needed - 1)
+        fits = end_ordinals < len(self.free_study_days)
+        misses = np.flatnonzero(~fits)
+        if len(misses):
+            # Past the first miss, place the rest one by one
+            position = int(end_ordinals[misses[0]] - (needed[misses[0]] - 1))
+            for index in range(misses[0], len(needed)):
+                fits[index] = position + needed[index] - 1 < len(self.free_study_days)
+                if fits[index]:
+                    position += int(needed[index]) - 1
+                end_ordinals[index] = position
+        start_ordinals = end_ordinals - (needed - 1)
+
+        start_days = np.full(len(needed), -1, dtype=np.int64)
+        end_days = np.full(len(needed), -1, dtype=np.int64)
+        start_days[fits] = self.free_study_days[start_ordinals[fits]]
+        end_days[fits] = self.free_study_days[end_ordinals[fits]]
+        return start_days, end_days, end_ordinals
+
+    def place_days(self, days, days_needed, spill=None):
+        # Place standards on fixed days, each taking `days_needed` study days
+        # from there. Pins (where `spill` isn't set) go first, in the given
+        # order; reviews then move on to the first study days the pins leave
+        # free. The days taken are no longer handed out by allocate_days().
+        # Returns (start_day, end_day) offsets and a conflict reason, or None,
+        # for every placement in the given order.
+        spill = spill if spill is not None else [False] * len(days)
+        start_days = [-1] * len(days)
+        end_days = [-1] * len(days)
+        conflicts = [None] * len(days)
+        taken = np.zeros(len(self.study_days), dtype=bool)
+
+        for index in [index for index, can_spill in enumerate(spill) if not can_spill]:
+            day, needed = days[index], max(1, days_needed[index])
+            ordinal = int(np.searchsorted(self.study_days, day))
+            if day < 0 or day >= self.days:
+                conflicts[index] = "outside the study period"
+            elif self.capacity[day] <= 0:
+                conflicts[index] = "no study hours on that day"
+            elif taken[ordinal]:
+                conflicts[index] = "day already taken by another pinned standard"
+            elif ordinal + needed > len(self.study_days):
+                conflicts[index] = "not enough study days before the exam"
+            else:
+                # Pins come in day order, so the days after a free start are free too
+                taken[ordinal:ordinal + needed] = True
+                start_days[index] = day
+                end_days[index] = int(self.study_days[ordinal + needed - 1])
+
+        for index in [index for index, can_spill in enumerate(spill) if can_spill]:
+            ordinal = int(np.searchsorted(self.study_days, max(days[index], 0)))
+            ordinals = ordinal + np.flatnonzero(~taken[ordinal:])[:max(1, days_needed[index])]
+            if len(ordinals) < max(1, days_needed[index]):
+                conflicts[index] = REVIEW_CONFLICT
+                continue
+            taken[ordinals] = True
+            start_days[index] = int(self.study_days[ordinals[0]])
+            end_days[index] = int(self.study_days[ordinals[-1]])
+
+        self.free_study_days = self.study_days[~taken]
+        return start_days, end_days, conflicts
+
+    def allocate_hours(self, hours_needed, cursor=0.0):
+        # Standards are laid end to end on the running total of free hours, so a
+        # day can hold several short standards and a long one can span days.
+        # `cursor` is the number of free hours already allocated before the first.
+        # A standard that doesn't fit takes no hours, so later smaller ones are
+        # fitted into the hours left.
+        # Returns (start_day, end_day) offsets, -1 where the standard doesn't fit,
+        # and the cursor after each standard.
+        hours = np.asarray(hours_needed, dtype=float)
+        end_offsets = cursor + np.cumsum(hours)
+        fits = end_offsets <= self.free_hours
+        misses = np.flatnonzero(~fits)
+        if len(misses):
+            # Past the first miss, place the rest one by one
+            position = float(end_offsets[misses[0]] - hours[misses[0]])
+            for index in range(misses[0], len(hours)):
+                fits[index] = position + hours[index] <= self.free_hours
+                if fits[index]:
+                    position += hours[index]
+                end_offsets[index] = position
+        start_offsets = end_offsets - hours
+
+        start_days = np.full(len(hours), -1, dtype=np.int64)
+        end_days = np.full(len(hours), -1, dtype=np.int64)
+        start_days[fits] = np.searchsorted(
+            self.cumulative_hours, self._free_to_hours(start_offsets[fits], 'right'), side='right')
+        end_days[fits] = np.searchsorted(
+            self.cumulative_hours, self._free_to_hours(end_offsets[fits], 'left'), side='left')
+        return start_days, end_days, end_offsets
+
+    def study_days_between(self, start_days, end_days):
+        # Number of study days in each inclusive [start, end] range
+        return (np.searchsorted(self.study_days, end_days, side='right')
+                - np.searchsorted(self.study_days, start_days, side='left'))
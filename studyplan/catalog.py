@@ -0,0 +1,175 @@
+import json
+import os
+import time
+from types import MappingProxyType
+
+from .corpus import CONCEPTUAL_FRAMEWORK_ID, STANDARD_CODE
+from .transfer import LEVELS, InvalidExportError, decode_categories
+
+CATALOG_FORMAT = "accounting-study-plan-catalog"
+CATALOG_VERSION = 1
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalog.json")
+
+
+# What a standard found only in the corpus starts with, before the catalog's own defaults
+CORPUS_DEFAULTS = {'priority': 'medium', 'difficulty': 'medium', 'totalHours': 2, 'recommendedDays': 1}
+
+
+class InvalidCatalogError(ValueError):
+    pass
+
+
+class Catalog:
+    """The standards catalog as parsed from its data file.
+
+    Categories and standards are read-only mappings in tuples, so one instance
+    can be shared by every session in the process; sessions start from
+    `session_categories()` instead of copying it.
+    """
+
+    def __init__(self, categories, version, path, load_ms, corpus=None, documents=None, unreadable=()):
+        self.categories = categories
+        self.version = version
+        self.path = path
+        self.load_ms = load_ms
+        # Where standards found in the corpus go, and the corpus document of each standard
+        self.corpus = corpus or {'defaults': {}, 'placements': {}}
+        self.documents = documents or {}
+        # Corpus files pypdf couldn't read
+        self.unreadable = unreadable
+
+    def __len__(self):
+        return sum(len(category['standards']) for category in self.categories)
+
+
+def freeze(categories):
+    return tuple(
+        MappingProxyType({**category, 'standards': tuple(MappingProxyType(s) for s in category['standards'])})
+        for category in categories
+    )
+
+
+def load_catalog(path=CATALOG_PATH):
+    """Parse and validate a catalog file. Raises InvalidCatalogError if it doesn't fit the schema."""
+    started = time.perf_counter()
+    try:
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+    except (OSError, ValueError) as error:
+        raise InvalidCatalogError(f"Can't read {path}: {error}")
+
+    if not isinstance(document, dict) or document.get("format") != CATALOG_FORMAT:
+        raise InvalidCatalogError(f"{path} is not a standards catalog")
+    if document.get("version") != CATALOG_VERSION:
+        raise InvalidCatalogError(f"Unsupported catalog version: {document.get('version')}")
+
+    try:
+        categories = decode_categories(document.get("categories") or [])
+    except InvalidExportError as error:
+        raise InvalidCatalogError(f"{path}: {error}")
+
+    category_ids = [category['id'] for category in categories]
+    if len(set(category_ids)) != len(category_ids):
+        raise InvalidCatalogError(f"{path}: duplicate category id")
+
+    corpus = _decode_corpus(document.get("corpus") or {}, set(category_ids), path)
+    return Catalog(freeze(categories), document["version"], path, (time.perf_counter() - started) * 1000, corpus)
+
+
+def _decode_corpus(raw, category_ids, path):
+    # The optional "corpus" section: defaults and per-standard placements for
+    # standards that only the PDF corpus knows about
+    if not isinstance(raw, dict):
+        raise InvalidCatalogError(f"{path}: corpus must be an object")
+    defaults = raw.get("defaults") or {}
+    placements = raw.get("placements") or {}
+    if not isinstance(defaults, dict) or not isinstance(placements, dict):
+        raise InvalidCatalogError(f"{path}: corpus defaults and placements must be objects")
+
+    for where, placement in [("corpus.defaults", defaults)] + [
+        (f"corpus.placements.{standard_id}", placement) for standard_id, placement in placements.items()
+    ]:
+        if not isinstance(placement, dict):
+            raise InvalidCatalogError(f"{path}: {where} must be an object")
+        if 'categoryId' in placement and placement['categoryId'] not in category_ids:
+            raise InvalidCatalogError(f"{path}: {where} refers to unknown category {placement['categoryId']}")
+        for level in ('priority', 'difficulty'):
+            if level in placement and placement[level] not in LEVELS:
+                raise InvalidCatalogError(f"{path}: {where}.{level} must be one of {sorted(LEVELS)}")
+
+    return {'defaults': defaults, 'placements': placements}
+
+
+def corpus_standard(document, placement):
+    # A catalog standard for a corpus document the catalog file doesn't list
+    return {
+        'id': document['id'],
+        'name': document['name'],
+        'completed': False,
+        'priority': placement['priority'],
+        'difficulty': placement['difficulty'],
+        'totalHours': placement['totalHours'],
+        'hoursSpent': 0,
+        'notes': "",
+        'scheduledDate': None,
+        'recommendedDays': placement['recommendedDays']
+    }
+
+
+def add_corpus_standards(catalog, manifest):
+    """The catalog plus every standard with a PDF in the corpus manifest.
+
+    Standards the catalog file already lists keep their curated entries. The
+    rest are added to the category their placement names (the last category
+    if none does), after the standards already there. The conceptual framework
+    isn't a standard and is never added.
+    """
+    documents = {standard_id: {**document, 'id': standard_id} for standard_id, document in manifest['documents'].items()}
+    listed = {standard['id'] for category in catalog.categories for standard in category['standards']}
+    categories = [{**category, 'standards': list(category['standards'])} for category in catalog.categories]
+    by_id = {category['id']: category for category in categories}
+
+    for standard_id, document in sorted(documents.items(), key=lambda item: _code_order(item[0])):
+        if standard_id in listed or standard_id == CONCEPTUAL_FRAMEWORK_ID or not categories:
+            continue
+        placement = {**CORPUS_DEFAULTS, **catalog.corpus['defaults'], **catalog.corpus['placements'].get(standard_id, {})}
+        category = by_id.get(placement.get('categoryId'), categories[-1])
+        category['standards'].append(corpus_standard(document, placement))
+
+    unreadable = tuple(sorted(name for name, entry in manifest['files'].items() if entry.get('unreadable')))
+    return Catalog(freeze(categories), catalog.version, catalog.path, catalog.load_ms, catalog.corpus, documents,
+                   unreadable)
+
+
+def _code_order(standard_id):
+    # LKAS before SLFRS, then by number
+    match = STANDARD_CODE.match(standard_id)
+    return (match.group(1).upper(), int(match.group(2))) if match else (standard_id, 0)
+
+
+def merge_catalog(categories, catalog_categories):
+    # Add catalog standards missing from a saved category list, in place, so
+    # standards added to the catalog reach existing users. Returns how many were added.
+    have = {standard['id'] for category in categories for standard in category['standards']}
+    by_id = {category['id']: category for category in categories}
+    added = 0
+    for catalog_category in catalog_categories:
+        missing = [standard for standard in catalog_category['standards'] if standard['id'] not in have]
+        if not missing:
+            continue
+        category = by_id.get(catalog_category['id'])
+        if category is None:
+            category = {**catalog_category, 'standards': []}
+            categories.append(category)
+            by_id[category['id']] = category
+        category['standards'].extend(missing)
+        added += len(missing)
+    return added
+
+
+def session_categories(categories):
+    # A session's own category list over the shared standards. The store
+    # replaces a standard rather than changing it, so only the standards a
+    # user edits ever get copied.
+    return [{**category, 'standards': list(category['standards'])} for category in categories]
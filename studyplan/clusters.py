@@ -0,0 +1,208 @@
+"""Groups of related standards, studied back to back.
+
+Clusters come from the "Logical Clusters" section of Study_Guide.md. Standards
+the guide leaves out join the cluster whose members their PDF text is most
+similar to, by TF-IDF cosine similarity; without a guide, each standard is
+grouped with its nearest neighbours. The standard-by-standard similarity
+matrix is cached next to the text cache and only recomputed when the corpus
+hash changes.
+"""
+import hashlib
+import math
+import os
+import re
+
+import numpy as np
+
+from .corpus import standard_id_for
+from .search import tokenize
+
+CLUSTERS_HEADING = "## Logical Clusters"
+# "### 2. Financial Instruments"
+CLUSTER_HEADING = re.compile(r'^###\s*(?:\d+\.\s*)?(?P<name>.+?)\s*$')
+
+SIMILARITY_FILE = "similarity.npz"
+
+
+def load_study_guide(path):
+    # [(cluster name, [standard ids])] in the guide's order. A standard listed
+    # under more than one cluster stays in the first.
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+
+    clusters = []
+    seen = set()
+    in_section = False
+    for line in lines:
+        if line.startswith("## "):
+            in_section = line.startswith(CLUSTERS_HEADING)
+            continue
+        if not in_section:
+            continue
+        heading = CLUSTER_HEADING.match(line)
+        if heading:
+            clusters.append((heading.group('name'), []))
+        elif line.lstrip().startswith("-") and clusters:
+            for item in line.lstrip()[1:].split(","):
+                standard_id = standard_id_for(item.strip())
+                if standard_id is not None and standard_id not in seen:
+                    seen.add(standard_id)
+                    clusters[-1][1].append(standard_id)
+    return [(name, ids) for name, ids in clusters if ids]
+
+
+def corpus_hash(documents, cache):
+    # Changes when a document is added, replaced or has its text extracted
+    digest = hashlib.sha256()
+    for standard_id in sorted(documents):
+        sha256 = documents[standard_id]['sha256']
+        if sha256 in cache:
+            digest.update(f"{standard_id}:{sha256}\n".encode())
+    return digest.hexdigest()
+
+
+def tfidf_similarity(texts):
+    # Cosine similarity of sublinear TF-IDF vectors, one row per text. Terms
+    # found in a single text can't make two texts similar and are left out.
+    counts = []
+    document_frequency = {}
+    for text in texts:
+        terms = {}
+        for token in tokenize(text):
+            terms[token] = terms.get(token, 0) + 1
+        counts.append(terms)
+        for term in terms:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+
+    columns = {term: column for column, term in enumerate(t for t, df in document_frequency.items() if df > 1)}
+    vectors = np.zeros((len(texts), len(columns)), dtype=np.float32)
+    for row, terms in enumerate(counts):
+        for term, count in terms.items():
+            column = columns.get(term)
+            if column is not None:
+                vectors[row, column] = (1 + math.log(count)) * math.log(len(texts) / document_frequency[term])
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms > 0, norms, 1)
+    return vectors @ vectors.T
+
+
+class SimilarityMatrix:
+    """TF-IDF similarity between the standards with extracted text."""
+
+    def __init__(self, ids, matrix, corpus_hash):
+        self.ids = ids
+        self.index = {standard_id: row for row, standard_id in enumerate(ids)}
+        self.matrix = matrix
+        self.corpus_hash = corpus_hash
+
+    @classmethod
+    def compute(cls, documents, cache):
+        ids = sorted(standard_id for standard_id, document in documents.items() if document['sha256'] in cache)
+        texts = ["\n".join(cache.pages(documents[standard_id]['sha256']) or []) for standard_id in ids]
+        return cls(ids, tfidf_similarity(texts), corpus_hash(documents, cache))
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with np.load(path) as data:
+                return cls(data['ids'].tolist(), data['matrix'], str(data['corpus_hash']))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path):
+        # np.savez adds .npz to a name without it, so the temporary file keeps the extension
+        temporary = path[:-len(".npz")] + ".tmp.npz"
+        np.savez(temporary, ids=np.array(self.ids), matrix=self.matrix, corpus_hash=np.array(self.corpus_hash))
+        os.replace(temporary, path)
+
+    @classmethod
+    def cached(cls, documents, cache):
+        # The saved matrix if it was computed from the same corpus, else a new one
+        path = os.path.join(cache.directory, SIMILARITY_FILE)
+        similarity = cls.load(path)
+        if similarity is None or similarity.corpus_hash != corpus_hash(documents, cache):
+            similarity = cls.compute(documents, cache)
+            similarity.save(path)
+        return similarity
+
+    def between(self, standard_id, other_ids):
+        # Mean similarity of a standard to others, None if neither side has text
+        row = self.index.get(standard_id)
+        rows = [self.index[other_id] for other_id in other_ids if other_id in self.index]
+        if row is None or not rows:
+            return None
+        return float(self.matrix[row, rows].mean())
+
+
+class StudyClusters:
+    """Which cluster every standard belongs to.
+
+    Standards in neither the guide nor the corpus get a cluster of their own.
+    """
+
+    def __init__(self, clusters):
+        # [(name, [standard ids])]
+        self.names = [name for name, _ in clusters]
+        self.cluster_of = {standard_id: index for index, (_, ids) in enumerate(clusters) for standard_id in ids}
+
+    @classmethod
+    def build(cls, guide, similarity):
+        clusters = [(name, list(ids)) for name, ids in guide]
+        clustered = {standard_id for _, ids in clusters for standard_id in ids}
+        unclustered = [standard_id for standard_id in similarity.ids if standard_id not in clustered]
+
+        if clusters:
+            # Each joins the guide cluster it is most similar to on average
+            for standard_id in unclustered:
+                scores = [similarity.between(standard_id, ids) for _, ids in guide]
+                scores = [-1.0 if score is None else score for score in scores]
+                clusters[int(np.argmax(scores))][1].append(standard_id)
+        else:
+            clusters = cls._neighbour_groups(similarity)
+        return cls(clusters)
+
+    @staticmethod
+    def _neighbour_groups(similarity):
+        # Link every standard to its most similar other standard; the groups
+        # are the connected components of those links
+        parent = list(range(len(similarity.ids)))
+
+        def root(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        if len(similarity.ids) > 1:
+            matrix = similarity.matrix.copy()
+            np.fill_diagonal(matrix, -1)
+            for node, nearest in enumerate(matrix.argmax(axis=1).tolist()):
+                parent[root(node)] = root(nearest)
+
+        groups = {}
+        for node, standard_id in enumerate(similarity.ids):
+            groups.setdefault(root(node), []).append(standard_id)
+        return [(f"{ids[0]} and related" if len(ids) > 1 else ids[0], ids) for ids in groups.values()]
+
+    def __len__(self):
+        return len(self.names)
+
+    def name(self, standard_id):
+        index = self.cluster_of.get(standard_id)
+        return self.names[index] if index is not None else None
+
+    def order(self, items, key=lambda item: item['id']):
+        """Group `items` into contiguous clusters, keeping their order otherwise.
+
+        Clusters come in the order of their first item, so the cluster with
+        the most urgent standard goes first. Linear in the items.
+        """
+        blocks = {}
+        for item in items:
+            standard_id = key(item)
+            blocks.setdefault(self.cluster_of.get(standard_id, standard_id), []).append(item)
+        return [item for block in blocks.values() for item in block]
@@ -0,0 +1,51 @@
+import numpy as np
+
+# Category codes for priority and difficulty, in plan order; anything else
+# ('completed') sorts after them
+LEVEL_CODES = {'high': 0, 'medium': 1, 'low': 2}
+OTHER_LEVEL = 3
+
+
+def _level_codes(values):
+    return np.fromiter((LEVEL_CODES.get(value, OTHER_LEVEL) for value in values), dtype=np.int8)
+
+
+class StandardColumns:
+    """The catalog as NumPy columns, one row per standard in catalog order.
+
+    Priority and difficulty are stored as small integer codes, hours and days
+    as numeric arrays, so filtering and ordering the standards to plan are
+    whole-column operations. `records` and `record_categories` map a row back
+    to its standard and category without copying either.
+    """
+
+    def __init__(self, categories):
+        self.records = []
+        self.record_categories = []
+        for category in categories:
+            for standard in category['standards']:
+                self.records.append(standard)
+                self.record_categories.append(category)
+
+        records = self.records
+        self.priority = _level_codes(s['priority'] for s in records)
+        self.difficulty = _level_codes(s['difficulty'] for s in records)
+        self.total_hours = np.fromiter((s['totalHours'] for s in records), dtype=float, count=len(records))
+        self.hours_spent = np.fromiter((s['hoursSpent'] for s in records), dtype=float, count=len(records))
+        self.completed = np.fromiter((s['completed'] for s in records), dtype=bool, count=len(records))
+        self.pinned = np.fromiter((s['scheduledDate'] is not None for s in records), dtype=bool, count=len(records))
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def remaining_hours(self):
+        return self.total_hours - self.hours_spent
+
+    def needs_study(self):
+        return ~self.completed & (self.remaining_hours > 0)
+
+    def plan_order(self, mask):
+        # Rows where `mask` is set, by priority, then difficulty, then catalog order
+        rows = np.flatnonzero(mask)
+        return rows[np.lexsort((rows, self.difficulty[rows], self.priority[rows]))]
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+# "LKAS 39-Financial ...", "SLFRS 10 - Consolidated ...", "LKAS 2 (revised)  Inventories"
+STANDARD_CODE = re.compile(r'^\s*(LKAS|SLFRS)\s*(\d+)', re.IGNORECASE)
+
+CONCEPTUAL_FRAMEWORK_ID = "CF"
+
+
+def standard_id_for(filename):
+    # Map a corpus PDF to the catalog's standard id, e.g. "LKAS39" or "SLFRS10"
+    name = os.path.basename(filename)
+    match = STANDARD_CODE.match(name)
+    if match:
+        return f"{match.group(1).upper()}{int(match.group(2))}"
+    if name.lower().startswith("conceptual framework"):
+        return CONCEPTUAL_FRAMEWORK_ID
+    return None
+
+
+MANIFEST_FORMAT = "accounting-study-plan-corpus"
+MANIFEST_VERSION = 1
+MANIFEST_FILE = "corpus_manifest.json"
+
+# "<code> - <title>   _<upload id>_<code> - <title>.pdf", as the files were downloaded
+CORPUS_FILENAME = re.compile(r'^(?P<display>.*?)\s*_(?P<upload>\d+)_(?P<title>.+)\.pdf$', re.IGNORECASE)
+# "LKAS 12 (revised)-Income Taxes", "SLFRS 1-First time Adoption ...", "LKAS 2 (revised)  Inventories"
+STANDARD_TITLE = re.compile(r'^\s*(LKAS|SLFRS)\s*(\d+)\s*(?:\(revised\))?\s*-?\s*(.*?)\s*$', re.IGNORECASE)
+
+
+def parse_corpus_filename(filename):
+    # Standard id (None if it isn't one), display name and upload id of a
+    # corpus PDF. Names that don't follow the download pattern get upload id 0.
+    name = os.path.basename(filename)
+    match = CORPUS_FILENAME.match(name)
+    title = match.group('title').strip() if match else os.path.splitext(name)[0].strip()
+    code = STANDARD_TITLE.match(title)
+    if code:
+        prefix, number = code.group(1).upper(), int(code.group(2))
+        title = f"{prefix} {number} - {code.group(3)}" if code.group(3) else f"{prefix} {number}"
+    return {
+        'standardId': standard_id_for(name),
+        'name': title,
+        'uploadId': int(match.group('upload')) if match else 0
+    }
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def count_pages(path):
+    # None for a file pypdf can't read, such as a truncated download
+    from pypdf import PdfReader
+    from pypdf.errors import PyPdfError
+
+    try:
+        return len(PdfReader(path).pages)
+    except (PyPdfError, OSError, ValueError):
+        return None
+
+
+def corpus_signature(root):
+    # (name, size, mtime) of every PDF; cheap enough to check on each rerun
+    signature = []
+    for entry in os.scandir(root):
+        if entry.name.lower().endswith(".pdf"):
+            stat = entry.stat()
+            signature.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(signature))
+
+
+def load_manifest(path):
+    # The saved manifest, or None if there isn't a usable one
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("format") != MANIFEST_FORMAT \
+            or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(manifest, path):
+    # Written under a temporary name first so a reader never sees half a file;
+    # the name is unique so sessions rescanning at the same time don't collide
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def scan_corpus(root, previous=None, word_count=None):
+    """Describe every PDF under `root`, reusing `previous` where it can.
+
+    A file whose size and mtime match its entry in the previous manifest is
+    not opened again; anything new or changed is hashed and has its pages
+    counted. Files without a word count get one from `word_count(sha256)`
+    where it returns one (see extraction.TextCache.words). Files with the same content hash are one document, and each
+    standard id maps to its newest upload. Files pypdf can't read are marked
+    unreadable and left out of the documents until they change. Returns the
+    manifest and the names of the files that had to be read.
+    """
+    previous_files = (previous or {}).get("files", {})
+    by_hash = {entry['sha256']: entry for entry in previous_files.values()}
+    files = {}
+    rescanned = []
+
+    for name, size, mtime in corpus_signature(root):
+        entry = previous_files.get(name)
+        if entry is None or entry['size'] != size or entry['mtime'] != mtime:
+            path = os.path.join(root, name)
+            try:
+                sha256 = file_sha256(path)
+            except OSError:
+                # Removed or unreadable since the directory was listed
+                continue
+            known = by_hash.get(sha256)
+            # A renamed or re-downloaded copy of a known file keeps its counts
+            pages = (known['pages'] if not known.get('unreadable') else None) if known else count_pages(path)
+            entry = {
+                **parse_corpus_filename(name),
+                'size': size,
+                'mtime': mtime,
+                'sha256': sha256,
+                'pages': pages or 0,
+                **({'unreadable': True} if pages is None else {}),
+                **({'words': known['words']} if known and 'words' in known else {})
+            }
+            rescanned.append(name)
+        if word_count is not None and 'words' not in entry and not entry.get('unreadable'):
+            words = word_count(entry['sha256'])
+            if words is not None:
+                entry = {**entry, 'words': words}
+                if name not in rescanned:
+                    rescanned.append(name)
+        files[name] = entry
+
+    documents = {}
+    for name in sorted(files, key=lambda name: files[name]['uploadId']):
+        entry = files[name]
+        standard_id = entry['standardId']
+        if standard_id is None or entry.get('unreadable'):
+            continue
+        document = documents.get(standard_id)
+        if document is not None and document['sha256'] == entry['sha256']:
+            document['duplicates'].append(name)
+            continue
+        # A newer upload of a standard replaces the older one
+        documents[standard_id] = {
+            'file': name,
+            'name': entry['name'],
+            'sha256': entry['sha256'],
+            'size': entry['size'],
+            'pages': entry['pages'],
+            'duplicates': [] if document is None else document['duplicates'],
+            **({'words': entry['words']} if 'words' in entry else {})
+        }
+
+    manifest = {"format": MANIFEST_FORMAT, "version": MANIFEST_VERSION, "files": files, "documents": documents}
+    return manifest, rescanned
+
+
+def update_manifest(root, path=None, word_count=None):
+    # Rescan `root` against the manifest saved at `path` and save it back if
+    # anything changed. Returns the manifest and the names of the files read.
+    path = path or os.path.join(root, MANIFEST_FILE)
+    previous = load_manifest(path)
+    manifest, rescanned = scan_corpus(root, previous, word_count)
+    if previous is None or rescanned or previous.get("files", {}).keys() != manifest["files"].keys():
+        save_manifest(manifest, path)
+    return manifest, rescanned
+
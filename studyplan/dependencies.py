@@ -0,0 +1,142 @@
+"""Prerequisites between standards, from how often their PDFs cite each other.
+
+A standard that cites another more often than it is cited back builds on it,
+weighted by the difference in mentions. The graph is held as adjacency arrays:
+the prerequisites of node i are targets[offsets[i]:offsets[i + 1]], strongest
+first.
+"""
+import re
+from collections import Counter
+
+import numpy as np
+
+# "LKAS 39", "SLFRS 7", and the IASB numbering they follow ("IAS 39", "IFRS 7")
+REFERENCE = re.compile(r'\b(LKAS|SLFRS|IAS|IFRS)\s?(\d{1,2})\b')
+PREFIXES = {'LKAS': 'LKAS', 'IAS': 'LKAS', 'SLFRS': 'SLFRS', 'IFRS': 'SLFRS'}
+
+# Net mentions below this are passing references, not prerequisites
+MIN_WEIGHT = 3
+
+
+def count_references(pages):
+    # Mentions of every standard in a document's page texts
+    return Counter(
+        f"{PREFIXES[prefix]}{int(number)}"
+        for page in pages
+        for prefix, number in REFERENCE.findall(page)
+    )
+
+
+class CrossReferences:
+    """Standard mentions in each corpus document, by content hash.
+
+    A document is only scanned the first time its hash is seen, so after the
+    corpus changes only new and changed PDFs are read from the text cache again.
+    Documents not extracted yet have no mentions until they are.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.counts = {}
+
+    def mentions(self, sha256):
+        if sha256 not in self.counts:
+            pages = self.cache.pages(sha256)
+            if pages is None:
+                return None
+            self.counts[sha256] = count_references(pages)
+        return self.counts[sha256]
+
+    def graph(self, documents):
+        # `documents` maps standard ids to corpus manifest documents
+        return DependencyGraph.build({
+            standard_id: self.mentions(document['sha256']) or {}
+            for standard_id, document in documents.items()
+        })
+
+
+class DependencyGraph:
+    def __init__(self, ids, offsets, targets, weights):
+        self.ids = ids                    # standard id of every node
+        self.index = {standard_id: node for node, standard_id in enumerate(ids)}
+        self.offsets = offsets            # prerequisites of node i are offsets[i]:offsets[i + 1]
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def build(cls, references, min_weight=MIN_WEIGHT):
+        # `references` maps each standard id to its mentions of other standards
+        ids = sorted(references)
+        index = {standard_id: node for node, standard_id in enumerate(ids)}
+        edges = [[] for _ in ids]
+        for standard_id, mentions in references.items():
+            for other_id, count in mentions.items():
+                if other_id == standard_id or other_id not in index:
+                    continue
+                weight = count - references[other_id].get(standard_id, 0)
+                if weight >= min_weight:
+                    edges[index[standard_id]].append((-weight, index[other_id]))
+
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(node_edges) for node_edges in edges])
+        flat = [edge for node_edges in edges for edge in sorted(node_edges)]
+        targets = np.array([node for _, node in flat], dtype=np.int32)
+        weights = np.array([-weight for weight, _ in flat], dtype=np.int32)
+        return cls(ids, offsets, targets, weights)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def prerequisites(self, standard_id):
+        # [(standard id, weight)] the standard builds on, strongest first
+        node = self.index.get(standard_id)
+        if node is None:
+            return []
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return [(self.ids[target], weight) for target, weight in zip(self.targets[start:end].tolist(),
+                                                                     self.weights[start:end].tolist())]
+
+    def order(self, items, key=lambda item: item['id']):
+        """Reorder `items` so each comes after the prerequisites also among them.
+
+        Items are taken in their given order, and each first pulls in its own
+        prerequisites, strongest first. Where prerequisites form a cycle, the
+        first one reached goes first. Linear in the items and the graph's edges.
+        """
+        offsets = self.offsets.tolist()
+        targets = self.targets.tolist()
+        by_node = {}
+        for item in items:
+            node = self.index.get(key(item))
+            if node is not None:
+                by_node[node] = item
+
+        visited = [False] * len(self.ids)
+        ordered = []
+        for item in items:
+            node = self.index.get(key(item))
+            if node is None:
+                ordered.append(item)
+                continue
+            if visited[node]:
+                continue
+
+            # Depth first, an item goes after everything it pulled in
+            visited[node] = True
+            stack = [(node, offsets[node])]
+            while stack:
+                node, edge = stack[-1]
+                if edge == offsets[node + 1]:
+                    stack.pop()
+                    ordered.append(by_node[node])
+                    continue
+                stack[-1] = (node, edge + 1)
+                target = targets[edge]
+                if not visited[target] and target in by_node:
+                    visited[target] = True
+                    stack.append((target, offsets[target]))
+        return ordered
@@ -0,0 +1,93 @@
+import math
+
+# Used until the corpus manifest has word counts to measure them by
+DEFAULT_WORDS_PER_PAGE = 280
+# Study reading pace before any standard has been completed
+DEFAULT_WORDS_PER_HOUR = 2500
+# How much longer a hard standard takes per word than a medium one
+DIFFICULTY_FACTORS = {'high': 1.4, 'medium': 1.0, 'low': 0.75}
+# The prior pace counts as this many hours of logged study, so the first
+# completed standards nudge the rate rather than replace it
+PRIOR_HOURS = 8
+
+MIN_HOURS = 0.5
+
+
+class HourEstimator:
+    """Study hours for a standard from the length of its PDF.
+
+    Hours are the standard's words, weighted by difficulty, over a reading
+    rate in words per hour. It starts from a prior pace, such as the one the
+    catalog file's hours imply (`typed_rate()`), and `calibrate()` fits it to
+    the hours spent on standards already completed. Standards without a
+    document in the corpus get no estimate.
+    """
+
+    def __init__(self, documents, words_per_hour=DEFAULT_WORDS_PER_HOUR):
+        # `documents` maps standard ids to corpus manifest documents
+        self.documents = documents
+        self.prior = words_per_hour
+        self.words_per_hour = words_per_hour
+        self.calibrated_ids = None  # standards the rate was last fitted to
+
+        counted = [document for document in documents.values() if document.get('words')]
+        pages = sum(document['pages'] for document in counted)
+        self.words_per_page = sum(document['words'] for document in counted) / pages if pages else DEFAULT_WORDS_PER_PAGE
+
+    def words(self, standard_id):
+        document = self.documents.get(standard_id)
+        if document is None:
+            return None
+        return document.get('words') or document['pages'] * self.words_per_page
+
+    def effort(self, standard):
+        # Words weighted by difficulty; completed standards count as medium
+        words = self.words(standard['id'])
+        if words is None:
+            return None
+        return words * DIFFICULTY_FACTORS.get(standard['difficulty'], 1.0)
+
+    @property
+    def calibrated_on(self):
+        return len(self.calibrated_ids or ())
+
+    def typed_rate(self, standards):
+        # The pace the standards' typed total hours imply, the default without any
+        effort = 0.0
+        hours = 0.0
+        for standard in standards:
+            standard_effort = self.effort(standard)
+            if standard['totalHours'] > 0 and standard_effort is not None:
+                effort += standard_effort
+                hours += standard['totalHours']
+        return effort / hours if hours else DEFAULT_WORDS_PER_HOUR
+
+    def calibrate(self, standards):
+        # Fit the reading rate to every completed standard with hours spent:
+        # their total effort over their total hours, pulled towards the prior.
+        # Leave out hours that were filled in from an estimate rather than
+        # studied, or the fit feeds on its own output.
+        effort = 0.0
+        hours = 0.0
+        self.calibrated_ids = set()
+        for standard in standards:
+            standard_effort = self.effort(standard)
+            if standard['completed'] and standard['hoursSpent'] > 0 and standard_effort is not None:
+                effort += standard_effort
+                hours += standard['hoursSpent']
+                self.calibrated_ids.add(standard['id'])
+        self.words_per_hour = (self.prior * PRIOR_HOURS + effort) / (PRIOR_HOURS + hours)
+        return self.words_per_hour
+
+    def hours(self, standard):
+        # In half hours, and always some time left on a standard still being studied
+        effort = self.effort(standard)
+        if effort is None:
+            return None
+        hours = round(effort / self.words_per_hour * 2) / 2
+        return max(hours, standard['hoursSpent'] + MIN_HOURS)
+
+    @staticmethod
+    def days(hours, hours_per_day):
+        # Study days the hours take at a typical day's study time
+        return max(1, math.ceil(hours / hours_per_day)) if hours_per_day > 0 else 1
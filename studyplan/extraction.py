@@ -0,0 +1,242 @@
+"""Background text extraction for the PDF corpus.
+
+Text is extracted on a process pool, one PDF per task, and every result is
+written to the text cache as soon as it arrives. The cache is keyed by content
+hash, so duplicate downloads, renamed files and unchanged PDFs are never
+extracted twice. Fill it ahead of time with
+
+    python -m studyplan.extraction
+
+which also stores word counts in the corpus manifest. The app runs that same
+command in the background (see BackgroundExtraction) rather than starting a
+pool itself: spawned workers would re-run the Streamlit script as their main
+module.
+"""
+import atexit
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .corpus import update_manifest
+
+TEXT_CACHE_DIR = "text_cache"
+
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def pending_files(root, manifest, cache):
+    # Path of one file per distinct content hash that isn't cached yet
+    pending = {}
+    for name, entry in manifest['files'].items():
+        if entry.get('unreadable'):
+            continue
+        if entry['sha256'] not in pending and entry['sha256'] not in cache:
+            pending[entry['sha256']] = os.path.join(root, name)
+    return pending
+
+
+def extract_text(path):
+    # Runs in a worker process; pypdf is only needed here
+    from pypdf import PdfReader
+
+    pages = [page.extract_text() or "" for page in PdfReader(path).pages]
+    return {'pages': pages, 'words': sum(len(page.split()) for page in pages)}
+
+
+class TextCache:
+    """Extracted page texts on disk, one JSON file per content hash."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, sha256):
+        return os.path.join(self.directory, f"{sha256}.json")
+
+    def __contains__(self, sha256):
+        return os.path.exists(self.path(sha256))
+
+    def get(self, sha256):
+        try:
+            with open(self.path(sha256), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, sha256, text):
+        # Written under a temporary name of its own first, so a reader never
+        # sees half a file and two writers of the same hash never share one
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.directory, prefix=f"{sha256}.",
+                                         suffix=".tmp", delete=False) as f:
+            json.dump(text, f)
+        os.replace(f.name, self.path(sha256))
+
+    def pages(self, sha256):
+        text = self.get(sha256)
+        return None if text is None else text['pages']
+
+    def words(self, sha256):
+        text = self.get(sha256)
+        return None if text is None else text['words']
+
+
+class ExtractionService:
+    """Extracts every corpus file missing from the text cache, in the background.
+
+    `start()` hands the files to a process pool and returns at once; results
+    are written to the cache from the pool's callback thread as each file
+    finishes, and `progress()` can be read from any thread while that goes on.
+    """
+
+    def __init__(self, root, cache=None, workers=None):
+        self.root = root
+        self.cache = cache or TextCache(os.path.join(root, TEXT_CACHE_DIR))
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.total = 0
+        self.done = 0
+        self.failed = []
+        self.started = None
+        self.elapsed = None
+        self.lock = threading.Lock()
+        self.finished_event = threading.Event()
+
+    def start(self, manifest):
+        pending = pending_files(self.root, manifest, self.cache)
+        self.total = len(pending)
+        self.started = time.perf_counter()
+        if not pending:
+            self._finish()
+            return self
+
+        # Spawned workers don't inherit the app's threads or open connections
+        self.executor = ProcessPoolExecutor(
+            max_workers=min(self.workers, len(pending)), mp_context=multiprocessing.get_context("spawn")
+        )
+        for sha256, path in pending.items():
+            future = self.executor.submit(extract_text, path)
+            future.add_done_callback(lambda future, sha256=sha256, path=path: self._store(future, sha256, path))
+        return self
+
+    def _store(self, future, sha256, path):
+        try:
+            self.cache.put(sha256, future.result())
+        except Exception as error:
+            with self.lock:
+                self.failed.append((os.path.basename(path), str(error)))
+        with self.lock:
+            self.done += 1
+            finished = self.done == self.total
+        if finished:
+            self._finish()
+
+    def _finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.finished_event.set()
+
+    @property
+    def finished(self):
+        return self.finished_event.is_set()
+
+    def progress(self):
+        # (files extracted, files to extract)
+        with self.lock:
+            return self.done, self.total
+
+    def wait(self, timeout=None):
+        return self.finished_event.wait(timeout)
+
+    def close(self):
+        # Drops files not started yet and waits for the workers to exit, so
+        # none outlive a timeout or a failure
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class BackgroundExtraction:
+    """`python -m studyplan.extraction` running in its own process.
+
+    Progress is followed through the text cache, which the command fills one
+    file at a time, so checking on it never waits for the extraction. Files
+    still missing from the cache once the command has exited are reported as
+    failed. A command still running when the app exits is stopped.
+    """
+
+    def __init__(self, root, manifest, cache=None):
+        self.root = os.path.abspath(root)
+        self.cache = cache or TextCache(os.path.join(self.root, TEXT_CACHE_DIR))
+        self.workers = os.cpu_count() or 1
+        self.pending = pending_files(self.root, manifest, self.cache)
+        self.total = len(self.pending)
+        self.started = time.perf_counter()
+        self.elapsed = None if self.pending else 0.0
+        self.process = None
+        if self.pending:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "studyplan.extraction", self.root],
+                cwd=PACKAGE_PARENT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            atexit.register(self.stop)
+
+    @property
+    def finished(self):
+        if self.process is None or self.process.poll() is None:
+            return self.process is None
+        if self.elapsed is None:
+            self.elapsed = time.perf_counter() - self.started
+        return True
+
+    @property
+    def failed(self):
+        if not self.finished:
+            return []
+        return [os.path.basename(path) for sha256, path in self.pending.items() if sha256 not in self.cache]
+
+    def progress(self):
+        # (files extracted, files to extract)
+        return sum(1 for sha256 in self.pending if sha256 in self.cache), self.total
+
+    def stop(self, timeout=10):
+        # Asks the command to shut its pool down, kills it if it doesn't exit
+        # in time, and reaps it either way
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def main(argv):
+    # Extract everything missing from the cache, then record word counts in the manifest
+    root = argv[1] if len(argv) > 1 else "."
+    # Being stopped unwinds through the finally below, which reaps the workers
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    manifest, _ = update_manifest(root)
+    service = ExtractionService(root).start(manifest)
+    try:
+        while not service.wait(5):
+            done, total = service.progress()
+            print(f"  {done}/{total} files")
+    finally:
+        service.close()
+    manifest, _ = update_manifest(root, word_count=service.cache.words)
+    print(f"Extracted {service.total} files on {service.workers} workers in {service.elapsed:.1f} s "
+          f"({len(service.failed)} failed) -> {service.cache.directory}")
+    for name, error in service.failed:
+        print(f"  {name}: {error}")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
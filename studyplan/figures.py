@@ -0,0 +1,198 @@
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+DEFAULT_MAX_FIGURES = 16
+
+
+def fingerprint(*inputs):
+    # Content hash of a figure's inputs. Dates and other non-JSON values hash by
+    # their string form, which is all the figures ever show of them.
+    payload = json.dumps(inputs, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class FigureCache:
+    """LRU cache of built Plotly figures.
+
+    Each figure is stored under its name and a fingerprint of the inputs it was
+    built from, so a figure is only rebuilt when something it shows changed.
+    `hits` and `misses` count lookups since the cache was created.
+    """
+
+    def __init__(self, max_figures=DEFAULT_MAX_FIGURES):
+        self.max_figures = max_figures
+        self.figures = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, inputs, build):
+        # `inputs` is a tuple of everything `build(*inputs)` reads
+        key = (name, fingerprint(*inputs))
+        figure = self.figures.get(key)
+        if figure is not None:
+            self.hits += 1
+            self.figures.move_to_end(key)
+            return figure
+
+        self.misses += 1
+        figure = build(*inputs)
+        self.figures[key] = figure
+        if len(self.figures) > self.max_figures:
+            self.figures.popitem(last=False)
+        return figure
+
+    def __len__(self):
+        return len(self.figures)
+
+
+def efficiency_gauge(efficiency_score):
+    efficiency_color = "green" if efficiency_score >= 85 else "orange" if efficiency_score >= 60 else "red"
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=efficiency_score,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Efficiency Score"},
+        gauge={
+            'axis': {'range': [0, 100]},
+            'bar': {'color': efficiency_color},
+            'steps': [
+                {'range': [0, 60], 'color': "lightgray"},
+                {'range': [60, 85], 'color': "lightgray"},
+                {'range': [85, 100], 'color': "lightgray"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 60
+            }
+        }
+    ))
+
+    fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
+    return fig
+
+
+def category_hours_figure(category_hours):
+    # `category_hours` rows have 'name', 'total_hours' and 'completed_hours'
+    fig = go.Figure()
+
+    # Add total hours bars
+    fig.add_trace(go.Bar(
+        y=[cat['name'] for cat in category_hours],
+        x=[cat['total_hours'] for cat in category_hours],
+        orientation='h',
+        name='Total Hours',
+        marker_color='rgba(55, 83, 109, 0.7)',
+        text=[f"{cat['total_hours']} hrs" for cat in category_hours],
+        textposition='auto'
+    ))
+
+    # Add completed hours bars
+    fig.add_trace(go.Bar(
+        y=[cat['name'] for cat in category_hours],
+        x=[cat['completed_hours'] for cat in category_hours],
+        orientation='h',
+        name='Completed Hours',
+        marker_color='rgba(26, 188, 156, 0.7)',
+        text=[f"{cat['completed_hours']} hrs" for cat in category_hours],
+        textposition='auto'
+    ))
+
+    fig.update_layout(
+        title="Hours by Category",
+        xaxis_title="Hours",
+        barmode='overlay',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+
+def level_pie(counts, colors, title):
+    # `counts` maps 'high', 'medium' and 'low' to a number of standards
+    return px.pie(
+        values=[counts.get(level, 0) for level in ["high", "medium", "low"]],
+        names=["High", "Medium", "Low"],
+        color=["High", "Medium", "Low"],
+        color_discrete_map=colors,
+        title=title
+    )
+
+
+def burndown_figure(daily, remaining_hours, today, exam_date):
+    # `daily` is the day rollup of the session log, (day, hours, sessions) rows
+    # oldest first. Hours still to study at the end of each day are worked back
+    # from today's `remaining_hours`, so the log itself is never read.
+    days = [day for day, _, _ in daily]
+    logged = np.array([hours for _, hours, _ in daily], dtype=float)
+    # Remaining at the end of each day is what's left now plus everything logged after it
+    remaining = remaining_hours + logged[::-1].cumsum()[::-1] - logged
+
+    fig = go.Figure()
+    if days:
+        fig.add_trace(go.Scatter(
+            x=[days[0] - timedelta(days=1)] + days,
+            y=[remaining_hours + logged.sum()] + remaining.tolist(),
+            mode='lines+markers',
+            line_shape='hv',
+            name='Hours Remaining',
+            line=dict(color='rgba(55, 83, 109, 0.9)')
+        ))
+    fig.add_trace(go.Scatter(
+        x=[today, exam_date],
+        y=[remaining_hours, 0],
+        mode='lines',
+        name='Needed Pace',
+        line=dict(color='purple', dash='dash')
+    ))
+
+    fig.update_layout(
+        title="Burn-down",
+        xaxis_title="Date",
+        yaxis_title="Hours remaining",
+        yaxis=dict(rangemode='tozero'),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+
+def velocity_figure(weekly, weekly_capacity):
+    # `weekly` is the week rollup of the session log; `weekly_capacity` is the
+    # hours the weekly schedule sets aside
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=[week for week, _, _ in weekly],
+        y=[hours for _, hours, _ in weekly],
+        name='Hours Studied',
+        marker_color='rgba(26, 188, 156, 0.7)',
+        text=[f"{sessions} sessions" for _, _, sessions in weekly],
+        textposition='auto'
+    ))
+
+    fig.update_layout(
+        title="Weekly Velocity",
+        xaxis=dict(title="Week of", type='date', tickformat="%b %d"),
+        yaxis_title="Hours",
+        shapes=[dict(
+            type='line', xref='paper', yref='y', x0=0, x1=1, y0=weekly_capacity, y1=weekly_capacity,
+            line=dict(color='gray', dash='dash')
+        )],
+        annotations=[dict(
+            xref='paper', yref='y', x=1, y=weekly_capacity, text="Weekly schedule", showarrow=False,
+            xanchor='right', yanchor='bottom', font=dict(size=10)
+        )],
+        showlegend=False
+    )
+    return fig
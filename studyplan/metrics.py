@@ -0,0 +1,60 @@
+class CatalogMetrics:
+    """Running totals over every standard in a StandardStore.
+
+    The totals are computed once and then kept up to date from the store's change
+    notifications, so reading them never rescans the catalog. `recomputes` counts
+    the full scans.
+    """
+
+    def __init__(self, store):
+        self.recomputes = 0
+        self.recompute(store)
+        store.subscribe(self.on_change)
+
+    def recompute(self, store):
+        self.recomputes += 1
+        self.total_hours = 0
+        self.completed_hours = 0
+        self.completed_standards = 0
+        self.incomplete_standards = 0
+        self.category_hours = {category['id']: {'totalHours': 0, 'completedHours': 0} for category in store.categories}
+        self.priority_counts = {}
+        self.difficulty_counts = {}
+
+        for category, standard in store.iter_standards():
+            self._apply(category['id'], standard, 1)
+
+    def _apply(self, category_id, standard, sign):
+        self.total_hours += sign * standard['totalHours']
+        self.completed_hours += sign * standard['hoursSpent']
+
+        category_hours = self.category_hours.setdefault(category_id, {'totalHours': 0, 'completedHours': 0})
+        category_hours['totalHours'] += sign * standard['totalHours']
+        category_hours['completedHours'] += sign * standard['hoursSpent']
+
+        if standard['completed']:
+            self.completed_standards += sign
+        else:
+            self.incomplete_standards += sign
+            # Priority and difficulty breakdowns only cover what's left to study
+            self.priority_counts[standard['priority']] = self.priority_counts.get(standard['priority'], 0) + sign
+            self.difficulty_counts[standard['difficulty']] = self.difficulty_counts.get(standard['difficulty'], 0) + sign
+
+    def on_change(self, category_id, previous, current):
+        if previous is not None:
+            self._apply(category_id, previous, -1)
+        if current is not None:
+            self._apply(category_id, current, 1)
+
+    def snapshot(self):
+        return {
+            'totalHours': self.total_hours,
+            'completedHours': self.completed_hours,
+            'remainingHours': self.total_hours - self.completed_hours,
+            'completedStandards': self.completed_standards,
+            'incompleteStandards': self.incomplete_standards,
+            'categoryHours': {category_id: dict(hours) for category_id, hours in self.category_hours.items()},
+            'priorityCounts': dict(self.priority_counts),
+            'difficultyCounts': dict(self.difficulty_counts),
+            'recomputes': self.recomputes
+        }
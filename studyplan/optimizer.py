@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+
+# Value of covering one standard before the exam, by priority
+PRIORITY_WEIGHTS = {'high': 4, 'medium': 2, 'low': 1}
+
+# The knapsack works in half hours, the step used by the hour inputs
+SLOTS_PER_HOUR = 2
+
+DEFAULT_TIME_BUDGET = 0.3  # seconds
+
+
+def priority_weight(standard):
+    return PRIORITY_WEIGHTS.get(standard['priority'], 1)
+
+
+def select_standards(standards, hours_needed, capacity_hours, time_budget=DEFAULT_TIME_BUDGET):
+    """Pick the standards that maximize priority-weighted coverage.
+
+    Because standards can be split across days, any set whose hours fit in the
+    free capacity can be scheduled, which makes this a 0/1 knapsack over
+    half-hour slots. Returns one bool per standard, or None if the time budget
+    ran out before the table was complete.
+    """
+    deadline = time.perf_counter() + time_budget
+
+    capacity = int(np.floor(capacity_hours * SLOTS_PER_HOUR + 1e-9))
+    sizes = np.ceil(np.asarray(hours_needed, dtype=float) * SLOTS_PER_HOUR - 1e-9).astype(np.int64)
+    weights = np.array([priority_weight(s) for s in standards], dtype=float)
+
+    # Everything fits, nothing to optimize
+    if sizes.sum() <= capacity:
+        return [True] * len(standards)
+
+    best = np.zeros(capacity + 1)
+    keep = np.zeros((len(standards), capacity + 1), dtype=bool)
+
+    for i, (size, weight) in enumerate(zip(sizes.tolist(), weights.tolist())):
+        if time.perf_counter() > deadline:
+            return None
+        if size > capacity:
+            continue
+        candidate = best[:capacity + 1 - size] + weight
+        improved = candidate > best[size:]
+        keep[i, size:] = improved
+        best[size:] = np.where(improved, candidate, best[size:])
+
+    selected = [False] * len(standards)
+    remaining = capacity
+    for i in range(len(standards) - 1, -1, -1):
+        if keep[i, remaining]:
+            selected[i] = True
+            remaining -= sizes[i]
+    return selected
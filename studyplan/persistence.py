@@ -0,0 +1,567 @@
+import json
+import queue
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from .reviews import ReviewState
+
+STANDARD_COLUMNS = (
+    'id', 'name', 'completed', 'priority', 'difficulty', 'totalHours',
+    'hoursSpent', 'notes', 'scheduledDate', 'recommendedDays'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    expanded INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS standards (
+    id TEXT PRIMARY KEY,
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    priority TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    totalHours REAL NOT NULL,
+    hoursSpent REAL NOT NULL,
+    notes TEXT NOT NULL,
+    scheduledDate TEXT,
+    recommendedDays INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS standards_by_category ON standards (category_id, position);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    standard_id TEXT PRIMARY KEY,
+    ease REAL NOT NULL,
+    interval INTEGER NOT NULL,
+    repetitions INTEGER NOT NULL,
+    due TEXT NOT NULL,
+    last_review TEXT
+);
+"""
+
+
+def _session_schema(prefix, owner=()):
+    # The study log and its rollups. The log is append-only; session_days sums
+    # each standard's hours per day, which decides when a change starts a
+    # session. `owner` columns (user_id) lead every key in a shared database.
+    columns = "".join(f"{column} TEXT NOT NULL,\n    " for column in owner)
+    key = "".join(f"{column}, " for column in owner)
+    return f"""
+CREATE TABLE IF NOT EXISTS {prefix}sessions (
+    {columns}standard_id TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    hours REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS {prefix}session_days (
+    {columns}standard_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    hours REAL NOT NULL,
+    PRIMARY KEY ({key}standard_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS {prefix}session_rollups (
+    {columns}period TEXT NOT NULL,
+    start TEXT NOT NULL,
+    hours REAL NOT NULL,
+    sessions INTEGER NOT NULL,
+    PRIMARY KEY ({key}period, start)
+) WITHOUT ROWID;
+"""
+
+
+SCHEMA += _session_schema("")
+
+# What each user can change about a standard; everything else comes from the catalog
+USER_FIELDS = ('completed', 'priority', 'hoursSpent', 'notes', 'scheduledDate')
+
+OVERLAY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress (
+    user_id TEXT NOT NULL,
+    standard_id TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    priority TEXT NOT NULL,
+    hoursSpent REAL NOT NULL,
+    notes TEXT NOT NULL,
+    scheduledDate TEXT,
+    PRIMARY KEY (user_id, standard_id)
+);
+CREATE TABLE IF NOT EXISTS user_settings (
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (user_id, key)
+);
+CREATE TABLE IF NOT EXISTS user_reviews (
+    user_id TEXT NOT NULL,
+    standard_id TEXT NOT NULL,
+    ease REAL NOT NULL,
+    interval INTEGER NOT NULL,
+    repetitions INTEGER NOT NULL,
+    due TEXT NOT NULL,
+    last_review TEXT,
+    PRIMARY KEY (user_id, standard_id)
+);
+"""
+
+OVERLAY_SCHEMA += _session_schema("user_", ("user_id",))
+
+REVIEW_COLUMNS = ('ease', 'interval', 'repetitions', 'due', 'last_review')
+
+DEFAULT_POOL_SIZE = 4
+
+
+def _number(value):
+    # Hours come back from SQLite as floats; keep whole numbers as ints
+    return int(value) if float(value).is_integer() else value
+
+
+def _encode_review(state):
+    last_review = state.last_review.isoformat() if state.last_review else None
+    return [state.ease, state.interval, state.repetitions, state.due.isoformat(), last_review]
+
+
+def _rollup_starts(start):
+    # Sessions are summed per day and per week (from Monday) as they are logged;
+    # this is the first day of each period a session starting at `start` falls in
+    day = start.date()
+    return {'day': day, 'week': day - timedelta(days=day.weekday())}
+
+
+def _session_change(previous_hours, hours):
+    # A standard's study on one day is one session, counted while its hours
+    # that day are above zero
+    return int(previous_hours + hours > 0) - int(previous_hours > 0)
+
+
+def _log_session(connection, prefix, owner, standard_id, start, hours):
+    # Append to the study log, then add the hours to the standard's day and to
+    # the day and week rollups, in the caller's transaction. `prefix` and
+    # `owner` ({} or {'user_id': ...}) pick the tables and the user's rows.
+    keys = list(owner) + ['standard_id']
+    values = list(owner.values()) + [standard_id]
+    connection.execute(
+        f"INSERT INTO {prefix}sessions ({', '.join(keys)}, start, hours) VALUES ({', '.join('?' * len(keys))}, ?, ?)",
+        values + [int(start.timestamp()), hours]
+    )
+
+    day = [start.date().isoformat()]
+    previous = connection.execute(
+        f"SELECT hours FROM {prefix}session_days WHERE {' AND '.join(f'{key} = ?' for key in keys)} AND day = ?",
+        values + day
+    ).fetchone()
+    connection.execute(
+        f"INSERT INTO {prefix}session_days ({', '.join(keys)}, day, hours) VALUES ({', '.join('?' * len(keys))}, ?, ?) "
+        f"ON CONFLICT({', '.join(keys)}, day) DO UPDATE SET hours = hours + excluded.hours",
+        values + day + [hours]
+    )
+
+    sessions = _session_change(previous[0] if previous else 0, hours)
+    keys = list(owner) + ['period', 'start']
+    for period, period_start in _rollup_starts(start).items():
+        connection.execute(
+            f"INSERT INTO {prefix}session_rollups ({', '.join(keys)}, hours, sessions) "
+            f"VALUES ({', '.join('?' * len(keys))}, ?, ?) "
+            f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET hours = hours + excluded.hours, "
+            f"sessions = sessions + excluded.sessions",
+            list(owner.values()) + [period, period_start.isoformat(), hours, sessions]
+        )
+
+
+def _load_rollup(connection, prefix, owner, period):
+    # (first day, hours, sessions) of every `period` with study logged, oldest first
+    rows = connection.execute(
+        f"SELECT start, hours, sessions FROM {prefix}session_rollups "
+        f"WHERE {''.join(f'{key} = ? AND ' for key in owner)}period = ? ORDER BY start",
+        list(owner.values()) + [period]
+    ).fetchall()
+    return [(date.fromisoformat(start), hours, sessions) for start, hours, sessions in rows]
+
+
+def _log_change(log_session, previous, current):
+    # A store change to hoursSpent is logged as a session that just ended.
+    # Lowering it logs the correction, so the rollups keep adding up to it and
+    # a correction entered again is not counted as another session.
+    if previous is None or current is None:
+        return
+    hours = current['hoursSpent'] - previous['hoursSpent']
+    if hours:
+        log_session(current['id'], datetime.now() - timedelta(hours=max(0, hours)), hours)
+
+
+def _decode_review(row):
+    ease, interval, repetitions, due, last_review = row
+    return ReviewState(
+        date.fromisoformat(due), ease, interval, repetitions,
+        date.fromisoformat(last_review) if last_review else None
+    )
+
+
+class StateDatabase:
+    """SQLite-backed store for study progress and settings.
+
+    The database runs in WAL mode and every write is its own transaction, so a
+    crash leaves either the old or the new row, never a partial one. Mutators
+    only write the standard they changed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def load_categories(self):
+        categories = []
+        by_id = {}
+        for category_id, name, expanded in self.connection.execute(
+            "SELECT id, name, expanded FROM categories ORDER BY position"
+        ):
+            category = {"id": category_id, "name": name, "expanded": bool(expanded), "standards": []}
+            categories.append(category)
+            by_id[category_id] = category
+
+        columns = ", ".join(STANDARD_COLUMNS)
+        for row in self.connection.execute(
+            f"SELECT category_id, {columns} FROM standards ORDER BY category_id, position"
+        ):
+            by_id[row[0]]['standards'].append(self._decode_standard(row[1:]))
+        return categories
+
+    def save_catalog(self, categories):
+        # Replace everything in one transaction
+        with self.connection:
+            self.connection.execute("DELETE FROM standards")
+            self.connection.execute("DELETE FROM categories")
+            for position, category in enumerate(categories):
+                self._write_category(category, position)
+                for standard_position, standard in enumerate(category['standards']):
+                    self._write_standard(category['id'], standard, standard_position)
+
+    def save_category(self, category, position):
+        with self.connection:
+            self._write_category(category, position)
+
+    def save_standard(self, category_id, standard, position):
+        with self.connection:
+            self._write_standard(category_id, standard, position)
+
+    def load_settings(self):
+        return {key: json.loads(value) for key, value in self.connection.execute("SELECT key, value FROM settings")}
+
+    def save_setting(self, key, value):
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO settings (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value))
+            )
+
+    def load_reviews(self):
+        columns = ", ".join(REVIEW_COLUMNS)
+        return {
+            row[0]: _decode_review(row[1:])
+            for row in self.connection.execute(f"SELECT standard_id, {columns} FROM reviews")
+        }
+
+    def save_review(self, standard_id, state):
+        columns = ", ".join(REVIEW_COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in REVIEW_COLUMNS)
+        with self.connection:
+            self.connection.execute(
+                f"INSERT INTO reviews (standard_id, {columns}) VALUES (?, ?, ?, ?, ?, ?) "
+                f"ON CONFLICT(standard_id) DO UPDATE SET {updates}",
+                [standard_id] + _encode_review(state)
+            )
+
+    def delete_review(self, standard_id):
+        with self.connection:
+            self.connection.execute("DELETE FROM reviews WHERE standard_id = ?", (standard_id,))
+
+    def log_session(self, standard_id, start, hours):
+        with self.connection:
+            _log_session(self.connection, "", {}, standard_id, start, hours)
+
+    def load_rollup(self, period):
+        return _load_rollup(self.connection, "", {}, period)
+
+    def track(self, store):
+        # Write each standard back as soon as the store reports a change, and log
+        # any change to its hours as a study session
+        def save_change(category_id, previous, current):
+            if current is not None:
+                self.save_standard(category_id, current, store.record_position[current['id']])
+            _log_change(self.log_session, previous, current)
+        store.subscribe(save_change)
+
+    def checkpoint(self):
+        # Fold the WAL back into the main database file
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _write_category(self, category, position):
+        self.connection.execute(
+            "INSERT INTO categories (id, position, name, expanded) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET position = excluded.position, name = excluded.name, "
+            "expanded = excluded.expanded",
+            (category['id'], position, category['name'], int(category['expanded']))
+        )
+
+    def _write_standard(self, category_id, standard, position):
+        values = [category_id, position] + self._encode_standard(standard)
+        placeholders = ", ".join("?" * len(values))
+        columns = ", ".join(STANDARD_COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in ('category_id', 'position') + STANDARD_COLUMNS[1:])
+        self.connection.execute(
+            f"INSERT INTO standards (category_id, position, {columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}",
+            values
+        )
+
+    @staticmethod
+    def _encode_standard(standard):
+        values = [standard[column] for column in STANDARD_COLUMNS]
+        values[STANDARD_COLUMNS.index('completed')] = int(standard['completed'])
+        scheduled = standard['scheduledDate']
+        values[STANDARD_COLUMNS.index('scheduledDate')] = scheduled.isoformat() if scheduled else None
+        return values
+
+    @staticmethod
+    def _decode_standard(row):
+        standard = dict(zip(STANDARD_COLUMNS, row))
+        standard['completed'] = bool(standard['completed'])
+        standard['totalHours'] = _number(standard['totalHours'])
+        standard['hoursSpent'] = _number(standard['hoursSpent'])
+        if standard['scheduledDate']:
+            standard['scheduledDate'] = datetime.fromisoformat(standard['scheduledDate'])
+        return standard
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def apply_overlay(catalog, overlay):
+    # A user's own category lists over the catalog. Only standards with saved
+    # fields are copied; the rest stay shared with the catalog.
+    return [
+        {
+            **category,
+            'standards': [
+                {**standard, **overlay[standard['id']]} if standard['id'] in overlay else standard
+                for standard in category['standards']
+            ]
+        }
+        for category in catalog
+    ]
+
+
+class OverlayDatabase:
+    """Per-user progress on top of a shared, read-only catalog.
+
+    Only the fields in USER_FIELDS are stored, one row per user and standard
+    they have touched, plus each user's settings. Connections come from a small
+    pool, so the sessions of a whole cohort share a handful of them; WAL mode
+    lets readers carry on while one of them writes.
+    """
+
+    def __init__(self, path, pool_size=DEFAULT_POOL_SIZE):
+        self.path = path
+        self.pool = queue.Queue()
+        for _ in range(pool_size):
+            self.pool.put(_connect(path))
+        with self.connection() as connection:
+            connection.executescript(OVERLAY_SCHEMA)
+
+    @contextmanager
+    def connection(self):
+        # Blocks while every pooled connection is in use
+        connection = self.pool.get()
+        try:
+            yield connection
+        finally:
+            self.pool.put(connection)
+
+    def close(self):
+        while not self.pool.empty():
+            self.pool.get().close()
+
+    def for_user(self, user_id, catalog):
+        return UserState(self, user_id, catalog)
+
+    def load_overlay(self, user_id):
+        columns = ", ".join(USER_FIELDS)
+        with self.connection() as connection:
+            rows = connection.execute(
+                f"SELECT standard_id, {columns} FROM progress WHERE user_id = ?", (user_id,)
+            ).fetchall()
+        return {row[0]: self._decode_fields(row[1:]) for row in rows}
+
+    def save_standard(self, user_id, standard):
+        with self.connection() as connection, connection:
+            self._write_standard(connection, user_id, standard)
+
+    def replace_overlay(self, user_id, standards):
+        # Swap a user's saved standards for `standards` in one transaction
+        with self.connection() as connection, connection:
+            connection.execute("DELETE FROM progress WHERE user_id = ?", (user_id,))
+            for standard in standards:
+                self._write_standard(connection, user_id, standard)
+
+    def load_settings(self, user_id):
+        with self.connection() as connection:
+            rows = connection.execute("SELECT key, value FROM user_settings WHERE user_id = ?", (user_id,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def save_setting(self, user_id, key, value):
+        with self.connection() as connection, connection:
+            connection.execute(
+                "INSERT INTO user_settings (user_id, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id, key) DO UPDATE SET value = excluded.value",
+                (user_id, key, json.dumps(value))
+            )
+
+    def load_reviews(self, user_id):
+        columns = ", ".join(REVIEW_COLUMNS)
+        with self.connection() as connection:
+            rows = connection.execute(
+                f"SELECT standard_id, {columns} FROM user_reviews WHERE user_id = ?", (user_id,)
+            ).fetchall()
+        return {row[0]: _decode_review(row[1:]) for row in rows}
+
+    def save_review(self, user_id, standard_id, state):
+        columns = ", ".join(REVIEW_COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in REVIEW_COLUMNS)
+        with self.connection() as connection, connection:
+            connection.execute(
+                f"INSERT INTO user_reviews (user_id, standard_id, {columns}) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                f"ON CONFLICT(user_id, standard_id) DO UPDATE SET {updates}",
+                [user_id, standard_id] + _encode_review(state)
+            )
+
+    def delete_review(self, user_id, standard_id):
+        with self.connection() as connection, connection:
+            connection.execute(
+                "DELETE FROM user_reviews WHERE user_id = ? AND standard_id = ?", (user_id, standard_id)
+            )
+
+    def log_session(self, user_id, standard_id, start, hours):
+        with self.connection() as connection, connection:
+            _log_session(connection, "user_", {'user_id': user_id}, standard_id, start, hours)
+
+    def load_rollup(self, user_id, period):
+        with self.connection() as connection:
+            return _load_rollup(connection, "user_", {'user_id': user_id}, period)
+
+    def checkpoint(self):
+        with self.connection() as connection:
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    @staticmethod
+    def _write_standard(connection, user_id, standard):
+        values = [user_id, standard['id']] + [standard[field] for field in USER_FIELDS]
+        values[2 + USER_FIELDS.index('completed')] = int(standard['completed'])
+        scheduled = standard['scheduledDate']
+        values[2 + USER_FIELDS.index('scheduledDate')] = scheduled.isoformat() if scheduled else None
+        columns = ", ".join(USER_FIELDS)
+        updates = ", ".join(f"{field} = excluded.{field}" for field in USER_FIELDS)
+        connection.execute(
+            f"INSERT INTO progress (user_id, standard_id, {columns}) VALUES (?, ?, {', '.join('?' * len(USER_FIELDS))}) "
+            f"ON CONFLICT(user_id, standard_id) DO UPDATE SET {updates}",
+            values
+        )
+
+    @staticmethod
+    def _decode_fields(row):
+        fields = dict(zip(USER_FIELDS, row))
+        fields['completed'] = bool(fields['completed'])
+        fields['hoursSpent'] = _number(fields['hoursSpent'])
+        if fields['scheduledDate']:
+            fields['scheduledDate'] = datetime.fromisoformat(fields['scheduledDate'])
+        return fields
+
+
+class UserState:
+    """One user's slice of an OverlayDatabase.
+
+    Offers the same methods as StateDatabase, so the app doesn't need to know
+    which one it is talking to. Only standards that differ from the catalog are
+    written.
+    """
+
+    def __init__(self, database, user_id, catalog):
+        self.database = database
+        self.user_id = user_id
+        self.catalog = catalog
+        self.catalog_standards = {
+            standard['id']: standard for category in catalog for standard in category['standards']
+        }
+
+    def load_categories(self):
+        return apply_overlay(self.catalog, self.database.load_overlay(self.user_id))
+
+    def save_catalog(self, categories):
+        self.database.replace_overlay(self.user_id, [
+            standard for category in categories for standard in category['standards'] if self._differs(standard)
+        ])
+
+    def save_category(self, category, position):
+        # Categories belong to the shared catalog
+        pass
+
+    def save_standard(self, category_id, standard, position):
+        if standard['id'] in self.catalog_standards:
+            self.database.save_standard(self.user_id, standard)
+
+    def load_settings(self):
+        return self.database.load_settings(self.user_id)
+
+    def save_setting(self, key, value):
+        self.database.save_setting(self.user_id, key, value)
+
+    def load_reviews(self):
+        return self.database.load_reviews(self.user_id)
+
+    def save_review(self, standard_id, state):
+        self.database.save_review(self.user_id, standard_id, state)
+
+    def delete_review(self, standard_id):
+        self.database.delete_review(self.user_id, standard_id)
+
+    def log_session(self, standard_id, start, hours):
+        self.database.log_session(self.user_id, standard_id, start, hours)
+
+    def load_rollup(self, period):
+        return self.database.load_rollup(self.user_id, period)
+
+    def track(self, store):
+        def save_change(category_id, previous, current):
+            # Catalog fields, like estimated hours, are recomputed per session
+            if current is not None and current['id'] in self.catalog_standards and (
+                    previous is None or any(current[field] != previous[field] for field in USER_FIELDS)):
+                self.database.save_standard(self.user_id, current)
+            _log_change(self.log_session, previous, current)
+        store.subscribe(save_change)
+
+    def checkpoint(self):
+        self.database.checkpoint()
+
+    def close(self):
+        # The pool is shared with every other session
+        pass
+
+    def _differs(self, standard):
+        original = self.catalog_standards.get(standard['id'])
+        return original is not None and any(standard[field] != original[field] for field in USER_FIELDS)
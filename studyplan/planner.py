@@ -0,0 +1,376 @@
+from bisect import bisect_left, insort
+
+import numpy as np
+
+from .calendar import StudyCalendar
+from .columns import StandardColumns
+from .optimizer import DEFAULT_TIME_BUDGET, select_standards
+from .reviews import review_hours
+
+PRIORITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+DIFFICULTY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+PLANNING_MODES = {
+    'hours': "Pack by hours",
+    'days': "Recommended days",
+    'optimal': "Maximize priority coverage",
+    'prerequisites': "Prerequisites first",
+    'clusters': "Related standards together"
+}
+
+NOT_ENOUGH_TIME = "not enough study time before the exam"
+LEFT_OUT = "left out to fit more higher-priority standards before the exam"
+
+# Keys a plan entry holds itself; the rest come from its standard
+PLAN_FIELDS = (
+    'categoryId', 'categoryName', 'startDate', 'endDate', 'daysNeeded', 'hoursNeeded',
+    'unscheduledReason', 'pinned', 'review'
+)
+_PLAN_FIELD_SET = frozenset(PLAN_FIELDS)
+
+
+def plan_order_key(standard):
+    return (
+        PRIORITY_ORDER.get(standard['priority'], 3),
+        DIFFICULTY_ORDER.get(standard['difficulty'], 3)
+    )
+
+
+def remaining_hours(standard):
+    return standard['totalHours'] - standard['hoursSpent']
+
+
+def needs_study(standard):
+    return not standard['completed'] and remaining_hours(standard) > 0
+
+
+class PlanEntry:
+    """One standard's place in the plan.
+
+    Reads like the dicts the rest of the app uses: the keys in PLAN_FIELDS are
+    slots on the entry and every other key reads through to the standard it
+    was made from, so planning never copies a standard. The store replaces a
+    standard when it changes, so an entry keeps the version it was planned with.
+    """
+
+    __slots__ = ('standard',) + PLAN_FIELDS
+
+    def __init__(self, category, standard, review=False):
+        self.standard = standard
+        self.categoryId = category['id']
+        self.categoryName = category['name']
+        self.startDate = None
+        self.endDate = None
+        self.daysNeeded = 0
+        self.hoursNeeded = review_hours(standard) if review else remaining_hours(standard)
+        self.unscheduledReason = None
+        self.pinned = False
+        self.review = review
+
+    def __getitem__(self, key):
+        if key in _PLAN_FIELD_SET:
+            return getattr(self, key)
+        return self.standard[key]
+
+    def __setitem__(self, key, value):
+        if key not in _PLAN_FIELD_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        # Lets dict(entry) and {**entry} make a plain copy
+        return [*self.standard.keys(), *PLAN_FIELDS]
+
+
+def plan_entry(category, standard):
+    return PlanEntry(category, standard)
+
+
+def days_needed(entry):
+    # A review session takes one study day in days mode
+    return 1 if entry.review else entry['recommendedDays']
+
+
+def collect_incomplete_standards(categories, columns=None):
+    if columns is None:
+        columns = StandardColumns(categories)
+
+    # Sort by priority (high, medium, low), then difficulty
+    rows = columns.plan_order(columns.needs_study()).tolist()
+    return [PlanEntry(columns.record_categories[row], columns.records[row]) for row in rows]
+
+
+def schedule_standards(entries, calendar, mode, cursor=0):
+    # Schedules plan entries (already in plan order) in place. Returns them and
+    # the allocation cursor after each of them.
+    if mode == 'days':
+        start_days, end_days, cursors = calendar.allocate_days([days_needed(entry) for entry in entries], cursor)
+    else:
+        hours_needed = [entry.hoursNeeded for entry in entries]
+        start_days, end_days, cursors = calendar.allocate_hours(hours_needed, cursor)
+
+    return schedule_entries(entries, calendar, mode, start_days.tolist(), end_days.tolist()), cursors.tolist()
+
+
+def schedule_entries(entries, calendar, mode, start_days, end_days):
+    if mode == 'days':
+        study_days = [days_needed(entry) for entry in entries]
+    else:
+        study_days = calendar.study_days_between(np.asarray(start_days), np.asarray(end_days)).tolist()
+
+    for entry, start_day, end_day, days in zip(entries, start_days, end_days, study_days):
+        scheduled = start_day >= 0
+        entry.startDate = calendar.date_for(start_day) if scheduled else None
+        entry.endDate = calendar.date_for(end_day) if scheduled else None
+        entry.daysNeeded = days if scheduled or mode == 'days' else 0
+        entry.unscheduledReason = None if scheduled else NOT_ENOUGH_TIME
+    return entries
+
+
+def schedule_pinned(pinned, calendar, mode, reviews=()):
+    # Reserve pinned standards on their scheduledDate, then review sessions from
+    # their due date, earliest first. Reviews move on to the first time the
+    # pins leave free from their due date and never push a pin. Returns the
+    # plan entries that fit, and the conflicting pins with a reason each;
+    # reviews that don't fit before the exam are left out.
+    reserved = sorted(
+        [(calendar.day_for(s['scheduledDate']), False, s) for s in pinned]
+        + [(calendar.day_for(due), True, entry) for entry, due in reviews],
+        key=lambda item: item[:2]
+    )
+    days = [day for day, _, _ in reserved]
+    spill = [is_review for _, is_review, _ in reserved]
+    entries = [entry for _, _, entry in reserved]
+
+    if mode == 'days':
+        start_days, end_days, reasons = calendar.place_days(days, [days_needed(s) for s in entries], spill)
+    else:
+        start_days, end_days, reasons = calendar.reserve_hours(days, [s.hoursNeeded for s in entries], spill)
+
+    placed = [(s, start, end) for s, start, end, reason in zip(entries, start_days, end_days, reasons) if reason is None]
+    placed_entries = schedule_entries(
+        [s for s, _, _ in placed], calendar, mode,
+        [start for _, start, _ in placed], [end for _, _, end in placed]
+    )
+    for entry in placed_entries:
+        entry.pinned = not entry.review
+
+    conflicts = [(s, reason) for s, reason in zip(entries, reasons) if reason is not None and not s.review]
+    return placed_entries, conflicts
+
+
+def conflict_entry(standard, reason):
+    return {
+        'id': standard['id'],
+        'name': standard['name'],
+        'scheduledDate': standard['scheduledDate'],
+        'reason': reason
+    }
+
+
+def build_study_plan(categories, daily_study_hours, days_remaining, start=None, mode='hours',
+                     time_budget=DEFAULT_TIME_BUDGET, reviews=(), dependencies=None, clusters=None):
+    planner = IncrementalPlanner(
+        categories, daily_study_hours, days_remaining, start, mode, time_budget, reviews, dependencies, clusters
+    )
+    return planner.plan, planner.summary
+
+
+def summarize_plan(plan, calendar, mode, conflicts=(), fallback=False):
+    scheduled = [item for item in plan if item.startDate is not None]
+    scheduled_hours = sum(item.hoursNeeded for item in scheduled)
+    reviews = [item for item in scheduled if item.review]
+    return {
+        'mode': mode,
+        'capacityHours': calendar.total_hours,
+        'scheduledHours': scheduled_hours,
+        'unusedHours': max(0.0, calendar.total_hours - scheduled_hours),
+        'unscheduled': len(plan) - len(scheduled),
+        'unscheduledHours': sum(item.hoursNeeded for item in plan) - scheduled_hours,
+        'finishDate': max((item.endDate for item in scheduled), default=None),
+        'reviews': len(reviews),
+        'reviewHours': sum(item.hoursNeeded for item in reviews),
+        'conflicts': list(conflicts),
+        'fallback': fallback
+    }
+
+
+class IncrementalPlanner:
+    """Keeps the sorted study queue and allocation cursors between edits.
+
+    Pinned standards are reserved on their scheduledDate first, and reviews of
+    completed standards from their due date; the queue then fills whatever
+    capacity is left. In prerequisites mode the queue is packed by hours in
+    the order of the dependency graph, each standard after the ones it builds
+    on, and in clusters mode each cluster of related standards is one
+    contiguous block. Changing one unpinned standard only
+    reschedules the queue from the first position the change affects, and
+    everything before it is kept. The result is the same plan a full rebuild
+    produces.
+    """
+
+    def __init__(self, categories, daily_study_hours, days_remaining, start=None, mode='hours',
+                 time_budget=DEFAULT_TIME_BUDGET, reviews=(), dependencies=None, clusters=None):
+        # `reviews` are (standard id, due date) pairs of reviews to fit in;
+        # `dependencies` is the DependencyGraph prerequisites mode orders by,
+        # `clusters` the StudyClusters clusters mode groups by
+        self.calendar = StudyCalendar(daily_study_hours, days_remaining, start)
+        self.mode = mode
+        self.fallback = False
+        self.settings = self._settings(daily_study_hours, self.calendar.days, self.calendar.start, mode)
+
+        columns = StandardColumns(categories)
+
+        # Catalog position of every standard, keeps ties in catalog order
+        self.positions = {standard['id']: row for row, standard in enumerate(columns.records)}
+
+        rows = columns.plan_order(columns.needs_study())
+        standards = [PlanEntry(columns.record_categories[row], columns.records[row]) for row in rows.tolist()]
+        is_pinned = columns.pinned[rows]
+        pinned = [s for s, pin in zip(standards, is_pinned.tolist()) if pin]
+        self.pinned_ids = {s['id'] for s in pinned}
+
+        reviews = [(standard_id, due) for standard_id, due in reviews if standard_id in self.positions]
+        self.review_ids = {standard_id for standard_id, _ in reviews}
+        review_entries = [
+            (PlanEntry(columns.record_categories[row], columns.records[row], review=True), due)
+            for row, due in ((self.positions[standard_id], due) for standard_id, due in reviews)
+        ]
+        self.reserved_plan, conflicts = schedule_pinned(pinned, self.calendar, mode, review_entries)
+        self.conflicts = [conflict_entry(s, reason) for s, reason in conflicts]
+
+        # Pins that don't fit are planned like any other standard
+        conflicting_ids = {s['id'] for s, _ in conflicts}
+        in_queue = ~is_pinned
+        in_queue[is_pinned] = [s['id'] in conflicting_ids for s in pinned]
+        queue = [s for s, queued in zip(standards, in_queue.tolist()) if queued]
+
+        # Same keys as _queue_key(), straight from the columns
+        queue_rows = rows[in_queue]
+        self.keys = list(zip(
+            columns.priority[queue_rows].tolist(), columns.difficulty[queue_rows].tolist(), queue_rows.tolist()
+        ))
+        self.queued_keys = {columns.records[row]['id']: key for row, key in zip(queue_rows.tolist(), self.keys)}
+
+        left_out = set()
+        if mode == 'optimal':
+            selected = select_standards(
+                queue, [remaining_hours(s) for s in queue], self.calendar.free_hours, time_budget
+            )
+            if selected is None:
+                # Out of time, keep the greedy priority order
+                self.fallback = True
+            else:
+                # Chosen standards first, still in priority order
+                left_out = {s['id'] for s, chosen in zip(queue, selected) if not chosen}
+                queue = [s for s in queue if s['id'] not in left_out] + [s for s in queue if s['id'] in left_out]
+        elif mode == 'prerequisites' and dependencies is not None:
+            queue = dependencies.order(queue)
+        elif mode == 'clusters' and clusters is not None:
+            queue = clusters.order(queue)
+
+        self.queue_plan, self.cursors = schedule_standards(queue, self.calendar, mode)
+        for entry in self.queue_plan:
+            if entry.startDate is None and entry['id'] in left_out:
+                entry.unscheduledReason = LEFT_OUT
+        self._refresh()
+
+    @staticmethod
+    def _settings(daily_study_hours, days_remaining, start, mode):
+        return (tuple(daily_study_hours), max(0, days_remaining), start.date(), mode)
+
+    def _queue_key(self, standard):
+        return (*plan_order_key(standard), self.positions[standard['id']])
+
+    def matches(self, daily_study_hours, days_remaining, start, mode):
+        # The calendar is only valid for the same schedule, horizon and day
+        return self.settings == self._settings(daily_study_hours, days_remaining, start, mode)
+
+    def update_standard(self, category, standard):
+        return self.update_standards([(category, standard)])
+
+    def update_standards(self, changes):
+        # Apply several (category, standard) changes and reschedule once, from
+        # the first queue position any of them affects. Returns False when the
+        # changes need a full rebuild: unknown standards, anything that adds,
+        # moves or removes a pin, standards with a review planned, and every edit in optimal mode since one
+        # standard can change the whole selection. The same goes for prerequisites and clusters modes,
+        # where the queue isn't in key order.
+        if self.mode in ('optimal', 'prerequisites', 'clusters'):
+            return False
+        # The last change to a standard wins
+        changes = list({standard['id']: (category, standard) for category, standard in changes}.values())
+        for _, standard in changes:
+            if standard['id'] not in self.positions:
+                return False
+            if standard['id'] in self.pinned_ids or standard['id'] in self.review_ids or (standard['scheduledDate'] is not None and needs_study(standard)):
+                return False
+
+        first_changed = len(self.keys)
+
+        # Everything before the smallest index touched keeps its place and cursor
+        for _, standard in changes:
+            old_key = self.queued_keys.pop(standard['id'], None)
+            if old_key is not None:
+                index = bisect_left(self.keys, old_key)
+                del self.keys[index]
+                del self.queue_plan[index]
+                first_changed = min(first_changed, index)
+
+        for category, standard in changes:
+            if needs_study(standard):
+                new_key = self._queue_key(standard)
+                self.queued_keys[standard['id']] = new_key
+                insort(self.keys, new_key)
+                index = bisect_left(self.keys, new_key)
+                self.queue_plan.insert(index, plan_entry(category, standard))
+                first_changed = min(first_changed, index)
+
+        self._reschedule_from(first_changed)
+        return True
+
+    def _reschedule_from(self, index):
+        cursor = self.cursors[index - 1] if index > 0 else 0
+        tail, cursors = schedule_standards(self.queue_plan[index:], self.calendar, self.mode, cursor)
+        self.queue_plan[index:] = tail
+        self.cursors[index:] = cursors
+        self._refresh()
+
+    def _refresh(self):
+        self.plan = self.queue_plan + self.reserved_plan
+        self.summary = summarize_plan(self.plan, self.calendar, self.mode, self.conflicts, self.fallback)
+
+
+class PlanEdits:
+    """Plan changes collected during one rerun and applied together.
+
+    Standard edits are kept by id, so only the latest version of each standard
+    is applied. Anything that changes the calendar or the mode asks for a full
+    rebuild instead.
+    """
+
+    def __init__(self):
+        self.standards = {}
+        self.rebuild = False
+
+    def standard_changed(self, category, standard):
+        self.standards[standard['id']] = (category, standard)
+
+    def rebuild_needed(self):
+        self.rebuild = True
+
+    def changes(self):
+        return list(self.standards.values())
+
+    def clear(self):
+        self.standards = {}
+        self.rebuild = False
+
+    def __bool__(self):
+        return self.rebuild or bool(self.standards)
@@ -0,0 +1,105 @@
+import heapq
+from datetime import timedelta
+
+# SM-2 answer quality for each button the app shows
+REVIEW_GRADES = {'again': 1, 'hard': 3, 'good': 4, 'easy': 5}
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# Longest gap between reviews, in days
+MAX_INTERVAL = 365
+
+# A review takes a quarter of the standard's hours, in half hours, at least half an hour
+REVIEW_SHARE = 0.25
+MIN_REVIEW_HOURS = 0.5
+
+
+def review_hours(standard):
+    return max(MIN_REVIEW_HOURS, round(standard['totalHours'] * REVIEW_SHARE * 2) / 2)
+
+
+class ReviewState:
+    """SM-2 review state of one standard."""
+
+    __slots__ = ('ease', 'interval', 'repetitions', 'due', 'last_review')
+
+    def __init__(self, due, ease=DEFAULT_EASE, interval=0, repetitions=0, last_review=None):
+        self.due = due
+        self.ease = ease
+        self.interval = interval
+        self.repetitions = repetitions
+        self.last_review = last_review
+
+    def reviewed(self, quality, today):
+        # The state after a review graded `quality` (0-5) on `today`
+        if quality < 3:
+            repetitions = 0
+            interval = 1
+        else:
+            repetitions = self.repetitions + 1
+            if repetitions == 1:
+                interval = 1
+            elif repetitions == 2:
+                interval = 6
+            else:
+                interval = min(MAX_INTERVAL, round(self.interval * self.ease))
+        ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        return ReviewState(today + timedelta(days=interval), ease, interval, repetitions, today)
+
+
+class ReviewQueue:
+    """Review state per standard, with a heap of due dates.
+
+    Rescheduling or removing a standard leaves its old heap entry behind; stale
+    entries are skipped when they reach the top and the heap is rebuilt once
+    they outnumber the live ones. Finding what's due costs O(k log n) for k due
+    reviews, however long the history.
+    """
+
+    def __init__(self, states=None):
+        self.states = dict(states or {})
+        self.heap = [(state.due, standard_id) for standard_id, state in self.states.items()]
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, standard_id):
+        return standard_id in self.states
+
+    def get(self, standard_id):
+        return self.states.get(standard_id)
+
+    def schedule(self, standard_id, state):
+        self.states[standard_id] = state
+        heapq.heappush(self.heap, (state.due, standard_id))
+        self._compact()
+        return state
+
+    def add(self, standard_id, due):
+        # A newly completed standard; its first review is on `due`
+        return self.schedule(standard_id, ReviewState(due))
+
+    def record(self, standard_id, quality, today):
+        return self.schedule(standard_id, self.states[standard_id].reviewed(quality, today))
+
+    def remove(self, standard_id):
+        self.states.pop(standard_id, None)
+        self._compact()
+
+    def due(self, until):
+        # (standard id, due date) of every review due on or before `until`, earliest first
+        due = []
+        while self.heap and self.heap[0][0] <= until:
+            entry = heapq.heappop(self.heap)
+            state = self.states.get(entry[1])
+            if state is not None and state.due == entry[0] and (not due or due[-1] != entry):
+                due.append(entry)
+        for entry in due:
+            heapq.heappush(self.heap, entry)
+        return [(standard_id, due_date) for due_date, standard_id in due]
+
+    def _compact(self):
+        if len(self.heap) > 2 * len(self.states) + 16:
+            self.heap = [(state.due, standard_id) for standard_id, state in self.states.items()]
+            heapq.heapify(self.heap)
@@ -0,0 +1,201 @@
+"""Full-text search over the bundled standard PDFs.
+
+The index is built offline, once, with
+
+    python -m studyplan.search
+
+which takes every PDF's text from the extraction cache, splits it into
+paragraphs and writes an inverted index (term -> paragraph postings) to
+``search_index/``. The app only loads that index, so queries never reopen a PDF.
+"""
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from .corpus import standard_id_for, update_manifest
+from .extraction import ExtractionService
+
+INDEX_DIR = "search_index"
+POSTINGS_FILE = "postings.npz"
+PARAGRAPHS_FILE = "paragraphs.json"
+
+TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this to was were which with shall"
+    " may not be been such other any all".split()
+)
+
+# A numbered paragraph in the standards: "6  Borrowing costs ...", "AG12 ...", "BC4A ..."
+PARAGRAPH_NUMBER = re.compile(r"^([A-Z]{0,3}\d+[A-Z]?)\s+\S")
+
+SNIPPET_LENGTH = 240
+
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+def extract_pages(path):
+    # pypdf is only needed to build the index, not to search it
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def split_paragraphs(page_text, paragraph_label=None):
+    # Blocks are separated by blank lines. Lettered sub-items keep the number of
+    # the paragraph they belong to. Returns [(label, text)] and the last label.
+    paragraphs = []
+    for block in re.split(r"\n\s*\n", page_text):
+        text = " ".join(line.strip() for line in block.splitlines()).strip()
+        if not text:
+            continue
+        match = PARAGRAPH_NUMBER.match(text)
+        if match:
+            paragraph_label = match.group(1)
+        paragraphs.append((paragraph_label, text))
+    return paragraphs, paragraph_label
+
+
+class SearchIndex:
+    def __init__(self, documents, paragraphs, terms, offsets, paragraph_ids, frequencies):
+        self.documents = documents        # [{'standardId', 'file'}]
+        self.paragraphs = paragraphs      # [[document, page, label, text]]
+        self.terms = terms                # sorted array of terms
+        self.offsets = offsets            # postings of terms[i] are offsets[i]:offsets[i + 1]
+        self.paragraph_ids = paragraph_ids
+        self.frequencies = frequencies
+
+    @classmethod
+    def build(cls, pdf_paths, extract=extract_pages):
+        documents = []
+        paragraphs = []
+        postings = {}
+
+        for path in pdf_paths:
+            standard_id = standard_id_for(path)
+            if standard_id is None:
+                continue
+            document = len(documents)
+            documents.append({'standardId': standard_id, 'file': os.path.basename(path)})
+
+            label = None
+            for page_number, page_text in enumerate(extract(path), start=1):
+                page_paragraphs, label = split_paragraphs(page_text, label)
+                for paragraph_label, text in page_paragraphs:
+                    paragraph_id = len(paragraphs)
+                    paragraphs.append([document, page_number, paragraph_label, text])
+                    for term, count in Counter(tokenize(text)).items():
+                        postings.setdefault(term, []).append((paragraph_id, count))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[term]) for term in terms])
+        paragraph_ids = np.fromiter(
+            (paragraph_id for term in terms for paragraph_id, _ in postings[term]), dtype=np.int32, count=offsets[-1])
+        frequencies = np.fromiter(
+            (count for term in terms for _, count in postings[term]), dtype=np.int32, count=offsets[-1])
+        return cls(documents, paragraphs, np.array(terms, dtype=str), offsets, paragraph_ids, frequencies)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        # Write to temporary names first so a reader never sees half an index
+        postings_path = os.path.join(directory, POSTINGS_FILE)
+        paragraphs_path = os.path.join(directory, PARAGRAPHS_FILE)
+        with open(postings_path + ".tmp", "wb") as f:
+            np.savez(f, terms=self.terms, offsets=self.offsets,
+                     paragraph_ids=self.paragraph_ids, frequencies=self.frequencies)
+        with open(paragraphs_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({'documents': self.documents, 'paragraphs': self.paragraphs}, f)
+        os.replace(postings_path + ".tmp", postings_path)
+        os.replace(paragraphs_path + ".tmp", paragraphs_path)
+
+    @classmethod
+    def load(cls, directory):
+        with np.load(os.path.join(directory, POSTINGS_FILE)) as postings:
+            arrays = {name: postings[name] for name in postings.files}
+        with open(os.path.join(directory, PARAGRAPHS_FILE), encoding="utf-8") as f:
+            text = json.load(f)
+        return cls(text['documents'], text['paragraphs'], arrays['terms'], arrays['offsets'],
+                   arrays['paragraph_ids'], arrays['frequencies'])
+
+    @staticmethod
+    def exists(directory):
+        return all(os.path.exists(os.path.join(directory, name)) for name in (POSTINGS_FILE, PARAGRAPHS_FILE))
+
+    def postings(self, term):
+        index = int(np.searchsorted(self.terms, term))
+        if index >= len(self.terms) or self.terms[index] != term:
+            return None
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.paragraph_ids[start:end], self.frequencies[start:end]
+
+    def search(self, query, limit=20):
+        # Paragraphs containing every query term, ranked by tf-idf
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        matched = None
+        scores = None
+        for term in terms:
+            found = self.postings(term)
+            if found is None:
+                return []
+            paragraph_ids, frequencies = found
+            weights = frequencies * math.log(len(self.paragraphs) / len(paragraph_ids))
+            if matched is None:
+                matched, scores = paragraph_ids, weights
+            else:
+                matched, left, right = np.intersect1d(matched, paragraph_ids, assume_unique=True, return_indices=True)
+                scores = scores[left] + weights[right]
+
+        results = []
+        for position in np.argsort(-scores, kind='stable')[:limit]:
+            document, page, label, text = self.paragraphs[matched[position]]
+            results.append({
+                'standardId': self.documents[document]['standardId'],
+                'file': self.documents[document]['file'],
+                'page': page,
+                'paragraph': label,
+                'snippet': snippet(text, terms),
+                'score': float(scores[position])
+            })
+        return results
+
+
+def snippet(text, terms):
+    # A window of the paragraph around the first matching term
+    lowered = text.lower()
+    first = min((lowered.find(term) for term in terms if term in lowered), default=0)
+    start = max(0, first - SNIPPET_LENGTH // 3)
+    end = start + SNIPPET_LENGTH
+    return ("…" if start > 0 else "") + text[start:end] + ("…" if end < len(text) else "")
+
+
+def main(argv):
+    root = argv[1] if len(argv) > 1 else "."
+    directory = argv[2] if len(argv) > 2 else os.path.join(root, INDEX_DIR)
+
+    started = time.perf_counter()
+    # One PDF per standard; duplicate downloads of the same file are skipped.
+    # Text comes from the extraction cache, filling in whatever it's missing first.
+    manifest, _ = update_manifest(root)
+    service = ExtractionService(root).start(manifest)
+    service.wait()
+    hashes = {os.path.join(root, document['file']): document['sha256'] for document in manifest['documents'].values()}
+    index = SearchIndex.build(sorted(hashes), extract=lambda path: service.cache.pages(hashes[path]) or [])
+    index.save(directory)
+    print(f"Indexed {len(index.documents)} PDFs, {len(index.paragraphs)} paragraphs, "
+          f"{len(index.terms)} terms in {time.perf_counter() - started:.1f} s -> {directory}")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
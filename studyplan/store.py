@@ -0,0 +1,74 @@
+class StandardStore:
+    """Keyed access to the category/standard catalog.
+
+    The nested ``categories`` list stays the canonical, ordered form (it is what
+    gets exported and planned over). Indexes keyed by id sit next to it, so looking
+    up or updating one standard doesn't need a scan of every category.
+    """
+
+    def __init__(self, categories):
+        self.categories = categories
+        self.category_index = {}   # category id -> category
+        self.records = {}          # standard id -> standard
+        self.record_category = {}  # standard id -> category id
+        self.record_position = {}  # standard id -> position within its category
+        self.category_ids = {}     # category id -> standard ids, in catalog order
+        self.listeners = []        # called as listener(category_id, previous, current)
+
+        for category in categories:
+            self._index_category(category)
+
+    def _index_category(self, category):
+        self.category_index[category['id']] = category
+        self.category_ids[category['id']] = []
+        for standard in category['standards']:
+            self._index_standard(category['id'], standard)
+
+    def _index_standard(self, category_id, standard):
+        if standard['id'] in self.records:
+            raise ValueError(f"Duplicate standard id: {standard['id']}")
+        self.records[standard['id']] = standard
+        self.record_category[standard['id']] = category_id
+        self.record_position[standard['id']] = len(self.category_ids[category_id])
+        self.category_ids[category_id].append(standard['id'])
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def _notify(self, category_id, previous, current):
+        for listener in self.listeners:
+            listener(category_id, previous, current)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, standard_id):
+        return standard_id in self.records
+
+    def get(self, standard_id):
+        return self.records[standard_id]
+
+    def category(self, category_id):
+        return self.category_index[category_id]
+
+    def category_of(self, standard_id):
+        return self.category_index[self.record_category[standard_id]]
+
+    def standards_in(self, category_id):
+        return [self.records[standard_id] for standard_id in self.category_ids[category_id]]
+
+    def iter_standards(self):
+        for category in self.categories:
+            for standard_id in self.category_ids[category['id']]:
+                yield category, self.records[standard_id]
+
+    def update(self, standard_id, **fields):
+        # The record is replaced rather than changed in place, so records shared
+        # with other sessions (see catalog.session_categories) are never written to
+        previous = self.records[standard_id]
+        standard = {**previous, **fields}
+        category_id = self.record_category[standard_id]
+        self.records[standard_id] = standard
+        self.category_index[category_id]['standards'][self.record_position[standard_id]] = standard
+        self._notify(category_id, previous, standard)
+        return standard
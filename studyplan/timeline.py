@@ -0,0 +1,177 @@
+from collections import defaultdict
+
+import pandas as pd
+import plotly.graph_objects as go
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+STANDARD_COLUMNS = [
+    'name', 'full_name', 'start_date', 'end_date', 'color', 'y_position',
+    'priority', 'difficulty', 'totalHours', 'hoursSpent'
+]
+
+
+STARTED_COLOR = "rgba(52, 152, 219, 0.7)"
+NOT_STARTED_COLOR = "rgba(46, 204, 113, 0.7)"
+REVIEW_COLOR = "rgba(230, 126, 34, 0.7)"
+
+
+def timeline_items(plan, categories):
+    """Category and standard rows of the timeline, in catalog category order.
+
+    The plan is grouped by category in a single pass, so any number of
+    categories works. Categories with nothing in the plan are left out, and
+    each category is followed by a blank row. Returns the rows and the number
+    of y positions they take.
+    """
+    by_category = defaultdict(list)
+    for item in plan:
+        by_category[item['categoryId']].append(item)
+
+    items = []
+    y_position = 0
+    for category in categories:
+        category_items = by_category.get(category['id'])
+        if not category_items:
+            continue
+
+        items.append({'type': 'category', 'name': category['name'], 'y_position': y_position})
+        y_position += 1
+
+        for item in category_items:
+            if not item['startDate'] or not item['endDate']:
+                continue
+
+            if item.get('review'):
+                color = REVIEW_COLOR
+            else:
+                # Blue if started, green if not
+                color = STARTED_COLOR if item['hoursSpent'] > 0 else NOT_STARTED_COLOR
+
+            items.append({
+                'type': 'standard',
+                'name': item['name'].split(' - ')[0],
+                'start_date': item['startDate'].date(),
+                'end_date': item['endDate'].date(),
+                'color': color,
+                'y_position': y_position,
+                'full_name': item['name'],
+                'priority': item['priority'],
+                'difficulty': item['difficulty'],
+                'totalHours': item['totalHours'],
+                'hoursSpent': item['hoursSpent']
+            })
+            y_position += 1
+
+        y_position += 1  # Add space between categories
+
+    return items, y_position
+
+
+def standards_frame(items):
+    # Columnar view of the standard rows of the timeline
+    frame = pd.DataFrame(
+        [item for item in items if item['type'] == 'standard'],
+        columns=['type'] + STANDARD_COLUMNS
+    ).drop(columns='type')
+    frame['start_date'] = pd.to_datetime(frame['start_date'])
+    frame['end_date'] = pd.to_datetime(frame['end_date'])
+    return frame
+
+
+def _marker(x, rows, label, color, width, dash=None):
+    shape = dict(
+        type='line', xref='x', yref='y', x0=x, x1=x, y0=0, y1=rows,
+        line=dict(color=color, width=width, dash=dash)
+    )
+    annotation = dict(
+        x=x, y=0, text=label, showarrow=False, yanchor='bottom',
+        font=dict(size=10, color=color if color != 'gray' else None)
+    )
+    return shape, annotation
+
+
+def build_timeline_figure(frame, category_labels, week_markers, today, exam_date, rows):
+    """Gantt chart of the plan as a single bar trace.
+
+    `frame` holds one row per standard (see `standards_frame`). Week, today and
+    exam markers are layout shapes rather than traces, so the number of traces
+    stays constant however long the plan is.
+    """
+    shapes = []
+    annotations = []
+
+    for week in week_markers:
+        shape, annotation = _marker(week['date'], rows, week['label'], 'gray', 1, 'dash')
+        shapes.append(shape)
+        annotations.append(annotation)
+
+    for x, label, color in [(today, "Today", 'red'), (exam_date, "Exam", 'purple')]:
+        shape, annotation = _marker(x, rows, label, color, 2)
+        shapes.append(shape)
+        annotations.append(annotation)
+
+    for label in category_labels:
+        annotations.append(dict(
+            x=today, y=label['y_position'] + 0.5, text=label['name'], showarrow=False,
+            xanchor='left', font=dict(size=12, color='black')
+        ))
+
+    fig = go.Figure()
+
+    if len(frame):
+        # Bars on a date axis are measured in milliseconds
+        duration_ms = ((frame['end_date'] - frame['start_date']).dt.days + 1) * DAY_MS
+        hover = (
+            frame['full_name']
+            + "<br>Priority: " + frame['priority'].astype(str)
+            + "<br>Difficulty: " + frame['difficulty'].astype(str)
+            + "<br>Hours needed: " + frame['totalHours'].astype(str)
+            + "<br>Hours spent: " + frame['hoursSpent'].astype(str)
+        )
+        fig.add_trace(go.Bar(
+            x=duration_ms,
+            y=frame['y_position'],
+            base=frame['start_date'],
+            orientation='h',
+            marker_color=frame['color'],
+            text=frame['name'],
+            textposition='inside',
+            hoverinfo='text',
+            hovertext=hover
+        ))
+
+    fig.update_layout(
+        title="Study Timeline",
+        xaxis=dict(
+            title="Date",
+            type='date',
+            tickformat="%b %d",
+            tickmode="auto",
+            nticks=10,
+        ),
+        yaxis=dict(
+            visible=False,
+            showticklabels=False
+        ),
+        shapes=shapes,
+        annotations=annotations,
+        height=max(500, rows * 30),  # Dynamic height based on number of items
+        bargap=0.2,
+        bargroupgap=0.1,
+        showlegend=False,
+        margin=dict(l=150, r=20, t=40, b=20)
+    )
+    return fig
+
+
+def timeline_figure(items, week_markers, today, exam_date, rows):
+    # Figure straight from the Timeline tab's category and standard rows
+    return build_timeline_figure(
+        standards_frame(items),
+        [item for item in items if item['type'] == 'category'],
+        week_markers,
+        today,
+        exam_date,
+        rows
+    )
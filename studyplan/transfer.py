@@ -0,0 +1,182 @@
+import gzip
+import io
+import json
+from datetime import datetime
+
+from .planner import PLANNING_MODES
+
+EXPORT_FORMAT = "accounting-study-plan"
+EXPORT_VERSION = 1
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+LEVELS = {"high", "medium", "low", "completed"}
+
+# Field name -> accepted types; datetimes travel as ISO 8601 strings
+STANDARD_SCHEMA = {
+    'id': (str,),
+    'name': (str,),
+    'completed': (bool,),
+    'priority': (str,),
+    'difficulty': (str,),
+    'totalHours': (int, float),
+    'hoursSpent': (int, float),
+    'notes': (str,),
+    'scheduledDate': (datetime, type(None)),
+    'recommendedDays': (int,),
+}
+
+CATEGORY_SCHEMA = {
+    'id': (int,),
+    'name': (str,),
+    'expanded': (bool,),
+}
+
+
+class InvalidExportError(ValueError):
+    pass
+
+
+def _encode_standard(standard):
+    encoded = {field: standard[field] for field in STANDARD_SCHEMA}
+    if encoded['scheduledDate'] is not None:
+        encoded['scheduledDate'] = encoded['scheduledDate'].isoformat()
+    return encoded
+
+
+def iter_export(categories, settings):
+    """Yield the export document piece by piece, one standard at a time."""
+    header = {
+        "format": EXPORT_FORMAT,
+        "version": EXPORT_VERSION,
+        "exported_at": datetime.now().isoformat(),
+        **{key: value.isoformat() if isinstance(value, datetime) else value for key, value in settings.items()}
+    }
+    # Everything but the closing brace of the header, then the categories array
+    yield json.dumps(header)[:-1] + ', "categories": [\n'
+
+    for category_index, category in enumerate(categories):
+        category_header = {field: category[field] for field in CATEGORY_SCHEMA}
+        yield ("" if category_index == 0 else ",\n") + json.dumps(category_header)[:-1] + ', "standards": [\n'
+        for standard_index, standard in enumerate(category['standards']):
+            yield ("" if standard_index == 0 else ",\n") + json.dumps(_encode_standard(standard), separators=(',', ':'))
+        yield "\n]}"
+
+    yield "\n]}\n"
+
+
+def write_export(fileobj, categories, settings, compress=False):
+    # Stream into a binary file object, gzip-compressed if asked
+    if compress:
+        with gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6) as gz:
+            for chunk in iter_export(categories, settings):
+                gz.write(chunk.encode("utf-8"))
+    else:
+        for chunk in iter_export(categories, settings):
+            fileobj.write(chunk.encode("utf-8"))
+
+
+def export_bytes(categories, settings, compress=False):
+    buffer = io.BytesIO()
+    write_export(buffer, categories, settings, compress)
+    return buffer.getvalue()
+
+
+def _check_fields(record, schema, where):
+    missing = [field for field in schema if field not in record]
+    if missing:
+        raise InvalidExportError(f"{where}: missing {', '.join(missing)}")
+    for field, types in schema.items():
+        value = record[field]
+        # bool is an int subclass; don't let true/false pass as numbers
+        if isinstance(value, bool) and bool not in types:
+            raise InvalidExportError(f"{where}: {field} must be {types[0].__name__}")
+        if not isinstance(value, types):
+            raise InvalidExportError(f"{where}: {field} must be {types[0].__name__}")
+
+
+def _decode_standard(raw, where):
+    if not isinstance(raw, dict):
+        raise InvalidExportError(f"{where}: expected an object")
+    standard = dict(raw)
+    if isinstance(standard.get('scheduledDate'), str):
+        try:
+            standard['scheduledDate'] = datetime.fromisoformat(standard['scheduledDate'])
+        except ValueError:
+            raise InvalidExportError(f"{where}: scheduledDate is not an ISO date")
+    _check_fields(standard, STANDARD_SCHEMA, where)
+    standard = {field: standard[field] for field in STANDARD_SCHEMA}
+
+    if standard['priority'] not in LEVELS or standard['difficulty'] not in LEVELS:
+        raise InvalidExportError(f"{where}: priority and difficulty must be one of {', '.join(sorted(LEVELS))}")
+    if standard['totalHours'] < 0 or standard['hoursSpent'] < 0 or standard['recommendedDays'] < 0:
+        raise InvalidExportError(f"{where}: hours and days can't be negative")
+    return standard
+
+
+def load_export(data):
+    """Parse and validate an export (plain or gzip-compressed bytes).
+
+    Returns (categories, settings). Raises InvalidExportError with a readable message if
+    the document doesn't match the schema.
+    """
+    if data[:2] == GZIP_MAGIC:
+        try:
+            data = gzip.decompress(data)
+        except (OSError, EOFError) as error:
+            raise InvalidExportError(f"Not a valid gzip export: {error}")
+    try:
+        document = json.loads(data)
+    except ValueError as error:
+        raise InvalidExportError(f"Not a valid JSON export: {error}")
+
+    if not isinstance(document, dict) or document.get("format") != EXPORT_FORMAT:
+        raise InvalidExportError("Not a study plan export")
+    if document.get("version") != EXPORT_VERSION:
+        raise InvalidExportError(f"Unsupported export version: {document.get('version')}")
+
+    try:
+        exam_date = datetime.fromisoformat(document["exam_date"])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidExportError("exam_date is missing or not an ISO date")
+
+    daily_study_hours = document.get("daily_study_hours")
+    if (not isinstance(daily_study_hours, list) or len(daily_study_hours) != 7
+            or not all(isinstance(h, (int, float)) and not isinstance(h, bool) and 0 <= h <= 24 for h in daily_study_hours)):
+        raise InvalidExportError("daily_study_hours must be 7 numbers between 0 and 24")
+
+    settings = {"exam_date": exam_date, "daily_study_hours": daily_study_hours}
+    if "planning_mode" in document:
+        if document["planning_mode"] not in PLANNING_MODES:
+            raise InvalidExportError(f"planning_mode must be one of {', '.join(PLANNING_MODES)}")
+        settings["planning_mode"] = document["planning_mode"]
+
+    # A missing list would restore as an empty plan and wipe the user's progress
+    if not isinstance(document.get("categories"), list):
+        raise InvalidExportError("categories is missing or not a list")
+
+    return decode_categories(document["categories"]), settings
+
+
+def decode_categories(raw_categories):
+    # Validated categories and standards from their JSON form; raises
+    # InvalidExportError naming the first record that doesn't fit the schema
+    categories = []
+    seen = set()
+    for category_index, raw_category in enumerate(raw_categories):
+        where = f"categories[{category_index}]"
+        if not isinstance(raw_category, dict):
+            raise InvalidExportError(f"{where}: expected an object")
+        _check_fields(raw_category, CATEGORY_SCHEMA, where)
+
+        standards = []
+        for standard_index, raw_standard in enumerate(raw_category.get("standards") or []):
+            standard = _decode_standard(raw_standard, f"{where}.standards[{standard_index}]")
+            if standard['id'] in seen:
+                raise InvalidExportError(f"Duplicate standard id: {standard['id']}")
+            seen.add(standard['id'])
+            standards.append(standard)
+
+        categories.append({field: raw_category[field] for field in CATEGORY_SCHEMA} | {"standards": standards})
+
+    return categories
@@ -0,0 +1,107 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from studyplan.planner import IncrementalPlanner, build_study_plan
+
+DAILY_STUDY_HOURS = [1, 2, 1, 2, 2, 1, 1]
+START = datetime(2027, 1, 4, 9)
+DAYS = 120
+PLAN_FIELDS = ('id', 'startDate', 'endDate', 'daysNeeded', 'hoursNeeded', 'priority', 'hoursSpent', 'scheduledDate',
+               'unscheduledReason', 'pinned', 'review')
+
+
+def make_categories(n_standards, rng):
+    levels = ['high', 'medium', 'low']
+    categories = []
+    for category_id in range(1, 4):
+        standards = []
+        for i in range(n_standards):
+            total_hours = rng.randint(1, 8)
+            standards.append({
+                'id': f"C{category_id}S{i}", 'name': f"Standard {category_id}.{i}", 'completed': False,
+                'priority': rng.choice(levels), 'difficulty': rng.choice(levels),
+                'totalHours': total_hours, 'hoursSpent': 0, 'notes': "", 'scheduledDate': None,
+                'recommendedDays': max(1, total_hours - 1)
+            })
+        categories.append({'id': category_id, 'name': f"Category {category_id}", 'expanded': False,
+                           'standards': standards})
+    return categories
+
+
+def random_edit(rng, standard, edits=('hours', 'priority', 'toggle', 'pin')):
+    edit = rng.choice(edits)
+    if edit == 'hours':
+        standard['hoursSpent'] = rng.choice([0, 0.5, 1, 2, 3, 6])
+        standard['completed'] = standard['hoursSpent'] >= standard['totalHours']
+    elif edit == 'priority':
+        standard['priority'] = rng.choice(['high', 'medium', 'low'])
+    elif edit == 'pin':
+        if standard['scheduledDate'] is None:
+            standard['scheduledDate'] = START + timedelta(days=rng.randint(-5, DAYS + 5))
+        else:
+            standard['scheduledDate'] = None
+    else:
+        standard['completed'] = not standard['completed']
+        if standard['completed']:
+            standard['hoursSpent'] = standard['totalHours']
+
+
+def plan_rows(plan):
+    return [tuple(item[field] for field in PLAN_FIELDS) for item in plan]
+
+
+def assert_matches_rebuild(planner, categories, mode, reviews):
+    plan, summary = build_study_plan(categories, DAILY_STUDY_HOURS, DAYS, START, mode, reviews=reviews)
+    assert plan_rows(planner.plan) == plan_rows(plan)
+    assert planner.summary == summary
+
+
+@pytest.mark.parametrize('mode', ['hours', 'days'])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_single_edits_match_full_rebuild(mode, seed):
+    rng = random.Random(seed)
+    # More hours than the calendar holds, so some standards are left unscheduled
+    categories = make_categories(40, rng)
+    reviews = [("C1S0", START.date() + timedelta(days=3)), ("C2S5", START.date() + timedelta(days=10))]
+    for category in categories:
+        for standard in category['standards']:
+            if standard['id'] in dict(reviews):
+                standard['completed'] = True
+    planner = IncrementalPlanner(categories, DAILY_STUDY_HOURS, DAYS, START, mode, reviews=reviews)
+
+    for _ in range(150):
+        category = rng.choice(categories)
+        standard = rng.choice(category['standards'])
+        random_edit(rng, standard)
+        if not planner.update_standard(category, standard):
+            # Pins and reviewed standards need a full rebuild
+            planner = IncrementalPlanner(categories, DAILY_STUDY_HOURS, DAYS, START, mode, reviews=reviews)
+        assert_matches_rebuild(planner, categories, mode, reviews)
+
+
+@pytest.mark.parametrize('mode', ['hours', 'days'])
+def test_batched_edits_match_full_rebuild(mode):
+    rng = random.Random(7)
+    categories = make_categories(40, rng)
+    planner = IncrementalPlanner(categories, DAILY_STUDY_HOURS, DAYS, START, mode)
+
+    for _ in range(20):
+        changes = []
+        for _ in range(10):
+            category = rng.choice(categories)
+            standard = rng.choice(category['standards'])
+            random_edit(rng, standard, edits=('hours', 'priority', 'toggle'))
+            changes.append((category, standard))
+        assert planner.update_standards(changes)
+        assert_matches_rebuild(planner, categories, mode, ())
+
+
+def test_pin_changes_ask_for_a_rebuild():
+    rng = random.Random(3)
+    categories = make_categories(10, rng)
+    planner = IncrementalPlanner(categories, DAILY_STUDY_HOURS, DAYS, START, 'hours')
+    standard = categories[0]['standards'][0]
+    standard['scheduledDate'] = START + timedelta(days=2)
+    assert not planner.update_standard(categories[0], standard)
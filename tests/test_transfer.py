@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from studyplan.transfer import InvalidExportError, export_bytes, load_export
+
+
+def make_categories():
+    return [{
+        'id': 1, 'name': "Foundations", 'expanded': True,
+        'standards': [
+            {'id': 'LKAS1', 'name': "LKAS 1", 'completed': True, 'priority': 'high', 'difficulty': 'medium',
+             'totalHours': 4, 'hoursSpent': 4.5, 'notes': "Done", 'scheduledDate': None, 'recommendedDays': 2},
+            {'id': 'LKAS7', 'name': "LKAS 7", 'completed': False, 'priority': 'low', 'difficulty': 'low',
+             'totalHours': 2, 'hoursSpent': 0, 'notes': "", 'scheduledDate': datetime(2025, 3, 3), 'recommendedDays': 1},
+        ],
+    }]
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_export_with_past_exam_date_restores(compress):
+    # A backup stays restorable after its exam; the app moves the date to today
+    exam_date = datetime.combine(datetime.now().date() - timedelta(days=90), datetime.min.time())
+    settings = {'exam_date': exam_date, 'daily_study_hours': [1, 2, 1, 2, 2, 1, 1], 'planning_mode': 'days'}
+
+    categories, restored = load_export(export_bytes(make_categories(), settings, compress=compress))
+
+    assert categories == make_categories()
+    assert restored == settings
+
+
+def test_export_without_categories_is_rejected():
+    data = export_bytes(make_categories(), {'exam_date': datetime.now(), 'daily_study_hours': [1] * 7})
+    document = data.decode().replace('"categories": [', '"other": [', 1)
+    with pytest.raises(InvalidExportError):
+        load_export(document.encode())